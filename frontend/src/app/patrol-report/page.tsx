@@ -10,9 +10,8 @@ import { useRouter } from 'next/navigation';
 import { FileText, RefreshCw, Download } from 'lucide-react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useServerStatus } from '@/lib/hooks/useServerStatus';
-import { getPatrolRecords } from '@/lib/api/patrol';
-import { PatrolRecord, FilterOptions } from '@/lib/types';
-import { groupByPoint, PointGroups } from '@/lib/utils/data-processor';
+import { getPointGroups } from '@/lib/api/patrol';
+import { toPointGroups, PointGroups } from '@/lib/utils/data-processor';
 import { NavigationDrawer, MenuButton } from '@/components/shared/NavigationDrawer';
 import { ServerStatus } from '@/components/shared/ServerStatus';
 import { Button } from '@/components/ui/button';
@@ -25,9 +24,8 @@ export default function PatrolReportPage() {
   const { user, isAuthenticated } = useAuth();
   const { isServerOnline } = useServerStatus();
 
-  const [records, setRecords] = useState<PatrolRecord[]>([]);
+  const [totalScans, setTotalScans] = useState(0);
   const [pointGroups, setPointGroups] = useState<PointGroups | null>(null);
-  const [filters, setFilters] = useState<FilterOptions>({});
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isGeneratingPDF, setIsGeneratingPDF] = useState(false);
@@ -78,37 +76,14 @@ export default function PatrolReportPage() {
     setError(null);
 
     try {
-      // Load all records with pagination (API max limit is 100)
-      const allRecords: PatrolRecord[] = [];
-      let currentPage = 1;
-      const pageLimit = 100; // API maximum
-      let hasMore = true;
-
-      const loadFilters: FilterOptions = {
-        ...filters,
+      // The API groups and sorts the visits per point in a single request
+      const response = await getPointGroups({
         startDate: startDate ?? undefined,
         endDate: endDate ?? undefined,
-      };
-
-      while (hasMore) {
-        const response = await getPatrolRecords({
-          page: currentPage,
-          limit: pageLimit,
-          ...loadFilters,
-        });
-
-        allRecords.push(...response.records);
-
-        // Check if there are more pages
-        hasMore = currentPage < (response.total_pages || 1);
-        currentPage++;
-      }
-
-      setRecords(allRecords);
+      });
 
-      // Group by point
-      const groups = groupByPoint(allRecords);
-      setPointGroups(groups);
+      setTotalScans(response.total);
+      setPointGroups(toPointGroups(response.points));
     } catch (err: any) {
       let errorMessage = 'Failed to load report data';
       if (err.response?.data?.detail) {
@@ -308,7 +283,7 @@ export default function PatrolReportPage() {
               variant="default"
               size="sm"
               onClick={handleGeneratePDF}
-              disabled={isGeneratingPDF || !pointGroups || records.length === 0}
+              disabled={isGeneratingPDF || !pointGroups || totalScans === 0}
             >
               <Download className="h-4 w-4 mr-2" />
               {isGeneratingPDF ? 'Generating PDF...' : 'Generate PDF'}
@@ -5,10 +5,11 @@ import { useRouter } from 'next/navigation';
 import { Filter, Printer, RefreshCw } from 'lucide-react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useServerStatus } from '@/lib/hooks/useServerStatus';
-import { getPatrolRecords } from '@/lib/api/patrol';
-import { PatrolRecord, FilterOptions } from '@/lib/types';
+import { getPatrolRecords, getActivityHeatmap } from '@/lib/api/patrol';
+import { PatrolRecord, FilterOptions, ActivityHeatmap } from '@/lib/types';
 import { SummaryCard } from '@/components/reports/SummaryCard';
 import { DistributionCard } from '@/components/reports/DistributionCard';
+import { HeatmapCard } from '@/components/reports/HeatmapCard';
 import { FilterDialog } from '@/components/logs/FilterDialog';
 import { ServerStatus } from '@/components/shared/ServerStatus';
 import { NavigationDrawer, MenuButton } from '@/components/shared/NavigationDrawer';
@@ -28,6 +29,7 @@ export default function ReportsPage() {
   const { isServerOnline } = useServerStatus();
 
   const [records, setRecords] = useState<PatrolRecord[]>([]);
+  const [heatmap, setHeatmap] = useState<ActivityHeatmap | null>(null);
   const [filters, setFilters] = useState<FilterOptions>({});
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -69,6 +71,14 @@ export default function ReportsPage() {
       }
 
       setRecords(allRecords);
+
+      // Counted by the API; covers the date range only
+      setHeatmap(
+        await getActivityHeatmap({
+          startDate: filters.startDate,
+          endDate: filters.endDate,
+        })
+      );
     } catch (err: any) {
       // Extract error message from validation errors if available
       let errorMessage = 'Failed to load report data';
@@ -266,6 +276,7 @@ export default function ReportsPage() {
               title="Guard Distribution"
               data={guardDistribution}
             />
+            <HeatmapCard heatmap={heatmap} />
           </>
         )}
       </main>
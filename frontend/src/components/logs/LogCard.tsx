@@ -40,7 +40,7 @@ export function LogCard({ record, onClick }: LogCardProps) {
       setErrorType(null);
 
       try {
-        const imageData = await getPatrolImage(record.imageid);
+        const imageData = await getPatrolImage(record.imageid, 'preview');
         if (imageData && imageData.length > 0) {
           // Convert Uint8Array to Blob
           const blob = new Blob([imageData as BlobPart], { type: 'image/jpeg' });
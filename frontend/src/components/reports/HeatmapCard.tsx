@@ -0,0 +1,64 @@
+'use client';
+
+import React from 'react';
+import { ActivityHeatmap } from '@/lib/types';
+import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
+
+interface HeatmapCardProps {
+  heatmap: ActivityHeatmap | null;
+}
+
+export function HeatmapCard({ heatmap }: HeatmapCardProps) {
+  return (
+    <Card>
+      <CardHeader>
+        <CardTitle>Activity by Hour</CardTitle>
+      </CardHeader>
+      <CardContent>
+        {!heatmap || heatmap.total === 0 ? (
+          <p className="text-sm text-muted-foreground text-center py-4">
+            No data available
+          </p>
+        ) : (
+          <div className="overflow-x-auto">
+            <table className="text-xs border-separate border-spacing-0.5">
+              <thead>
+                <tr>
+                  <th className="px-1 text-muted-foreground font-medium">Hour</th>
+                  {heatmap.points.map((point) => (
+                    <th key={point} className="px-1 text-muted-foreground font-medium">
+                      {point}
+                    </th>
+                  ))}
+                  <th className="px-1 text-muted-foreground font-medium">Total</th>
+                </tr>
+              </thead>
+              <tbody>
+                {heatmap.hours.map((hour) => (
+                  <tr key={hour}>
+                    <td className="px-1 text-muted-foreground text-right">
+                      {String(hour).padStart(2, '0')}:00
+                    </td>
+                    {heatmap.counts[hour].map((count, column) => (
+                      <td
+                        key={column}
+                        className="w-8 h-6 text-center rounded"
+                        style={{ backgroundColor: `hsl(var(--primary) / ${count / heatmap.max_count})` }}
+                        title={`Point ${heatmap.points[column]}, ${String(hour).padStart(2, '0')}:00: ${count} scans`}
+                      >
+                        <span className={count / heatmap.max_count > 0.5 ? 'text-primary-foreground' : 'text-foreground'}>
+                          {count || ''}
+                        </span>
+                      </td>
+                    ))}
+                    <td className="px-1 text-right font-medium">{heatmap.hour_totals[hour]}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+      </CardContent>
+    </Card>
+  );
+}
@@ -1,16 +1,32 @@
 import { apiClient } from './client';
 import {
   CreatePatrolRecordRequest,
+  CreatePatrolRecordResponse,
+  RoundProgress,
   PatrolRecord,
   PaginatedResponse,
   FilterOptions,
+  PatrolPointGroupsResponse,
+  ActivityHeatmap,
 } from '../types';
 
 export async function createPatrolRecord(
   record: CreatePatrolRecordRequest
-): Promise<void> {
+): Promise<CreatePatrolRecordResponse> {
   // Use 3-second timeout for quick failure as per specification
-  return apiClient.post('/industerialsecurity', record, { timeout: 3000 });
+  return apiClient.post<CreatePatrolRecordResponse>('/industerialsecurity', record, { timeout: 3000 });
+}
+
+export async function getCurrentRound(guardName: string): Promise<RoundProgress> {
+  return apiClient.get<RoundProgress>('/industerialsecurity/rounds/current', {
+    params: { guardname: guardName },
+  });
+}
+
+export async function resetCurrentRound(guardName: string): Promise<RoundProgress> {
+  return apiClient.post<RoundProgress>('/industerialsecurity/rounds/reset', undefined, {
+    params: { guardname: guardName },
+  });
 }
 
 export async function getPatrolRecords(
@@ -61,12 +77,54 @@ export async function getPatrolRecords(
   };
 }
 
-export async function getPatrolImage(imageId: string): Promise<Uint8Array | null> {
+export async function getPointGroups(params: {
+  startDate?: Date;
+  endDate?: Date;
+}): Promise<PatrolPointGroupsResponse> {
+  // Grouped and sorted by the API in one request, instead of paging every record
+  const queryParams: any = {};
+  if (params.startDate) {
+    queryParams.start_date = Math.floor(params.startDate.getTime() / 1000);
+  }
+  if (params.endDate) {
+    queryParams.end_date = Math.floor(params.endDate.getTime() / 1000);
+  }
+
+  return apiClient.get<PatrolPointGroupsResponse>('/api/v1/reports/point-groups', {
+    params: queryParams,
+  });
+}
+
+export async function getActivityHeatmap(params: {
+  startDate?: Date;
+  endDate?: Date;
+}): Promise<ActivityHeatmap> {
+  // Hours are bucketed in the browser's time zone
+  const queryParams: any = {
+    utc_offset_minutes: -new Date().getTimezoneOffset(),
+  };
+  if (params.startDate) {
+    queryParams.start_date = Math.floor(params.startDate.getTime() / 1000);
+  }
+  if (params.endDate) {
+    queryParams.end_date = Math.floor(params.endDate.getTime() / 1000);
+  }
+
+  return apiClient.get<ActivityHeatmap>('/api/v1/reports/heatmap', {
+    params: queryParams,
+  });
+}
+
+export async function getPatrolImage(
+  imageId: string,
+  size?: 'thumb' | 'preview'
+): Promise<Uint8Array | null> {
   if (!imageId) return null;
 
   try {
     const response = await apiClient.get<ArrayBuffer>('/industerialsecurity', {
-      params: { imageid: imageId },
+      // Resized renditions are generated and cached by the API on first request
+      params: size ? { imageid: imageId, size } : { imageid: imageId },
       responseType: 'arraybuffer',
     });
 
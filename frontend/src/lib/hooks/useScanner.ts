@@ -4,7 +4,7 @@ import { useState, useCallback, useEffect } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useConnectivity } from './useConnectivity';
 import { useServerStatus } from './useServerStatus';
-import { createPatrolRecord } from '@/lib/api/patrol';
+import { createPatrolRecord, getCurrentRound, resetCurrentRound } from '@/lib/api/patrol';
 import { feedbackService } from '@/services/feedback';
 import { ScanResult, ScannerStatus } from '@/lib/types';
 import { isNumeric, generateId, generateImageId, normalizePointCode } from '@/lib/utils/format';
@@ -42,6 +42,20 @@ export function useScanner() {
     localStorage.setItem(STORAGE_KEYS.SCANNED_POINTS, JSON.stringify([...points]));
   }, []);
 
+  // The server tracks the round, so progress follows the guard across phones;
+  // localStorage only covers starting up offline
+  const guardName = user?.guardName?.trim();
+  useEffect(() => {
+    if (!guardName || !isServerOnline) return;
+    getCurrentRound(guardName)
+      .then((round) => {
+        const points = new Set(round.scanned);
+        setScannedPoints(points);
+        saveScannedPoints(points);
+      })
+      .catch((error) => console.error('Failed to load round progress:', error));
+  }, [guardName, isServerOnline, saveScannedPoints]);
+
   const processQrCode = useCallback(
     async (code: string): Promise<ScanResult> => {
       // Step 1: Duplicate Prevention - Check if same code scanned within last 5 seconds
@@ -156,11 +170,13 @@ export function useScanner() {
 
       try {
         // Step 7: Server Communication
-        await createPatrolRecord(record);
+        const created = await createPatrolRecord(record);
 
-        // Step 8: Success Path
-        const newScannedPoints = new Set(scannedPoints);
-        newScannedPoints.add(normalizedCode);
+        // Step 8: Success Path (the server's round is authoritative)
+        const newScannedPoints = created.round
+          ? new Set(created.round.scanned)
+          : new Set(scannedPoints).add(normalizedCode);
+        const totalPoints = created.round?.total ?? TOTAL_PATROL_POINTS;
         setScannedPoints(newScannedPoints);
         saveScannedPoints(newScannedPoints);
 
@@ -169,7 +185,7 @@ export function useScanner() {
         setLastScanTime(now);
 
         // Check if all points completed
-        const isCompleted = newScannedPoints.size === TOTAL_PATROL_POINTS;
+        const isCompleted = created.round ? created.round.complete : newScannedPoints.size === totalPoints;
 
         // Play success sound
         feedbackService.playSuccessSound();
@@ -192,8 +208,8 @@ export function useScanner() {
           success: true,
           serverSuccess: true,
           message: isCompleted
-            ? `Point ${normalizedCode}: SUCCESSFULLY RECORDED\n\nProgress: ${newScannedPoints.size}/${TOTAL_PATROL_POINTS} points\n\nALL PATROL POINTS COMPLETED!`
-            : `Point ${normalizedCode}: SUCCESSFULLY RECORDED\n\nProgress: ${newScannedPoints.size}/${TOTAL_PATROL_POINTS} points`,
+            ? `Point ${normalizedCode}: SUCCESSFULLY RECORDED\n\nProgress: ${newScannedPoints.size}/${totalPoints} points\n\nALL PATROL POINTS COMPLETED!`
+            : `Point ${normalizedCode}: SUCCESSFULLY RECORDED\n\nProgress: ${newScannedPoints.size}/${totalPoints} points`,
           turnOffCamera: true, // Always turn off camera after successful scan
           skipFeedback: false,
           point: normalizedCode,
@@ -302,9 +318,12 @@ export function useScanner() {
     if (confirm('Start New Patrol?\n\nThis will reset your patrol progress. All scanned points will be cleared.')) {
       setScannedPoints(new Set());
       localStorage.removeItem(STORAGE_KEYS.SCANNED_POINTS);
+      if (guardName) {
+        resetCurrentRound(guardName).catch((error) => console.error('Failed to reset round:', error));
+      }
       feedbackService.showInfo('Patrol progress reset. Ready to start a new patrol.');
     }
-  }, []);
+  }, [guardName]);
 
   return {
     scannedPoints,
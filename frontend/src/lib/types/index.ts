@@ -43,6 +43,56 @@ export interface CreatePatrolRecordRequest {
   note: string;
 }
 
+// Server-tracked patrol round (POST /industerialsecurity, /industerialsecurity/rounds/*)
+export interface RoundProgress {
+  guardname: string;
+  scanned: string[]; // Points scanned in this round, in point order
+  missing: string[];
+  count: number;
+  total: number;
+  complete: boolean;
+  started: number | null; // Unix timestamp (seconds) of the round's first scan
+  last_scan: number | null;
+}
+
+export interface CreatePatrolRecordResponse extends Omit<PatrolRecord, 'time' | 'servertime'> {
+  time: string;
+  servertime: string;
+  round: RoundProgress | null;
+}
+
+// Patrol Report Types (GET /api/v1/reports/point-groups)
+export interface PointVisit {
+  id: string;
+  guardname: string;
+  time: number; // Unix timestamp (seconds)
+}
+
+export interface PatrolPointGroup {
+  point: string;
+  count: number;
+  guards: Record<string, number>; // Scans per guard
+  visits: PointVisit[]; // Oldest first
+}
+
+export interface PatrolPointGroupsResponse {
+  total: number;
+  points: PatrolPointGroup[];
+}
+
+// Activity heatmap (GET /api/v1/reports/heatmap)
+export interface ActivityHeatmap {
+  hours: number[]; // Row labels: 0..23, local hour of day
+  points: string[]; // Column labels: round points in order
+  counts: number[][]; // counts[hour][column]
+  hour_totals: number[];
+  point_totals: number[];
+  max_count: number;
+  total: number;
+  other_scans: number;
+  utc_offset_minutes: number;
+}
+
 // API Response Types
 export interface PaginatedResponse<T> {
   records: T[];
@@ -2,24 +2,46 @@
  * Data processing utilities for patrol records
  */
 
-import { PatrolRecord } from '@/lib/types';
+import { PatrolPointGroup, PatrolRecord, PointVisit } from '@/lib/types';
 import { normalizePoint } from './point-mapper';
 
 export interface PointGroups {
-  [pointNumber: string]: PatrolRecord[];
+  [pointNumber: string]: PointVisit[];
 }
 
 /**
- * Group patrol records by point number
- * Ensures all 12 points exist (empty arrays for points with no data)
+ * Create empty groups for all 12 points
  */
-export function groupByPoint(records: PatrolRecord[]): PointGroups {
+function emptyPointGroups(): PointGroups {
   const groups: PointGroups = {};
-
-  // Initialize all 12 points
   for (let i = 1; i <= 12; i++) {
     groups[i.toString()] = [];
   }
+  return groups;
+}
+
+/**
+ * Build point groups from the API's per-point report
+ * (already normalized and sorted by time on the server)
+ */
+export function toPointGroups(points: PatrolPointGroup[]): PointGroups {
+  const groups = emptyPointGroups();
+
+  points.forEach((group) => {
+    if (groups[group.point]) {
+      groups[group.point] = group.visits;
+    }
+  });
+
+  return groups;
+}
+
+/**
+ * Group patrol records by point number
+ * Ensures all 12 points exist (empty arrays for points with no data)
+ */
+export function groupByPoint(records: PatrolRecord[]): PointGroups {
+  const groups = emptyPointGroups();
 
   // Group records
   records.forEach((record) => {
@@ -40,7 +62,7 @@ export function groupByPoint(records: PatrolRecord[]): PointGroups {
 /**
  * Check if an entry is delayed (>100 minutes from previous entry)
  */
-export function isDelayedEntry(records: PatrolRecord[], index: number): boolean {
+export function isDelayedEntry(records: PointVisit[], index: number): boolean {
   if (index === 0) return false;
 
   const currentTime = records[index].time;
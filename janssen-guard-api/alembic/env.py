@@ -9,7 +9,7 @@ import asyncio
 
 # Import your models and Base
 from app.database import Base
-from app.models import User, PatrolRecord
+from app.models import User, PatrolRecord, StoredImage, PatrolHourlyRollup
 from app.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,30 @@
+"""add_sync_watermark_index
+
+Revision ID: 4c8e2a91d7b3
+Revises: bf2308c4694e
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2a91d7b3'
+down_revision = 'bf2308c4694e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index backing the delta-sync keyset query
+    # (WHERE (server_time, id) > watermark ORDER BY server_time, id LIMIT n)
+    op.create_index(
+        'ix_patrol_records_server_time_id',
+        'patrol_records',
+        ['server_time', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patrol_records_server_time_id', table_name='patrol_records')
@@ -0,0 +1,31 @@
+"""add_patrol_hourly_rollups
+
+Revision ID: 5e0b7d2c91f3
+Revises: c81e4f5a9b20
+Create Date: 2026-10-19 19:12:40.526117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b7d2c91f3'
+down_revision = 'c81e4f5a9b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Scan counts per (hour, point, guard); fill with app.commands.rebuild_rollups
+    op.create_table(
+        'patrol_hourly_rollups',
+        sa.Column('hour', sa.BigInteger(), primary_key=True),
+        sa.Column('point', sa.String(10), primary_key=True),
+        sa.Column('guard_name', sa.String(100), primary_key=True),
+        sa.Column('scans', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('patrol_hourly_rollups')
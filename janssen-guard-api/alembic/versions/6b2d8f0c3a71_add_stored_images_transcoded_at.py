@@ -0,0 +1,31 @@
+"""add_stored_images_transcoded_at
+
+Revision ID: 6b2d8f0c3a71
+Revises: e57a0c4b19d8
+Create Date: 2026-10-19 13:05:12.918334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b2d8f0c3a71'
+down_revision = 'e57a0c4b19d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Background transcoder bookkeeping: NULL until the image has been processed
+    op.add_column('stored_images', sa.Column('transcoded_at', sa.TIMESTAMP(), nullable=True))
+    op.create_index(
+        'ix_stored_images_transcode',
+        'stored_images',
+        ['transcoded_at', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_images_transcode', table_name='stored_images')
+    op.drop_column('stored_images', 'transcoded_at')
@@ -0,0 +1,30 @@
+"""add_point_time_index
+
+Revision ID: 9d3f61b0a2e4
+Revises: 4c8e2a91d7b3
+Create Date: 2026-10-19 10:03:27.518930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f61b0a2e4'
+down_revision = '4c8e2a91d7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index for "latest scan per point": MySQL answers
+    # GROUP BY point / MAX(time) with a loose index scan on it
+    op.create_index(
+        'ix_patrol_records_point_time',
+        'patrol_records',
+        ['point', 'time']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patrol_records_point_time', table_name='patrol_records')
@@ -0,0 +1,31 @@
+"""add_stored_images_segment_offset
+
+Revision ID: a3f9c1d27e54
+Revises: 6b2d8f0c3a71
+Create Date: 2026-10-19 14:47:33.502916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f9c1d27e54'
+down_revision = '6b2d8f0c3a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Packed images: path is the segment file and segment_offset the image's first byte
+    op.add_column('stored_images', sa.Column('segment_offset', sa.BigInteger(), nullable=True))
+    op.create_index(
+        'ix_stored_images_pack',
+        'stored_images',
+        ['segment_offset', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_images_pack', table_name='stored_images')
+    op.drop_column('stored_images', 'segment_offset')
@@ -0,0 +1,25 @@
+"""add_stored_images_duplicate_of
+
+Revision ID: c81e4f5a9b20
+Revises: a3f9c1d27e54
+Create Date: 2026-10-19 16:05:12.118034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4f5a9b20'
+down_revision = 'a3f9c1d27e54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Byte-identical images share the first copy's path; this records which copy that was
+    op.add_column('stored_images', sa.Column('duplicate_of', sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('stored_images', 'duplicate_of')
@@ -0,0 +1,35 @@
+"""add_stored_images_catalog
+
+Revision ID: e57a0c4b19d8
+Revises: 9d3f61b0a2e4
+Create Date: 2026-10-19 11:26:54.730162
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e57a0c4b19d8'
+down_revision = '9d3f61b0a2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Image catalog: real path, size, content type and hash of every stored image
+    op.create_table(
+        'stored_images',
+        sa.Column('image_id', sa.String(100), primary_key=True),
+        sa.Column('path', sa.String(255), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(50), nullable=False),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now())
+    )
+    op.create_index('ix_stored_images_sha256', 'stored_images', ['sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_images_sha256', table_name='stored_images')
+    op.drop_table('stored_images')
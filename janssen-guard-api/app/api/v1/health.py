@@ -5,7 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import datetime
 from app.database import get_db
-from app.schemas.response import HealthResponse
+from app.schemas.response import HealthResponse, ImageCacheStats, HotStoreStats
+from app.services.image_cache import image_cache
+from app.services.hot_store import hot_store
 from app.services.image_service import ImageService
 
 router = APIRouter()
@@ -33,7 +35,7 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     # Check storage
     try:
         image_service = ImageService()
-        storage_status = "available" if image_service.storage_path.exists() else "unavailable"
+        storage_status = "available" if await image_service.storage.is_available() else "unavailable"
     except Exception:
         storage_status = "unavailable"
     
@@ -45,3 +47,25 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         version="1.0.0"
     )
 
+
+@router.get("/health/image-cache", response_model=ImageCacheStats)
+async def image_cache_stats():
+    """
+    In-memory image cache metrics
+    
+    Returns:
+        ImageCacheStats: Size, hit rate and evictions since startup
+    """
+    return ImageCacheStats(**image_cache.stats())
+
+
+@router.get("/health/hot-store", response_model=HotStoreStats)
+async def hot_store_stats():
+    """
+    In-memory recent record store metrics
+    
+    Returns:
+        HotStoreStats: Records held, covered range, memory use and hit rate
+    """
+    return HotStoreStats(**hot_store.stats())
+
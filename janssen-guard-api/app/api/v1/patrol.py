@@ -1,28 +1,45 @@
 """Patrol record API routes"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
+import time
 import logging
 from app.database import get_db
 from app.schemas.patrol_record import (
     PatrolRecordCreate,
     PatrolRecordResponse,
+    PatrolRecordCreatedResponse,
+    RoundProgress,
     PatrolRecordsResponse,
-    PatrolRecordFilter
+    PatrolRecordFilter,
+    PatrolRecordChangesResponse,
+    PatrolImageArchiveRequest,
+    CameraDuplicateStats,
+    PatrolImageUploadResponse,
+    ImageUploadPolicy,
+    OverdueEventsResponse
 )
 from app.services.patrol_service import PatrolService
+from app.services.overdue_monitor import overdue_monitor
+from app.services.round_tracker import round_tracker
 from app.services.image_service import ImageService
+from app.services.upload_service import ImageExists, UploadService, UploadTooLarge, UnsupportedImage
 from app.repositories.patrol_repository import PatrolRepository
 from app.models.patrol_record import PatrolRecord
+from app.config import settings
+from app.utils.image_response import image_response
+from app.utils.multipart_stream import iter_multipart
+from app.utils.zip_stream import stream_zip
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 # Create patrol record
-@router.post("/industerialsecurity", response_model=PatrolRecordResponse, status_code=201)
+@router.post("/industerialsecurity", response_model=PatrolRecordCreatedResponse, status_code=201)
 async def create_patrol_record(
     record: PatrolRecordCreate,
     db: AsyncSession = Depends(get_db)
@@ -35,7 +52,7 @@ async def create_patrol_record(
         db: Database session
         
     Returns:
-        PatrolRecordResponse: Created patrol record
+        PatrolRecordCreatedResponse: Created patrol record and the guard's round progress
         
     Raises:
         HTTPException: 500 if creation fails
@@ -56,17 +73,96 @@ async def create_patrol_record(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Create patrol record with a photo from the guard's phone
+@router.post("/industerialsecurity/upload", response_model=PatrolImageUploadResponse, status_code=201)
+async def upload_patrol_record(
+    request: Request,
+    max_edge: Optional[int] = Query(None, ge=64, description="Longest edge to store (capped by the server maximum)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a patrol record with a photo, streamed as multipart/form-data
+    
+    The form carries a "record" field (patrol record JSON, as for
+    POST /industerialsecurity) followed by an "image" file field. The
+    image is written to storage while it arrives; the record is only
+    created once the image is stored, in the same transaction as its
+    catalog entry. Clients should resize photos to the limits from
+    GET /industerialsecurity/upload/policy before sending.
+    
+    Args:
+        request: Incoming multipart request (read as a stream)
+        max_edge: Longest edge to store; larger photos are downscaled
+        db: Database session
+        
+    Returns:
+        PatrolImageUploadResponse: Created record and stored image details
+        
+    Raises:
+        HTTPException: 400 if the form or record is invalid, 413 if the image is too large,
+            415 if it is not a JPEG, PNG or WebP image, 409 if the record or image exists, 500 if creation fails
+    """
+    patrol_repo = PatrolRepository(PatrolRecord, db)
+    image_service = ImageService()
+    patrol_service = PatrolService(patrol_repo, image_service)
+    upload_service = UploadService(image_service)
+    
+    try:
+        record, uploaded = await upload_service.receive(iter_multipart(request), max_edge)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedImage as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ImageExists as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error receiving upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    try:
+        result = await patrol_service.create_patrol_record_with_image(record, uploaded)
+        logger.info(f"Created patrol record {record.id} with uploaded image {record.imageid}")
+        return result
+    except IntegrityError:
+        await upload_service.discard(uploaded)
+        raise HTTPException(status_code=409, detail=f"Patrol record {record.id} or image {record.imageid} already exists")
+    except Exception as e:
+        await upload_service.discard(uploaded)
+        logger.error(f"Error creating patrol record for upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Upload limits for guard phones
+@router.get("/industerialsecurity/upload/policy", response_model=ImageUploadPolicy)
+async def get_upload_policy():
+    """
+    Get the limits clients should apply to photos before uploading
+    
+    Returns:
+        ImageUploadPolicy: Maximum size and edge, accepted types and suggested JPEG quality
+    """
+    return UploadService(ImageService()).policy()
+
+
 # Get patrol records (with optional filters) or get image
 @router.get("/industerialsecurity")
 async def get_patrol_records(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
-    point: Optional[str] = Query(None, description="Filter by patrol point"),
-    guardname: Optional[str] = Query(None, description="Filter by guard name"),
+    point: Optional[List[str]] = Query(None, description="Filter by patrol point (repeat for several points)"),
+    guardname: Optional[List[str]] = Query(None, description="Filter by guard name (repeat for several guards)"),
     start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
     end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
     has_notes: Optional[bool] = Query(None, description="Filter records with notes"),
     imageid: Optional[str] = Query(None, description="Image ID to retrieve"),
+    size: Optional[str] = Query(
+        None,
+        pattern="^(thumb|preview|original)$",
+        description="Image rendition: thumb, preview or original (default)"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -74,18 +170,20 @@ async def get_patrol_records(
     OR get patrol image if imageid is provided
     
     Args:
+        request: Incoming request (image caching and Range headers)
         page: Page number
         limit: Items per page
-        point: Filter by patrol point
-        guardname: Filter by guard name (partial match)
+        point: Filter by patrol point(s)
+        guardname: Filter by guard name (partial match on any of the given names)
         start_date: Start date filter (Unix timestamp)
         end_date: End date filter (Unix timestamp)
         has_notes: Filter records with notes
         imageid: Image ID (if provided, returns image instead of records)
+        size: Image rendition to return with imageid (thumb, preview or original)
         db: Database session
         
     Returns:
-        PatrolRecordsResponse or Image: Patrol records or image binary
+        PatrolRecordsResponse or Image: Patrol records or image (200/206/304)
         
     Raises:
         HTTPException: 404 if image not found, 500 if query fails
@@ -93,18 +191,27 @@ async def get_patrol_records(
     # If imageid is provided, return image
     if imageid:
         image_service = ImageService()
-        image_data = await image_service.get_image(imageid)
-        
-        if not image_data:
-            raise HTTPException(status_code=404, detail="Image not found")
-        
-        return Response(
-            content=image_data,
-            media_type="image/jpeg",
-            headers={
-                "Content-Disposition": f"inline; filename={imageid}.jpg"
-            }
-        )
+        # A missing file may have been moved by another process: retry once with the current catalog row
+        for refresh in (False, True):
+            image_file = await image_service.get_image_file(imageid, None if size == "original" else size, refresh)
+            
+            if not image_file:
+                raise HTTPException(status_code=404, detail="Image not found")
+            
+            try:
+                return await image_response(
+                    request,
+                    image_service.storage,
+                    image_file.key,
+                    media_type=image_file.content_type,
+                    etag=image_file.etag,
+                    offset=image_file.offset,
+                    size=image_file.size,
+                    cache=image_service.cache
+                )
+            except FileNotFoundError:
+                continue
+        raise HTTPException(status_code=404, detail="Image not found")
     
     # Otherwise, return patrol records
     patrol_repo = PatrolRepository(PatrolRecord, db)
@@ -127,3 +234,233 @@ async def get_patrol_records(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# Delta sync: records created after a watermark
+@router.get("/industerialsecurity/changes", response_model=PatrolRecordChangesResponse)
+async def get_patrol_record_changes(
+    watermark: Optional[str] = Query(None, description="Watermark from the previous call (omit for a full sync)"),
+    limit: int = Query(
+        settings.SYNC_BATCH_SIZE,
+        ge=1,
+        le=settings.SYNC_MAX_BATCH_SIZE,
+        description="Maximum records per call"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get patrol records created since a watermark
+    
+    Lets open dashboards poll cheaply: each call is a keyset range scan on
+    the (server_time, id) index, with no OFFSET and no COUNT query.
+    Clients pass the returned watermark back on the next call and poll
+    again immediately while has_more is true. The last few seconds are
+    returned again on the next poll (see SYNC_REREAD_SECONDS), so clients
+    must ignore records whose id they already have.
+    
+    Args:
+        watermark: Watermark returned by the previous call
+        limit: Maximum number of records to return
+        db: Database session
+        
+    Returns:
+        PatrolRecordChangesResponse: New records and the next watermark
+        
+    Raises:
+        HTTPException: 400 if the watermark is malformed, 500 if query fails
+    """
+    patrol_repo = PatrolRepository(PatrolRecord, db)
+    image_service = ImageService()
+    patrol_service = PatrolService(patrol_repo, image_service)
+    
+    try:
+        return await patrol_service.get_changes_since(watermark, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Latest scan per patrol point
+@router.get("/industerialsecurity/latest", response_model=List[PatrolRecordResponse])
+async def get_latest_patrol_records(db: AsyncSession = Depends(get_db)):
+    """
+    Get the most recent scan of every patrol point
+    
+    Answers "when was each point last visited, and by whom" with two
+    index lookups per point, regardless of table size.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        List[PatrolRecordResponse]: Latest record per point
+        
+    Raises:
+        HTTPException: 500 if query fails
+    """
+    patrol_repo = PatrolRepository(PatrolRecord, db)
+    image_service = ImageService()
+    patrol_service = PatrolService(patrol_repo, image_service)
+    
+    try:
+        return await patrol_service.get_latest_per_point()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Current patrol round of a guard (scanner start-up, e.g. after changing phones)
+@router.get("/industerialsecurity/rounds/current", response_model=RoundProgress)
+async def get_current_round(
+    guardname: str = Query(..., min_length=1, max_length=100, description="Guard name")
+):
+    """
+    Get the points a guard has scanned in the current round
+    
+    Served from the in-process round tracker; POST responses carry the
+    same progress, so scanners only need this when they start.
+    
+    Args:
+        guardname: Guard name
+        
+    Returns:
+        RoundProgress: Current round (empty once it is complete or has lapsed)
+    """
+    return round_tracker.get_progress(guardname)
+
+
+# Start a new patrol round
+@router.post("/industerialsecurity/rounds/reset", response_model=RoundProgress)
+async def reset_current_round(
+    guardname: str = Query(..., min_length=1, max_length=100, description="Guard name")
+):
+    """
+    End a guard's current round so the next scan starts a new one
+    
+    The reset is kept only in this process's round tracker. It is not
+    stored: after a restart the round is rebuilt from the guard's recent
+    records, including scans made before the reset, and other worker
+    processes never see it.
+    
+    Args:
+        guardname: Guard name
+        
+    Returns:
+        RoundProgress: Empty round
+    """
+    return round_tracker.reset(guardname)
+
+
+# Overdue patrol point alerts (long polling)
+@router.get("/industerialsecurity/overdue", response_model=OverdueEventsResponse)
+async def get_overdue_events(
+    after: int = Query(0, ge=0, description="Last event number already received"),
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for a newer event"),
+):
+    """
+    Get overdue/resolved events for round points and every point's visit deadline
+    
+    Served from the in-process overdue monitor without touching the
+    database. Pass the returned last_seq back as ?after= with ?wait= to
+    block until the next event instead of polling.
+    
+    Args:
+        after: Last event number already received
+        wait: Seconds to wait when there is no newer event
+        
+    Returns:
+        OverdueEventsResponse: Newer events and current deadlines
+        
+    Raises:
+        HTTPException: 503 if the overdue monitor is disabled
+    """
+    if not settings.PATROL_OVERDUE_ENABLED:
+        raise HTTPException(status_code=503, detail="Overdue monitor is disabled")
+    
+    return await overdue_monitor.get_events(after, wait)
+
+
+# Zip archive of many patrol images (report generation)
+@router.post("/industerialsecurity/images/archive")
+async def get_patrol_image_archive(
+    archive: PatrolImageArchiveRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download many patrol images as one streamed zip archive
+    
+    Images are selected by explicit ID or by record filters (oldest record
+    first). Files are read a few at a time ahead of the stream and the
+    archive is never held in memory as a whole. IDs without an image are
+    listed in MISSING.txt inside the archive.
+    
+    Args:
+        archive: Image IDs or record filters, and the rendition size
+        db: Database session
+        
+    Returns:
+        StreamingResponse: application/zip archive
+        
+    Raises:
+        HTTPException: 400 if too many images are selected, 404 if none, 500 if query fails
+    """
+    patrol_repo = PatrolRepository(PatrolRecord, db)
+    image_service = ImageService()
+    patrol_service = PatrolService(patrol_repo, image_service)
+    
+    try:
+        image_ids = await patrol_service.get_archive_image_ids(archive, settings.IMAGE_ARCHIVE_MAX_IMAGES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not image_ids:
+        raise HTTPException(status_code=404, detail="No images found")
+    
+    entries = image_service.iter_archive_entries(
+        image_ids,
+        None if archive.size == "original" else archive.size,
+        settings.IMAGE_ARCHIVE_CONCURRENCY
+    )
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="patrol-images-{int(time.time())}.zip"'}
+    )
+
+
+# Duplicate camera frames per point (frozen camera detection)
+@router.get("/industerialsecurity/images/duplicates", response_model=List[CameraDuplicateStats])
+async def get_duplicate_image_stats(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get how many stored images per patrol point were duplicate frames
+    
+    Duplicates are stored once and counted here; a camera with a high
+    duplicate rate is likely stuck on a frozen frame.
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        db: Database session
+        
+    Returns:
+        List[CameraDuplicateStats]: Image and duplicate counts per point
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    patrol_repo = PatrolRepository(PatrolRecord, db)
+    image_service = ImageService()
+    patrol_service = PatrolService(patrol_repo, image_service)
+    
+    try:
+        return await patrol_service.get_duplicate_image_stats(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
@@ -0,0 +1,230 @@
+"""Report API routes"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_db
+from app.schemas.report import (
+    ReportSummary,
+    PointDistribution,
+    GuardDistribution,
+    PatrolPointGroupsResponse,
+    CoverageReport,
+    ActivityHeatmap
+)
+from app.services.report_service import ReportService
+from app.services.coverage_service import CoverageService
+from app.repositories.patrol_repository import PatrolRepository
+from app.repositories.rollup_repository import RollupRepository
+from app.models.patrol_record import PatrolRecord
+from app.models.patrol_rollup import PatrolHourlyRollup
+
+router = APIRouter()
+
+
+# Totals for the report header
+@router.get("/summary", response_model=ReportSummary)
+async def get_summary(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get scan, point and guard totals
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        db: Database session
+        
+    Returns:
+        ReportSummary: Total scans, distinct points and distinct guards
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    report_service = ReportService(
+        PatrolRepository(PatrolRecord, db),
+        RollupRepository(PatrolHourlyRollup, db)
+    )
+    
+    try:
+        return await report_service.get_summary_statistics(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Scans per patrol point
+@router.get("/points", response_model=List[PointDistribution])
+async def get_point_distribution(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the number and share of scans per patrol point
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        db: Database session
+        
+    Returns:
+        List[PointDistribution]: Counts per point, ordered by point
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    report_service = ReportService(
+        PatrolRepository(PatrolRecord, db),
+        RollupRepository(PatrolHourlyRollup, db)
+    )
+    
+    try:
+        return await report_service.get_point_distribution(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Scans per guard
+@router.get("/guards", response_model=List[GuardDistribution])
+async def get_guard_distribution(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the number and share of scans per guard
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        db: Database session
+        
+    Returns:
+        List[GuardDistribution]: Counts per guard, most scans first
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    report_service = ReportService(
+        PatrolRepository(PatrolRecord, db),
+        RollupRepository(PatrolHourlyRollup, db)
+    )
+    
+    try:
+        return await report_service.get_guard_distribution(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Scans grouped by point (patrol report table)
+@router.get("/point-groups", response_model=PatrolPointGroupsResponse)
+async def get_point_groups(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the visits, guards and scan count of every patrol point
+    
+    Replaces paging through every record and grouping them on the client.
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        db: Database session
+        
+    Returns:
+        PatrolPointGroupsResponse: Scans per point, oldest first within each point
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    report_service = ReportService(
+        PatrolRepository(PatrolRecord, db),
+        RollupRepository(PatrolHourlyRollup, db)
+    )
+    
+    try:
+        return await report_service.get_point_groups(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Hour of day x point activity heatmap (shift planning)
+@router.get("/heatmap", response_model=ActivityHeatmap)
+async def get_activity_heatmap(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    utc_offset_minutes: int = Query(0, ge=-720, le=840, description="Local time offset from UTC in minutes (e.g. 180 for UTC+3)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get scan counts per local hour of day and round point as a dense 24 x points matrix
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        utc_offset_minutes: Local time offset from UTC in minutes
+        db: Database session
+        
+    Returns:
+        ActivityHeatmap: Counts, row and column totals
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if query fails
+    """
+    report_service = ReportService(
+        PatrolRepository(PatrolRecord, db),
+        RollupRepository(PatrolHourlyRollup, db)
+    )
+    
+    try:
+        return await report_service.get_activity_heatmap(start_date, end_date, utc_offset_minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Round coverage and patrol cadence
+@router.get("/coverage", response_model=CoverageReport)
+async def get_coverage(
+    start_date: Optional[int] = Query(None, description="Start date (Unix timestamp)"),
+    end_date: Optional[int] = Query(None, description="End date (Unix timestamp)"),
+    include_rounds: bool = Query(False, description="List every round with its missed points"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get round completion, missed points, visit gaps per point and cadence per guard
+    
+    Args:
+        start_date: Start date filter (Unix timestamp)
+        end_date: End date filter (Unix timestamp)
+        include_rounds: Whether to list every round
+        db: Database session
+        
+    Returns:
+        CoverageReport: Coverage and cadence statistics
+        
+    Raises:
+        HTTPException: 400 if the date range is invalid, 500 if analysis fails
+    """
+    coverage_service = CoverageService(PatrolRepository(PatrolRecord, db))
+    
+    try:
+        return await coverage_service.get_coverage(start_date, end_date, include_rounds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
@@ -0,0 +1,2 @@
+"""Maintenance commands (run with python -m app.commands.<name>)"""
+
@@ -0,0 +1,167 @@
+"""
+Catalog images that were stored before the image catalog existed
+
+Walks IMAGE_STORAGE_PATH (sharded and legacy flat layouts), hashes every
+original that has no stored_images row and inserts its catalog entry.
+Renditions and temporary files are skipped. Already catalogued images,
+and files a catalog entry already points at (transcoded "img-1.3fa2c9e1.webp"),
+are not re-read, so the command can be interrupted and re-run.
+
+Usage (from the janssen-guard-api directory):
+    python -m app.commands.build_image_catalog [--workers 8] [--dry-run]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+from app.commands.migrate_image_layout import image_id_from_filename
+from app.services.image_catalog import CatalogEntry
+from app.services.image_service import ImageService, LEGACY_EXTENSIONS
+from app.services.rendition_service import RenditionService
+from app.utils.image_types import IMAGE_EXTENSIONS
+
+logger = logging.getLogger("build_image_catalog")
+
+BATCH_SIZE = 1000
+ORIGINAL_EXTENSIONS = set(LEGACY_EXTENSIONS) | set(IMAGE_EXTENSIONS.values())
+RENDITION_SUFFIXES = tuple(f".{size}" for size in RenditionService.SIZES)
+
+
+def is_original(name: str) -> bool:
+    """
+    Check whether a stored file name is an original image
+    
+    Args:
+        name: File name
+        
+    Returns:
+        bool: False for renditions, temporary files and other files
+    """
+    stem, ext = os.path.splitext(name)
+    return ext.lower() in ORIGINAL_EXTENSIONS and not stem.endswith(RENDITION_SUFFIXES)
+
+
+def original_files(root: Path) -> Iterator[Path]:
+    """
+    Yield every original image file under the storage root
+    
+    Args:
+        root: Image storage root
+        
+    Yields:
+        Path: Image file paths
+    """
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if is_original(name):
+                yield Path(directory) / name
+
+
+def describe(image_service: ImageService, file_path: Path) -> Optional[Tuple[str, CatalogEntry]]:
+    """
+    Build the catalog entry for one file
+    
+    Args:
+        image_service: Image service (owns the layout)
+        file_path: Image file path
+        
+    Returns:
+        Optional[Tuple[str, CatalogEntry]]: Image ID and entry, or None if unreadable
+    """
+    try:
+        return image_id_from_filename(file_path.name), image_service.describe_file(file_path)
+    except OSError as e:
+        logger.error(f"Error reading {file_path}: {str(e)}")
+        return None
+
+
+async def build(workers: int, dry_run: bool) -> int:
+    """
+    Catalog every uncatalogued image in storage
+    
+    Args:
+        workers: Number of parallel hashing threads
+        dry_run: Only report what would be catalogued
+        
+    Returns:
+        int: Number of files that could not be catalogued
+    """
+    image_service = ImageService()
+    root = image_service.storage_path
+    seen, catalogued_paths = set(), set()
+    async with AsyncSessionLocal() as session:
+        async for row in StoredImageRepository(StoredImage, session).stream_catalog():
+            seen.add(row.image_id)
+            catalogued_paths.add(row.path)
+    pending = (
+        path for path in original_files(root)
+        if path.relative_to(root).as_posix() not in catalogued_paths
+        and image_id_from_filename(path.name) not in seen
+    )
+    added = failed = 0
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(islice(pending, BATCH_SIZE))
+            if not batch:
+                break
+            
+            described = await asyncio.gather(*(
+                loop.run_in_executor(executor, describe, image_service, path)
+                for path in batch
+            ))
+            
+            # The same ID may exist in both layouts mid-migration; first one wins
+            rows = {}
+            for result in described:
+                if result is None:
+                    failed += 1
+                elif result[0] not in seen:
+                    image_id, entry = result
+                    seen.add(image_id)
+                    rows[image_id] = {"image_id": image_id, **entry._asdict()}
+            
+            if dry_run:
+                for row in rows.values():
+                    logger.info(f"Would catalog {row['image_id']} -> {row['path']}")
+            else:
+                async with AsyncSessionLocal() as session:
+                    await StoredImageRepository(StoredImage, session).add_many(list(rows.values()))
+            added += len(rows)
+            logger.info(f"Catalogued {added} images ({failed} failed), {time.monotonic() - started:.1f}s")
+    
+    logger.info(f"Done: {added} catalogued, {failed} failed")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="Parallel hashing threads")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the new entries")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if settings.IMAGE_STORAGE_BACKEND != "local":
+        logger.error("This command only applies to local image storage (IMAGE_STORAGE_BACKEND=local)")
+        sys.exit(2)
+    
+    failed = asyncio.run(build(args.workers, args.dry_run))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
+
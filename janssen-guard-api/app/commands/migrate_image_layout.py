@@ -0,0 +1,164 @@
+"""
+Move images from the legacy flat layout into the sharded layout
+
+Every file directly under IMAGE_STORAGE_PATH (originals and cached
+renditions) is renamed into its <root>/ab/cd/ shard directory, and
+stored_images rows that recorded the flat path are updated after each
+batch. Renames are atomic and only files still in the flat directory
+are visited, so the command can be interrupted and re-run at any time.
+The API reads both layouts while the migration is in progress, and
+re-reads a catalog entry whose file has just moved.
+
+Usage (from the janssen-guard-api directory):
+    python -m app.commands.migrate_image_layout [--workers 8] [--dry-run]
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+from app.services.image_service import ImageService
+from app.services.rendition_service import RenditionService
+
+logger = logging.getLogger("migrate_image_layout")
+
+BATCH_SIZE = 1000
+# Tag of a file written under a new key for an existing image ("img-1.3fa2c9e1.webp")
+KEY_TAG = re.compile(r"\.[0-9a-f]{8}$")
+
+
+def image_id_from_filename(name: str) -> str:
+    """
+    Recover the image ID from a stored file name
+    
+    Args:
+        name: File name (e.g. "img-1.jpg", "img-1.thumb.jpg" or "img-1.3fa2c9e1.webp")
+        
+    Returns:
+        str: Image identifier
+    """
+    stem, _ = os.path.splitext(name)
+    for size in RenditionService.SIZES:
+        if stem.endswith(f".{size}"):
+            stem = stem[: -len(size) - 1]
+            break
+    return KEY_TAG.sub("", stem)
+
+
+def flat_files(root: Path) -> Iterator[str]:
+    """
+    Yield names of image files still stored directly under the root
+    
+    Args:
+        root: Image storage root
+        
+    Yields:
+        str: File names
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and not entry.name.endswith(".tmp"):
+                yield entry.name
+
+
+def move_file(image_service: ImageService, name: str, dry_run: bool) -> Optional[str]:
+    """
+    Move one file into its shard directory
+    
+    Args:
+        image_service: Image service (owns the layout)
+        name: File name under the storage root
+        dry_run: Only report what would be moved
+        
+    Returns:
+        Optional[str]: New storage key, or None if the move failed
+    """
+    prefix = image_service.shard_prefix(image_id_from_filename(name))
+    source = image_service.storage_path / name
+    target_dir = image_service.storage_path / prefix
+    if dry_run:
+        logger.info(f"Would move {source} -> {target_dir / name}")
+        return f"{prefix}/{name}"
+    
+    try:
+        target_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target_dir / name)
+        return f"{prefix}/{name}"
+    except OSError as e:
+        logger.error(f"Error moving {source}: {str(e)}")
+        return None
+
+
+async def migrate(workers: int, dry_run: bool) -> int:
+    """
+    Move all flat-layout files into shard directories and update their catalog rows
+    
+    Args:
+        workers: Number of parallel rename threads
+        dry_run: Only report what would be moved
+        
+    Returns:
+        int: Number of files that failed to move
+    """
+    image_service = ImageService()
+    names = flat_files(image_service.storage_path)
+    moved = failed = updated = 0
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Bounded batches keep memory flat on stores with millions of files
+        while True:
+            batch = list(islice(names, BATCH_SIZE))
+            if not batch:
+                break
+            keys = await asyncio.gather(*(
+                loop.run_in_executor(executor, move_file, image_service, name, dry_run)
+                for name in batch
+            ))
+            moves = {name: key for name, key in zip(batch, keys) if key}
+            moved += len(moves)
+            failed += len(batch) - len(moves)
+            
+            if moves and not dry_run:
+                # Flat keys are bare file names
+                async with AsyncSessionLocal() as session:
+                    updated += await StoredImageRepository(StoredImage, session).move_paths(moves)
+            logger.info(
+                f"Moved {moved} files ({failed} failed), {updated} catalog entries updated, "
+                f"{time.monotonic() - started:.1f}s"
+            )
+    
+    logger.info(f"Done: {moved} moved, {failed} failed")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="Parallel rename threads")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the moves")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if settings.IMAGE_STORAGE_BACKEND != "local":
+        logger.error("This command only applies to local image storage (IMAGE_STORAGE_BACKEND=local)")
+        sys.exit(2)
+    
+    failed = asyncio.run(migrate(args.workers, args.dry_run))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
+
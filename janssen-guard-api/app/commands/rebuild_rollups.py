@@ -0,0 +1,85 @@
+"""
+Rebuild the hourly patrol rollups from patrol_records
+
+Recomputes patrol_hourly_rollups one chunk of hours at a time, each in
+its own transaction (delete the chunk's rollups, INSERT ... SELECT
+GROUP BY from the records). New records keep being counted as they are
+inserted, so run this once to fill the table for existing history, then
+set REPORT_ROLLUPS_ENABLED=true. Re-running it for a range repairs the
+rollups after records were changed directly in the database.
+
+Usage (from the janssen-guard-api directory):
+    python -m app.commands.rebuild_rollups [--start TS] [--end TS] [--chunk-days 7]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from typing import Optional
+from app.database import AsyncSessionLocal
+from app.models.patrol_record import PatrolRecord
+from app.models.patrol_rollup import PatrolHourlyRollup
+from app.repositories.patrol_repository import PatrolRepository
+from app.repositories.rollup_repository import HOUR, RollupRepository, hour_of
+
+logger = logging.getLogger("rebuild_rollups")
+
+
+async def rebuild(start: Optional[int], end: Optional[int], chunk_days: int) -> int:
+    """
+    Rebuild the rollups of every hour touching [start, end]
+    
+    Args:
+        start: Earliest record time (Unix timestamp; default: first record)
+        end: Latest record time (Unix timestamp; default: last record)
+        chunk_days: Hours rebuilt per transaction, in days
+    
+    Returns:
+        int: Number of rollup rows written
+    """
+    async with AsyncSessionLocal() as session:
+        earliest, latest = await PatrolRepository(PatrolRecord, session).get_time_bounds()
+    start = earliest if start is None else start
+    end = latest if end is None else end
+    if start > end:
+        logger.info("Nothing to rebuild")
+        return 0
+    
+    chunk = chunk_days * 24 * HOUR
+    hour = hour_of(start)
+    last_hour = hour_of(end) + HOUR
+    written = 0
+    started = time.monotonic()
+    
+    while hour < last_hour:
+        chunk_end = min(hour + chunk, last_hour)
+        async with AsyncSessionLocal() as session:
+            written += await RollupRepository(PatrolHourlyRollup, session).rebuild(hour, chunk_end)
+        hour = chunk_end
+        done = (hour - hour_of(start)) / (last_hour - hour_of(start))
+        logger.info(f"Rebuilt up to {hour} ({done:.0%}), {written} rows, {time.monotonic() - started:.1f}s")
+    
+    logger.info(f"Done: {written} rollup rows")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=int, help="Earliest record time (Unix timestamp)")
+    parser.add_argument("--end", type=int, help="Latest record time (Unix timestamp)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days of hours rebuilt per transaction")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.chunk_days < 1:
+        parser.error("--chunk-days must be at least 1")
+    
+    asyncio.run(rebuild(args.start, args.end, args.chunk_days))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,485 @@
+"""
+Reconcile image storage with the patrol records that reference it
+
+Scans IMAGE_STORAGE_PATH with os.scandir in a process pool (one task per
+top-level shard directory) while patrol_records.image_id and the image
+catalog are streamed with server-side cursors, then compares them as sets:
+
+    missing        referenced by a record, no stored file
+    unlinked       referenced, file present but not (or wrongly) catalogued
+    stale          catalog entry whose file is gone
+    orphan entry   catalog entry no record references (e.g. failed captures)
+    orphan file    uncatalogued file no record references (e.g. interrupted deletes)
+
+With --repair, unlinked files are catalogued, stale entries are dropped
+and orphans older than --min-age minutes are deleted like delete_image
+does (entry, file once unreferenced, renditions; packed bytes stay in
+their segment). Orphans are re-checked against patrol_records first, so
+records created during the scan are safe. Stale entries are re-read
+first and kept if the row changed, its file exists again (e.g. the
+transcoder or packer moved it during the scan) or it was written less
+than --min-age minutes ago. Records are never modified: missing images
+can only be reported. Running API processes re-read removed entries
+after IMAGE_CATALOG_TTL_SECONDS.
+
+Usage (from the janssen-guard-api directory):
+    python -m app.commands.reconcile_images [--workers 8] [--repair] [--min-age 60] [--report FILE]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patrol_record import PatrolRecord
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+from app.repositories.patrol_repository import PatrolRepository
+from app.commands.build_image_catalog import is_original
+from app.commands.migrate_image_layout import image_id_from_filename
+from app.services.image_catalog import image_catalog
+from app.services.image_service import ImageService
+from app.storage.segments import SEGMENT_DIR, SEGMENT_SUFFIX
+
+logger = logging.getLogger("reconcile_images")
+
+BATCH_SIZE = 1000
+# Concurrent repairs (each one uses a database connection)
+REPAIR_CONCURRENCY = 10
+# Items of each kind written to the log (the report file has all of them)
+EXAMPLES = 10
+
+# Catalog entries are kept as (path, segment_offset) to bound memory
+Location = Tuple[str, Optional[int]]
+
+
+class StorageScan(NamedTuple):
+    """Original image files found in storage"""
+    keys: Set[str]  # Every original file key
+    files: Dict[str, str]  # Image ID -> key of the file named for it (sharded layout wins)
+    segments: Set[str]  # Segment file keys
+
+
+class Reconciliation(NamedTuple):
+    """Differences between storage, the catalog and the records"""
+    missing: List[str]
+    unlinked: List[Tuple[str, str]]  # (image ID, key)
+    stale: List[str]
+    orphan_entries: List[str]
+    orphan_files: List[str]
+    
+    def issues(self) -> int:
+        """Total number of differences"""
+        return sum(len(items) for items in self)
+
+
+def scan_tree(root: str, top: str) -> List[Tuple[str, str]]:
+    """
+    Find the original images under one top-level directory (process pool worker)
+    
+    Uses os.scandir, whose directory entries carry the file type, so
+    walking the tree costs no stat() calls.
+    
+    Args:
+        root: Image storage root
+        top: Directory name under the root
+    
+    Returns:
+        List[Tuple[str, str]]: (image ID, key) per original file
+    """
+    found = []
+    pending = [top]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, directory)) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(f"{directory}/{entry.name}")
+                    elif is_original(entry.name):
+                        found.append((image_id_from_filename(entry.name), f"{directory}/{entry.name}"))
+        except FileNotFoundError:
+            continue
+    return found
+
+
+def start_scan(root: Path, executor: ProcessPoolExecutor) -> Tuple[List[Tuple[str, str]], Set[str], List[Future]]:
+    """
+    List the storage root and submit one scan per top-level directory
+    
+    Args:
+        root: Image storage root
+        executor: Process pool
+    
+    Returns:
+        Tuple: Legacy flat-layout files as (image ID, key), segment keys and pending scans
+    """
+    flat, segments, scans = [], set(), []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name == SEGMENT_DIR:
+                    segments = {
+                        f"{SEGMENT_DIR}/{name}" for name in os.listdir(entry.path)
+                        if name.endswith(SEGMENT_SUFFIX)
+                    }
+                else:
+                    scans.append(executor.submit(scan_tree, str(root), entry.name))
+            elif is_original(entry.name):
+                flat.append((image_id_from_filename(entry.name), entry.name))
+    return flat, segments, scans
+
+
+async def finish_scan(flat: List[Tuple[str, str]], segments: Set[str], scans: List[Future]) -> StorageScan:
+    """
+    Collect the scan results
+    
+    Args:
+        flat: Legacy flat-layout files
+        segments: Segment keys
+        scans: Pending scans
+    
+    Returns:
+        StorageScan: Files found in storage
+    """
+    keys: Set[str] = set()
+    files: Dict[str, str] = {}
+    for image_id, key in flat:
+        keys.add(key)
+        files[image_id] = key
+    for found in await asyncio.gather(*(asyncio.wrap_future(scan) for scan in scans)):
+        for image_id, key in found:
+            keys.add(key)
+            files[image_id] = key
+    return StorageScan(keys, files, segments)
+
+
+async def load_referenced() -> Set[str]:
+    """Stream the image IDs used by patrol records"""
+    referenced: Set[str] = set()
+    async with AsyncSessionLocal() as session:
+        async for image_id in PatrolRepository(PatrolRecord, session).stream_image_ids():
+            referenced.add(image_id)
+    return referenced
+
+
+async def load_catalog() -> Dict[str, Location]:
+    """Stream the stored image catalog"""
+    catalog: Dict[str, Location] = {}
+    async with AsyncSessionLocal() as session:
+        async for row in StoredImageRepository(StoredImage, session).stream_catalog():
+            catalog[row.image_id] = (row.path, row.segment_offset)
+    return catalog
+
+
+def compare(referenced: Set[str], catalog: Dict[str, Location], scan: StorageScan) -> Reconciliation:
+    """
+    Compare records, catalog and storage
+    
+    Args:
+        referenced: Image IDs used by records
+        catalog: Catalog locations by image ID
+        scan: Files found in storage
+    
+    Returns:
+        Reconciliation: Differences found
+    """
+    def stored(location: Location) -> bool:
+        path, offset = location
+        return path in scan.segments if offset is not None else path in scan.keys
+    
+    stale = {image_id for image_id, location in catalog.items() if not stored(location)}
+    
+    # Keys that a referenced image resolves to
+    resolved: Set[str] = set()
+    missing, unlinked = [], []
+    for image_id in referenced:
+        location = catalog.get(image_id)
+        if location is not None and image_id not in stale:
+            resolved.add(location[0])
+            continue
+        key = scan.files.get(image_id)
+        if key is None:
+            missing.append(image_id)
+        else:
+            resolved.add(key)
+            unlinked.append((image_id, key))
+    
+    orphan_entries = [
+        image_id for image_id in catalog
+        if image_id not in referenced and image_id not in stale
+    ]
+    orphan_paths = {catalog[image_id][0] for image_id in orphan_entries}
+    orphan_files = [
+        key for key in scan.keys
+        if key not in resolved and key not in orphan_paths
+    ]
+    
+    return Reconciliation(
+        sorted(missing),
+        sorted(unlinked),
+        sorted(stale),
+        sorted(orphan_entries),
+        sorted(orphan_files)
+    )
+
+
+def batches(items: List, size: int) -> Iterable[List]:
+    """Split a list into consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def still_unreferenced(image_ids: Set[str]) -> Set[str]:
+    """
+    Re-check orphan candidates against patrol_records
+    
+    Args:
+        image_ids: Image IDs no record referenced during the scan
+    
+    Returns:
+        Set[str]: IDs that are still unreferenced
+    """
+    referenced: Set[str] = set()
+    async with AsyncSessionLocal() as session:
+        repo = PatrolRepository(PatrolRecord, session)
+        for batch in batches(sorted(image_ids), BATCH_SIZE):
+            referenced |= await repo.get_referenced_image_ids(batch)
+    return image_ids - referenced
+
+
+def modified_before(image_service: ImageService, key: str, cutoff: float) -> bool:
+    """
+    Check whether a stored file is old enough to be an orphan rather than in flight
+    
+    Args:
+        image_service: Image service
+        key: Storage key
+        cutoff: Unix time files must be older than
+    
+    Returns:
+        bool: True if older than cutoff or already gone
+    """
+    try:
+        return image_service.storage.local_path(key).stat().st_mtime < cutoff
+    except FileNotFoundError:
+        return True
+
+
+async def still_stale(image_service: ImageService, image_id: str, scanned: Location, cutoff: datetime) -> bool:
+    """
+    Check that a stale entry is still as scanned, old enough to change and its file still gone
+    
+    The transcoder and packer move files while the scan runs, and uploads
+    write the catalog row just after the file, so the entry is re-read and
+    its current file re-checked before it is dropped or overwritten.
+    
+    Args:
+        image_service: Image service
+        image_id: Image identifier
+        scanned: Location read during the scan
+        cutoff: Entries written after this (UTC) are left alone
+    
+    Returns:
+        bool: True if the entry may be repaired
+    """
+    async with AsyncSessionLocal() as session:
+        row = await StoredImageRepository(StoredImage, session).get_by_id(image_id)
+    if row is None or (row.path, row.segment_offset) != scanned:
+        return False
+    written = max((at for at in (row.created_at, row.transcoded_at) if at is not None), default=None)
+    if written is not None and written >= cutoff:
+        return False
+    return not await image_service.storage.exists(row.path)
+
+
+async def repair(
+    found: Reconciliation,
+    referenced: Set[str],
+    catalog: Dict[str, Location],
+    min_age_minutes: int
+) -> int:
+    """
+    Fix what can be fixed without touching records
+    
+    Args:
+        found: Differences found by compare()
+        referenced: Image IDs used by records during the scan
+        catalog: Catalog locations by image ID
+        min_age_minutes: Only delete orphans or drop stale entries older than this
+    
+    Returns:
+        int: Number of repairs that failed
+    """
+    image_service = ImageService()
+    cutoff = time.time() - min_age_minutes * 60
+    written_before = datetime.utcnow() - timedelta(minutes=min_age_minutes)
+    failed = 0
+    
+    async def run(action, items: List) -> int:
+        """Apply an action to every item; returns how many it applied to (not False)"""
+        nonlocal failed
+        applied = 0
+        for batch in batches(items, REPAIR_CONCURRENCY):
+            results = await asyncio.gather(*(action(item) for item in batch), return_exceptions=True)
+            for item, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    failed += 1
+                    logger.error(f"Repair of {item} failed: {str(result)}")
+                elif result is not False:
+                    applied += 1
+        return applied
+    
+    async def link(item: Tuple[str, str]) -> bool:
+        image_id, key = item
+        # A stale entry is overwritten; a new one must not replace an entry written since the scan
+        replace = image_id in catalog
+        if replace and not await still_stale(image_service, image_id, catalog[image_id], written_before):
+            return False
+        entry = await run_in_threadpool(image_service.describe_file, image_service.storage.local_path(key))
+        try:
+            await image_catalog.add(image_id, entry, replace=replace)
+        except IntegrityError:
+            return False
+        return True
+    
+    linked = await run(link, found.unlinked)
+    logger.info(f"Catalogued {linked} unlinked files ({len(found.unlinked) - linked} kept)")
+    
+    async def drop(image_id: str) -> bool:
+        if not await still_stale(image_service, image_id, catalog[image_id], written_before):
+            return False
+        await image_catalog.remove(image_id)
+        return True
+    
+    # Stale entries with a file to relink were handled above
+    relinked = {image_id for image_id, _ in found.unlinked}
+    stale = [image_id for image_id in found.stale if image_id not in relinked]
+    dropped = await run(drop, stale)
+    logger.info(f"Dropped {dropped} stale entries ({len(stale) - dropped} kept)")
+    
+    # Files named for an image some record used are leftovers whatever the
+    # records table says now; only IDs that were unreferenced are re-checked
+    file_ids = {key: image_id_from_filename(os.path.basename(key)) for key in found.orphan_files}
+    unreferenced = await still_unreferenced(
+        set(found.orphan_entries) | {image_id for image_id in file_ids.values() if image_id not in referenced}
+    )
+    
+    orphan_entries = [
+        image_id for image_id in found.orphan_entries
+        if image_id in unreferenced and (
+            catalog[image_id][1] is not None
+            or modified_before(image_service, catalog[image_id][0], cutoff)
+        )
+    ]
+    await run(image_service.delete_image, orphan_entries)
+    logger.info(f"Deleted {len(orphan_entries)} orphan entries ({len(found.orphan_entries) - len(orphan_entries)} kept)")
+    
+    async def delete_file(key: str) -> None:
+        await image_service.storage.delete(key)
+        await image_service.delete_renditions(key)
+    
+    orphan_files = [
+        key for key, image_id in file_ids.items()
+        if (image_id in referenced or image_id in unreferenced) and modified_before(image_service, key, cutoff)
+    ]
+    await run(delete_file, orphan_files)
+    logger.info(f"Deleted {len(orphan_files)} orphan files ({len(found.orphan_files) - len(orphan_files)} kept)")
+    
+    return failed
+
+
+def report(found: Reconciliation, report_path: Optional[str]) -> None:
+    """
+    Log a summary and optionally write every difference to a file
+    
+    Args:
+        found: Differences found
+        report_path: Tab-separated report file (kind, image ID or key[, key])
+    """
+    for kind, items in found._asdict().items():
+        logger.info(f"{kind}: {len(items)}")
+        for item in items[:EXAMPLES]:
+            logger.info(f"    {item}")
+    
+    if report_path:
+        with open(report_path, "w") as f:
+            for kind, items in found._asdict().items():
+                for item in items:
+                    fields = item if isinstance(item, tuple) else (item,)
+                    f.write("\t".join((kind, *fields)) + "\n")
+        logger.info(f"Report written to {report_path}")
+
+
+async def reconcile(
+    storage_scan: Tuple[List[Tuple[str, str]], Set[str], List[Future]],
+    do_repair: bool,
+    min_age_minutes: int,
+    report_path: Optional[str]
+) -> int:
+    """
+    Compare storage with the records and catalog, then report and optionally repair
+    
+    Args:
+        storage_scan: Scan started by start_scan()
+        do_repair: Apply repairs
+        min_age_minutes: Only delete orphans older than this
+        report_path: Optional report file
+    
+    Returns:
+        int: Number of problems left (missing images, or everything when not repairing)
+    """
+    started = time.monotonic()
+    # The database streams while the pool walks the tree
+    referenced, catalog, scan = await asyncio.gather(
+        load_referenced(),
+        load_catalog(),
+        finish_scan(*storage_scan)
+    )
+    logger.info(
+        f"{len(scan.keys)} files, {len(catalog)} catalog entries, "
+        f"{len(referenced)} referenced images, {time.monotonic() - started:.1f}s"
+    )
+    
+    found = compare(referenced, catalog, scan)
+    report(found, report_path)
+    if not do_repair:
+        return found.issues()
+    
+    failed = await repair(found, referenced, catalog, min_age_minutes)
+    logger.info(f"Repair done: {failed} failed, {time.monotonic() - started:.1f}s")
+    return len(found.missing) + failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Scanner processes")
+    parser.add_argument("--repair", action="store_true", help="Catalog unlinked files, drop stale entries, delete orphans")
+    parser.add_argument("--min-age", type=int, default=60, help="Minutes before an orphan or stale entry is repaired")
+    parser.add_argument("--report", help="Write every difference to this tab-separated file")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if settings.IMAGE_STORAGE_BACKEND != "local":
+        logger.error("This command only applies to local image storage (IMAGE_STORAGE_BACKEND=local)")
+        sys.exit(2)
+    
+    # Workers are forked before the event loop starts
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        storage_scan = start_scan(Path(settings.IMAGE_STORAGE_PATH), executor)
+        remaining = asyncio.run(reconcile(storage_scan, args.repair, args.min_age, args.report))
+    sys.exit(1 if remaining else 0)
+
+
+if __name__ == "__main__":
+    main()
+
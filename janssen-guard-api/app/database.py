@@ -4,6 +4,14 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
+# Server-side prepared statements where the driver supports them.
+# asyncpg prepares and caches every statement per connection; aiomysql
+# only offers client-side parameter interpolation, so for MySQL the
+# SQLAlchemy compiled cache (query_cache_size) is what saves the work.
+connect_args = {}
+if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+    connect_args["prepared_statement_cache_size"] = settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -11,7 +19,9 @@ engine = create_async_engine(
     future=True,
     pool_pre_ping=True,
     pool_size=10,
-    max_overflow=20
+    max_overflow=20,
+    query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+    connect_args=connect_args
 )
 
 # Create session factory
@@ -2,13 +2,23 @@
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
-from app.api.v1 import auth, patrol, health
+from app.api.v1 import auth, patrol, health, reports
 from app.config import settings
 from app.database import engine, Base
+from app.services.image_catalog import image_catalog
+from app.services.transcode_service import TranscodeService
+from app.services.pack_service import PackService
+from app.services.overdue_monitor import overdue_monitor
+from app.services.round_tracker import round_tracker
+from app.services.hot_store import hot_store
+from app.services.worker_lock import run_elected
+from app.utils.compression import MediaAwareGZipMiddleware
+from app.utils.process_pool import shutdown_process_pool
+from app.storage import close_storage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,8 +42,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# GZip compression (images and archives are passed through as-is)
+app.add_middleware(MediaAwareGZipMiddleware, minimum_size=1000)
 
 # Global exception handler for validation errors
 @app.exception_handler(RequestValidationError)
@@ -68,6 +78,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(patrol.router, tags=["Patrol"])
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
 app.include_router(health.router, tags=["Health"])
 
 # Legacy auth endpoint
@@ -76,9 +87,34 @@ app.include_router(auth.legacy_router, tags=["Legacy Authentication"])
 
 @app.on_event("startup")
 async def startup():
-    """Initialize database on startup"""
+    """Initialize database, warm the image catalog and patrol state, and start background work on startup"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await image_catalog.load()
+    await round_tracker.load()
+    if settings.HOT_STORE_ENABLED:
+        await hot_store.load()
+    
+    if settings.PATROL_OVERDUE_ENABLED:
+        await overdue_monitor.load()
+        app.state.overdue_monitor = asyncio.create_task(overdue_monitor.run_forever())
+    
+    # Image workers move files, so only one process across all replicas runs each
+    if settings.IMAGE_TRANSCODE_ENABLED:
+        app.state.transcoder = asyncio.create_task(run_elected("transcoder", TranscodeService().run_forever))
+    if settings.IMAGE_PACK_ENABLED:
+        app.state.packer = asyncio.create_task(run_elected("packer", PackService().run_forever))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background work and release image workers and storage connections on shutdown"""
+    for name in ("transcoder", "packer", "overdue_monitor"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    shutdown_process_pool()
+    await close_storage()
 
 
 @app.get("/")
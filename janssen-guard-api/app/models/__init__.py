@@ -2,6 +2,8 @@
 
 from app.models.user import User
 from app.models.patrol_record import PatrolRecord
+from app.models.stored_image import StoredImage
+from app.models.patrol_rollup import PatrolHourlyRollup
 
-__all__ = ["User", "PatrolRecord"]
+__all__ = ["User", "PatrolRecord", "StoredImage", "PatrolHourlyRollup"]
 
@@ -1,6 +1,6 @@
 """Patrol Record database model"""
 
-from sqlalchemy import Column, String, Integer, BigInteger, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, String, Integer, BigInteger, Text, TIMESTAMP, ForeignKey, Index, func
 import uuid
 from app.database import Base
 
@@ -9,6 +9,12 @@ class PatrolRecord(Base):
     """Patrol record model for storing patrol scan data"""
     
     __tablename__ = "patrol_records"
+    __table_args__ = (
+        # Keyset index for delta sync: (server_time, id) is the sync watermark
+        Index("ix_patrol_records_server_time_id", "server_time", "id"),
+        # Groupwise max for "latest scan per point" (loose index scan on MySQL)
+        Index("ix_patrol_records_point_time", "point", "time"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))  # MySQL uses CHAR(36) for UUID
     point = Column(String(10), nullable=False, index=True)
@@ -0,0 +1,20 @@
+"""Hourly patrol rollup database model"""
+
+from sqlalchemy import Column, String, Integer, BigInteger
+from app.database import Base
+
+
+class PatrolHourlyRollup(Base):
+    """Scan counts per hour, point and guard, kept in step with patrol_records"""
+    
+    __tablename__ = "patrol_hourly_rollups"
+    
+    # Primary key order serves hour-range scans
+    hour = Column(BigInteger, primary_key=True)  # Start of the hour of the record time (Unix timestamp)
+    point = Column(String(10), primary_key=True)
+    guard_name = Column(String(100), primary_key=True)
+    scans = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<PatrolHourlyRollup(hour={self.hour}, point='{self.point}', guard='{self.guard_name}', scans={self.scans})>"
+
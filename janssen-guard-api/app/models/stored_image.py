@@ -0,0 +1,30 @@
+"""Stored image catalog database model"""
+
+from sqlalchemy import Column, String, BigInteger, TIMESTAMP, Index, func
+from app.database import Base
+
+
+class StoredImage(Base):
+    """Catalog entry recording where and how an image is stored"""
+    
+    __tablename__ = "stored_images"
+    __table_args__ = (
+        # Background transcoder: oldest not-yet-transcoded images first
+        Index("ix_stored_images_transcode", "transcoded_at", "created_at"),
+        # Segment packer: oldest loose images first
+        Index("ix_stored_images_pack", "segment_offset", "created_at"),
+    )
+    
+    image_id = Column(String(100), primary_key=True)
+    path = Column(String(255), nullable=False)  # Storage key (relative to IMAGE_STORAGE_PATH)
+    segment_offset = Column(BigInteger, nullable=True)  # Byte offset when packed into a segment file at path
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(50), nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    duplicate_of = Column(String(100), nullable=True)  # First image with the same bytes (shares its path)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    transcoded_at = Column(TIMESTAMP, nullable=True)  # Set once the transcoder has processed it
+    
+    def __repr__(self):
+        return f"<StoredImage(image_id='{self.image_id}', path='{self.path}')>"
+
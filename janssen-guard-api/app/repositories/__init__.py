@@ -1,8 +1,10 @@
 """Data access layer - Repositories"""
 
+from app.repositories.filter_spec import FilterSpec
 from app.repositories.base_repository import BaseRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.patrol_repository import PatrolRepository
+from app.repositories.image_repository import StoredImageRepository
 
-__all__ = ["BaseRepository", "UserRepository", "PatrolRepository"]
+__all__ = ["FilterSpec", "BaseRepository", "UserRepository", "PatrolRepository", "StoredImageRepository"]
 
@@ -2,8 +2,8 @@
 
 from typing import Generic, TypeVar, Type, Optional, List, Tuple, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 from sqlalchemy.orm import DeclarativeMeta
+from app.repositories.filter_spec import FilterSpec
 
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
 
@@ -21,6 +21,7 @@ class BaseRepository(Generic[ModelType]):
         """
         self.model = model
         self.db = db
+        self.spec = FilterSpec.for_model(model)
     
     async def get_by_id(self, id: Any) -> Optional[ModelType]:
         """
@@ -32,9 +33,24 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Optional[ModelType]: Entity or None if not found
         """
-        result = await self.db.execute(
-            select(self.model).where(self.model.id == id)
-        )
+        return await self.get_one_by(self.spec.primary_key, id)
+    
+    async def get_one_by(self, field: str, value: Any) -> Optional[ModelType]:
+        """
+        Get a single entity by a unique column
+        
+        Uses the cached, parameterized statement for the column, so hot
+        lookups skip statement construction and SQL compilation.
+        
+        Args:
+            field: Column name
+            value: Column value
+            
+        Returns:
+            Optional[ModelType]: Entity or None if not found
+        """
+        query, params = self.spec.compile("rows", {field: value})
+        result = await self.db.execute(query, params)
         return result.scalar_one_or_none()
     
     async def get_all(
@@ -46,32 +62,20 @@ class BaseRepository(Generic[ModelType]):
         Get all entities with optional filtering
         
         Args:
-            filters: Dictionary of filters
+            filters: Dictionary of filters (operators are listed in filter_spec.OPERATORS)
             order_by: List of fields to order by
             
         Returns:
             Tuple[List[ModelType], int]: List of entities and total count
         """
-        query = select(self.model)
-        
-        # Apply filters
-        if filters:
-            query = self._apply_filters(query, filters)
-        
-        # Apply ordering
-        if order_by:
-            query = self._apply_ordering(query, order_by)
-        
-        # Get results
-        result = await self.db.execute(query)
+        # Statements are cached per filter shape; only the values change
+        query, params = self.spec.compile("rows", filters, order_by)
+        result = await self.db.execute(query, params)
         entities = result.scalars().all()
         
         # Get total count
-        count_query = select(func.count()).select_from(self.model)
-        if filters:
-            count_query = self._apply_filters(count_query, filters)
-        
-        total_result = await self.db.execute(count_query)
+        count_query, params = self.spec.compile("count", filters)
+        total_result = await self.db.execute(count_query, params)
         total = total_result.scalar()
         
         return list(entities), total
@@ -89,36 +93,25 @@ class BaseRepository(Generic[ModelType]):
         Args:
             page: Page number (1-indexed)
             limit: Number of items per page
-            filters: Dictionary of filters
+            filters: Dictionary of filters (operators are listed in filter_spec.OPERATORS)
             order_by: List of fields to order by
             
         Returns:
             Tuple[List[ModelType], int]: List of entities and total count
         """
-        query = select(self.model)
-        
-        # Apply filters
-        if filters:
-            query = self._apply_filters(query, filters)
-        
-        # Apply ordering
-        if order_by:
-            query = self._apply_ordering(query, order_by)
+        query, params = self.spec.compile("rows", filters, order_by, paginate=True)
         
         # Apply pagination
-        offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+        params["_limit"] = limit
+        params["_offset"] = (page - 1) * limit
         
         # Get results
-        result = await self.db.execute(query)
+        result = await self.db.execute(query, params)
         entities = result.scalars().all()
         
         # Get total count
-        count_query = select(func.count()).select_from(self.model)
-        if filters:
-            count_query = self._apply_filters(count_query, filters)
-        
-        total_result = await self.db.execute(count_query)
+        count_query, params = self.spec.compile("count", filters)
+        total_result = await self.db.execute(count_query, params)
         total = total_result.scalar()
         
         return list(entities), total
@@ -178,59 +171,4 @@ class BaseRepository(Generic[ModelType]):
         await self.db.delete(entity)
         await self.db.commit()
         return True
-    
-    def _apply_filters(self, query, filters: Dict):
-        """
-        Apply filters to query
-        
-        Args:
-            query: SQLAlchemy query
-            filters: Dictionary of filters
-            
-        Returns:
-            Modified query
-        """
-        for key, value in filters.items():
-            if "__" in key:
-                # Handle special filters (e.g., field__gte, field__like)
-                field, operator = key.rsplit("__", 1)
-                column = getattr(self.model, field)
-                
-                if operator == "gte":
-                    query = query.where(column >= value)
-                elif operator == "lte":
-                    query = query.where(column <= value)
-                elif operator == "like":
-                    query = query.where(column.like(value))
-                elif operator == "ne":
-                    query = query.where(column != value)
-            else:
-                # Exact match
-                column = getattr(self.model, key)
-                query = query.where(column == value)
-        
-        return query
-    
-    def _apply_ordering(self, query, order_by: List[str]):
-        """
-        Apply ordering to query
-        
-        Args:
-            query: SQLAlchemy query
-            order_by: List of fields to order by (prefix with - for descending)
-            
-        Returns:
-            Modified query
-        """
-        for field in order_by:
-            if field.startswith("-"):
-                # Descending
-                column = getattr(self.model, field[1:])
-                query = query.order_by(column.desc())
-            else:
-                # Ascending
-                column = getattr(self.model, field)
-                query = query.order_by(column.asc())
-        
-        return query
 
@@ -0,0 +1,220 @@
+"""Compiled filter and ordering specs for repositories"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy import select, func, bindparam, inspect, or_
+from sqlalchemy.sql import Select
+
+LIKE_ESCAPE = "/"
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the value is matched literally"""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", f"{LIKE_ESCAPE}%")
+        .replace("_", f"{LIKE_ESCAPE}_")
+    )
+
+
+# Operator -> (clause builder, bind value converter)
+# Builders receive the column and the bind parameter name (and, for
+# VARIADIC operators, the number of values) and return a WHERE clause;
+# converters map the filter value to bind parameter values.
+OPERATORS: Dict[str, Tuple[Callable, Callable[[str, Any], Dict[str, Any]]]] = {
+    "eq": (lambda col, name: col == bindparam(name), lambda name, v: {name: v}),
+    "ne": (lambda col, name: col != bindparam(name), lambda name, v: {name: v}),
+    "gt": (lambda col, name: col > bindparam(name), lambda name, v: {name: v}),
+    "gte": (lambda col, name: col >= bindparam(name), lambda name, v: {name: v}),
+    "lt": (lambda col, name: col < bindparam(name), lambda name, v: {name: v}),
+    "lte": (lambda col, name: col <= bindparam(name), lambda name, v: {name: v}),
+    "like": (lambda col, name: col.like(bindparam(name)), lambda name, v: {name: v}),
+    "in": (
+        lambda col, name: col.in_(bindparam(name, expanding=True)),
+        lambda name, v: {name: list(v)}
+    ),
+    "between": (
+        lambda col, name: col.between(bindparam(f"{name}_lo"), bindparam(f"{name}_hi")),
+        lambda name, v: {f"{name}_lo": v[0], f"{name}_hi": v[1]}
+    ),
+    "prefix": (
+        lambda col, name: col.like(bindparam(name), escape=LIKE_ESCAPE),
+        lambda name, v: {name: f"{_escape_like(v)}%"}
+    ),
+    # Substring match on any of several values (LIKE %v1% OR LIKE %v2% ...)
+    "contains_any": (
+        lambda col, name, count: or_(*(
+            col.like(bindparam(f"{name}_{index}"), escape=LIKE_ESCAPE) for index in range(count)
+        )),
+        lambda name, v: {f"{name}_{index}": f"%{_escape_like(item)}%" for index, item in enumerate(v)}
+    ),
+    # NULL comparisons cannot go through a bind parameter
+    "isnull": (lambda col, name: col.is_(None), lambda name, v: {}),
+    "notnull": (lambda col, name: col.is_not(None), lambda name, v: {}),
+}
+
+# Operators whose clause depends on the number of values (part of the filter shape)
+VARIADIC = {"contains_any"}
+
+
+class FilterSpec:
+    """
+    Filter and ordering compiler bound to a single model
+    
+    Filters use the "field" / "field__operator" dictionary syntax
+    (e.g. {"point__in": ["1", "2"], "time__between": (start, end)}).
+    Column lookups and key parsing happen once per model, and statements
+    are built with bind parameters and cached per filter shape, so
+    repeated queries only supply new parameter values.
+    """
+    
+    _specs: Dict[type, "FilterSpec"] = {}
+    
+    @classmethod
+    def for_model(cls, model: type) -> "FilterSpec":
+        """
+        Get the (shared) spec for a model
+        
+        Args:
+            model: SQLAlchemy model class
+        
+        Returns:
+            FilterSpec: Spec compiled for the model
+        """
+        spec = cls._specs.get(model)
+        if spec is None:
+            spec = cls._specs[model] = cls(model)
+        return spec
+    
+    def __init__(self, model: type):
+        """
+        Initialize spec for a model
+        
+        Args:
+            model: SQLAlchemy model class
+        """
+        self.model = model
+        self.primary_key = inspect(model).primary_key[0].key
+        self.columns = {
+            attr.key: getattr(model, attr.key)
+            for attr in inspect(model).column_attrs
+        }
+        self._keys: Dict[str, Tuple[str, str, str]] = {}
+        self._orderings: Dict[Tuple[str, ...], List] = {}
+        self._statements: Dict[Hashable, Select] = {}
+    
+    def parse_key(self, key: str) -> Tuple[str, str, str]:
+        """
+        Resolve a filter key into field, operator and bind parameter name
+        
+        Args:
+            key: Filter key ("field" or "field__operator")
+        
+        Returns:
+            Tuple[str, str, str]: Field name, operator and parameter name
+        
+        Raises:
+            ValueError: If the field or operator is unknown
+        """
+        parsed = self._keys.get(key)
+        if parsed is None:
+            field, sep, operator = key.rpartition("__")
+            if not sep:
+                field, operator = key, "eq"
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown filter operator: {operator}")
+            if field not in self.columns:
+                raise ValueError(f"Unknown filter field: {field}")
+            parsed = self._keys[key] = (field, operator, f"{field}__{operator}")
+        return parsed
+    
+    def compile(
+        self,
+        kind: str,
+        filters: Optional[Dict] = None,
+        order_by: Optional[List[str]] = None,
+        paginate: bool = False
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        Get the cached statement for a filter shape and its bind parameters
+        
+        Args:
+            kind: "rows" to select entities or "count" to count them
+            filters: Dictionary of filters
+            order_by: List of fields to order by (prefix with - for descending)
+            paginate: Add :_limit / :_offset parameters
+        
+        Returns:
+            Tuple[Select, Dict[str, Any]]: Statement and parameters to execute it with
+        """
+        terms = []
+        params: Dict[str, Any] = {}
+        for key, value in (filters or {}).items():
+            field, operator, name = self.parse_key(key)
+            # "= NULL" never matches, so None switches to IS [NOT] NULL
+            if value is None and operator in ("eq", "ne"):
+                operator = "isnull" if operator == "eq" else "notnull"
+            terms.append((field, operator, name, len(value) if operator in VARIADIC else None))
+            params.update(OPERATORS[operator][1](name, value))
+        terms.sort()
+        
+        ordering = tuple(order_by or ()) if kind == "rows" else ()
+        shape = (kind, tuple(terms), ordering, paginate)
+        statement = self._statements.get(shape)
+        if statement is None:
+            statement = self._statements[shape] = self._build(kind, terms, ordering, paginate)
+        return statement, params
+    
+    def order_clauses(self, order_by: Tuple[str, ...]) -> List:
+        """
+        Resolve an order_by list into ORDER BY clauses
+        
+        Args:
+            order_by: Fields to order by (prefix with - for descending)
+        
+        Returns:
+            List: Column ordering clauses
+        
+        Raises:
+            ValueError: If a field is unknown
+        """
+        clauses = self._orderings.get(order_by)
+        if clauses is None:
+            clauses = []
+            for field in order_by:
+                descending = field.startswith("-")
+                name = field[1:] if descending else field
+                if name not in self.columns:
+                    raise ValueError(f"Unknown order field: {name}")
+                column = self.columns[name]
+                clauses.append(column.desc() if descending else column.asc())
+            self._orderings[order_by] = clauses
+        return clauses
+    
+    def _build(
+        self,
+        kind: str,
+        terms: List[Tuple[str, str, str, Optional[int]]],
+        ordering: Tuple[str, ...],
+        paginate: bool
+    ) -> Select:
+        """Build the statement for a filter shape"""
+        if kind == "count":
+            statement = select(func.count()).select_from(self.model)
+        else:
+            statement = select(self.model)
+        
+        for field, operator, name, count in terms:
+            builder = OPERATORS[operator][0]
+            if count is None:
+                statement = statement.where(builder(self.columns[field], name))
+            else:
+                statement = statement.where(builder(self.columns[field], name, count))
+        
+        if ordering:
+            statement = statement.order_by(*self.order_clauses(ordering))
+        
+        if paginate:
+            statement = statement.limit(bindparam("_limit")).offset(bindparam("_offset"))
+        
+        return statement
+
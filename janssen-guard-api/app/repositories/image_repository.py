@@ -0,0 +1,318 @@
+"""Stored image catalog repository for database operations"""
+
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from sqlalchemy import select, update, bindparam, func, String
+from app.repositories.base_repository import BaseRepository
+from app.models.stored_image import StoredImage
+
+_CATALOG_ROWS = select(
+    StoredImage.image_id,
+    StoredImage.path,
+    StoredImage.size,
+    StoredImage.content_type,
+    StoredImage.sha256,
+    StoredImage.segment_offset
+)
+
+_BY_SHA256 = (
+    select(StoredImage)
+    .where(StoredImage.sha256 == bindparam("sha256"))
+    .order_by(StoredImage.created_at.asc())
+    .limit(1)
+)
+
+_IDS_BY_PATH = select(StoredImage.image_id, StoredImage.path).where(
+    StoredImage.path.in_(bindparam("paths", expanding=True))
+)
+
+_REFERENCE_COUNT = (
+    select(func.count())
+    .select_from(StoredImage)
+    .where(StoredImage.path == bindparam("path"))
+)
+
+_TRANSCODE_CANDIDATES = (
+    select(StoredImage)
+    .where(StoredImage.transcoded_at.is_(None))
+    .where(StoredImage.segment_offset.is_(None))
+    .where(StoredImage.created_at < bindparam("created_before"))
+    .order_by(StoredImage.created_at.asc())
+    .limit(bindparam("limit"))
+)
+
+_PACK_CANDIDATES = (
+    select(StoredImage)
+    .where(StoredImage.segment_offset.is_(None))
+    .where(StoredImage.created_at < bindparam("created_before"))
+    .order_by(StoredImage.created_at.asc())
+    .limit(bindparam("limit"))
+)
+
+# Images share a path when they are duplicates, so moves update every reference
+_TABLE = StoredImage.__table__
+_MARK_PACKED = (
+    _TABLE.update()
+    .where(_TABLE.c.path == bindparam("loose_path"))
+    .where(_TABLE.c.sha256 == bindparam("loose_sha256"))
+    .values(path=bindparam("packed_path"), segment_offset=bindparam("packed_offset"))
+)
+
+# Layout migration: loose files renamed to a new key
+_MOVE_PATH = (
+    _TABLE.update()
+    .where(_TABLE.c.path == bindparam("old_path"))
+    .where(_TABLE.c.segment_offset.is_(None))
+    .values(path=bindparam("new_path"))
+)
+
+# A duplicate copies its original's location inside the insert, so it can
+# never record a loose path the packer has just moved into a segment
+_INSERT_DUPLICATE = _TABLE.insert().from_select(
+    ["image_id", "path", "segment_offset", "size", "content_type", "sha256", "duplicate_of", "transcoded_at"],
+    select(
+        bindparam("new_image_id", type_=String),
+        _TABLE.c.path,
+        _TABLE.c.segment_offset,
+        _TABLE.c.size,
+        _TABLE.c.content_type,
+        _TABLE.c.sha256,
+        bindparam("original_id", type_=String),
+        _TABLE.c.transcoded_at
+    ).where(_TABLE.c.image_id == bindparam("original_id"))
+)
+
+# Deleting an original hands its role to its oldest duplicate
+_FIRST_DUPLICATE = (
+    select(StoredImage.image_id)
+    .where(StoredImage.duplicate_of == bindparam("image_id"))
+    .order_by(StoredImage.created_at.asc(), StoredImage.image_id.asc())
+    .limit(1)
+)
+_REPOINT_DUPLICATES = (
+    _TABLE.update()
+    .where(_TABLE.c.duplicate_of == bindparam("original_id"))
+    .values(duplicate_of=bindparam("successor_id"))
+)
+_CLEAR_DUPLICATE_OF = (
+    _TABLE.update()
+    .where(_TABLE.c.image_id == bindparam("successor_id"))
+    .values(duplicate_of=None)
+)
+
+
+class StoredImageRepository(BaseRepository[StoredImage]):
+    """Repository for the stored image catalog"""
+    
+    async def save(self, data: Dict, replace: bool = False) -> StoredImage:
+        """
+        Insert a catalog entry
+        
+        Args:
+            data: Catalog entry fields (including image_id)
+            replace: Overwrite an existing entry instead of failing
+            
+        Returns:
+            StoredImage: Saved entry
+            
+        Raises:
+            IntegrityError: If the image ID is already catalogued (without replace)
+        """
+        if replace:
+            entity = await self.db.merge(StoredImage(**data))
+        else:
+            entity = StoredImage(**data)
+            self.db.add(entity)
+        await self.db.commit()
+        return entity
+    
+    async def add_many(self, rows: List[Dict]) -> None:
+        """
+        Insert new catalog entries in one transaction
+        
+        Args:
+            rows: Catalog entry fields (including image_id)
+        """
+        self.db.add_all([StoredImage(**row) for row in rows])
+        await self.db.commit()
+    
+    async def insert_duplicate(self, image_id: str, duplicate_of: str) -> bool:
+        """
+        Add an entry sharing another image's stored file (not committed)
+        
+        Args:
+            image_id: New image identifier
+            duplicate_of: Image whose file, as currently catalogued, is shared
+            
+        Returns:
+            bool: False if duplicate_of no longer exists
+        """
+        result = await self.db.execute(_INSERT_DUPLICATE, {"new_image_id": image_id, "original_id": duplicate_of})
+        return result.rowcount > 0
+    
+    async def delete_entry(self, image_id: str) -> bool:
+        """
+        Delete a catalog entry, re-pointing its duplicates in the same transaction
+        
+        When the image is the original of duplicates, the oldest duplicate
+        becomes the original and the others reference it.
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            bool: True if deleted, False if not found
+        """
+        entity = await self.get_by_id(image_id)
+        if not entity:
+            return False
+        
+        await self.db.delete(entity)
+        successor = (await self.db.execute(_FIRST_DUPLICATE, {"image_id": image_id})).scalar_one_or_none()
+        if successor is not None:
+            params = {"original_id": image_id, "successor_id": successor}
+            await self.db.execute(_REPOINT_DUPLICATES, params)
+            await self.db.execute(_CLEAR_DUPLICATE_OF, params)
+        await self.db.commit()
+        return True
+    
+    async def get_by_sha256(self, sha256: str) -> Optional[StoredImage]:
+        """
+        Get the first stored image with the given content hash
+        
+        Args:
+            sha256: Hex SHA-256 of the image bytes
+            
+        Returns:
+            Optional[StoredImage]: Oldest entry with these bytes or None
+        """
+        result = await self.db.execute(_BY_SHA256, {"sha256": sha256})
+        return result.scalar_one_or_none()
+    
+    async def get_image_ids_by_path(self, paths: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Get the images stored at each path (an image and its duplicates)
+        
+        Args:
+            paths: Storage keys
+            
+        Returns:
+            Dict[str, List[str]]: Image IDs per path
+        """
+        result = await self.db.execute(_IDS_BY_PATH, {"paths": list(paths)})
+        image_ids: Dict[str, List[str]] = {}
+        for image_id, path in result:
+            image_ids.setdefault(path, []).append(image_id)
+        return image_ids
+    
+    async def count_references(self, path: str) -> int:
+        """
+        Count the images stored at a path
+        
+        Args:
+            path: Storage key
+            
+        Returns:
+            int: Number of catalog entries using the path
+        """
+        result = await self.db.execute(_REFERENCE_COUNT, {"path": path})
+        return result.scalar_one()
+    
+    async def get_transcode_candidates(self, created_before: datetime, limit: int) -> List[StoredImage]:
+        """
+        Get the oldest images the transcoder has not processed yet
+        
+        Args:
+            created_before: Only images catalogued before this time
+            limit: Maximum number of images
+            
+        Returns:
+            List[StoredImage]: Entries ordered by created_at ascending
+        """
+        result = await self.db.execute(
+            _TRANSCODE_CANDIDATES,
+            {"created_before": created_before, "limit": limit}
+        )
+        return list(result.scalars().all())
+    
+    async def mark_transcoded(self, path: str, data: Dict) -> None:
+        """
+        Record the transcoder's result for the images stored at a path
+        
+        Args:
+            path: Storage key that was transcoded
+            data: Changed catalog fields (empty if the image was kept as is)
+        """
+        await self.db.execute(
+            update(StoredImage)
+            .where(StoredImage.path == path)
+            .values(**data, transcoded_at=datetime.utcnow())
+        )
+        await self.db.commit()
+    
+    async def get_pack_candidates(
+        self,
+        created_before: datetime,
+        limit: int,
+        transcoded_only: bool = False
+    ) -> List[StoredImage]:
+        """
+        Get the oldest images still stored as loose files
+        
+        Args:
+            created_before: Only images catalogued before this time
+            limit: Maximum number of images
+            transcoded_only: Skip images the transcoder has not processed yet
+            
+        Returns:
+            List[StoredImage]: Entries ordered by created_at ascending
+        """
+        query = _PACK_CANDIDATES
+        if transcoded_only:
+            query = query.where(StoredImage.transcoded_at.is_not(None))
+        result = await self.db.execute(query, {"created_before": created_before, "limit": limit})
+        return list(result.scalars().all())
+    
+    async def mark_packed(self, rows: List[Dict]) -> None:
+        """
+        Point images at their new segment locations in one transaction
+        
+        Args:
+            rows: {"loose_path", "loose_sha256", "packed_path", "packed_offset"} per packed file
+        """
+        await self.db.execute(_MARK_PACKED, rows)
+        await self.db.commit()
+    
+    async def move_paths(self, moves: Dict[str, str]) -> int:
+        """
+        Point the images stored at renamed loose files at their new keys in one transaction
+        
+        Args:
+            moves: Old key -> new key
+            
+        Returns:
+            int: Number of catalog entries updated
+        """
+        result = await self.db.execute(
+            _MOVE_PATH,
+            [{"old_path": old, "new_path": new} for old, new in moves.items()]
+        )
+        await self.db.commit()
+        return result.rowcount
+    
+    async def stream_catalog(self, batch_size: int = 5000) -> AsyncIterator:
+        """
+        Stream catalog rows without loading the table into memory
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Row: (image_id, path, size, content_type, sha256, segment_offset)
+        """
+        result = await self.db.stream(
+            _CATALOG_ROWS.execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
+
@@ -1,7 +1,126 @@
 """Patrol record repository for database operations"""
 
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, and_, or_, bindparam, func, literal_column
 from app.repositories.base_repository import BaseRepository
 from app.models.patrol_record import PatrolRecord
+from app.models.stored_image import StoredImage
+from app.models.patrol_rollup import PatrolHourlyRollup
+from app.repositories.image_repository import StoredImageRepository
+from app.repositories.rollup_repository import RollupRepository, hour_of_day
+
+# Delta-sync statements are built once; calls only bind new values
+_CHANGES_ORDER = (PatrolRecord.server_time.asc(), PatrolRecord.id.asc())
+_CHANGES_FROM_START = (
+    select(PatrolRecord)
+    .order_by(*_CHANGES_ORDER)
+    .limit(bindparam("limit"))
+)
+_CHANGES_AFTER_TIME = (
+    select(PatrolRecord)
+    .where(PatrolRecord.server_time > bindparam("server_time"))
+    .order_by(*_CHANGES_ORDER)
+    .limit(bindparam("limit"))
+)
+_CHANGES_AFTER_RECORD = (
+    select(PatrolRecord)
+    .where(
+        or_(
+            PatrolRecord.server_time > bindparam("server_time"),
+            and_(
+                PatrolRecord.server_time == bindparam("server_time"),
+                PatrolRecord.id > bindparam("record_id")
+            )
+        )
+    )
+    .order_by(*_CHANGES_ORDER)
+    .limit(bindparam("limit"))
+)
+
+# Latest record per point: the GROUP BY reads one (point, time) index entry
+# per point, then each winner is fetched through the same index
+_LATEST_TIMES = (
+    select(PatrolRecord.point, func.max(PatrolRecord.time).label("time"))
+    .group_by(PatrolRecord.point)
+    .subquery("latest")
+)
+_LATEST_PER_POINT = (
+    select(PatrolRecord)
+    .join(
+        _LATEST_TIMES,
+        and_(
+            PatrolRecord.point == _LATEST_TIMES.c.point,
+            PatrolRecord.time == _LATEST_TIMES.c.time
+        )
+    )
+    .order_by(
+        PatrolRecord.point.asc(),
+        PatrolRecord.server_time.desc(),
+        PatrolRecord.id.desc()
+    )
+)
+
+# Images per point and how many were byte-identical to an earlier image
+_DUPLICATE_COUNTS = (
+    select(
+        PatrolRecord.point,
+        func.count().label("images"),
+        func.count(StoredImage.duplicate_of).label("duplicates")
+    )
+    .join(StoredImage, StoredImage.image_id == PatrolRecord.image_id)
+    .where(PatrolRecord.time.between(bindparam("start_time"), bindparam("end_time")))
+    .group_by(PatrolRecord.point)
+)
+
+# Scans per (point, guard) in a time range: one row per group, never per record
+_SCAN_COUNTS = (
+    select(PatrolRecord.point, PatrolRecord.guard_name, func.count().label("scans"))
+    .where(PatrolRecord.time.between(bindparam("start_time"), bindparam("end_time")))
+    .group_by(PatrolRecord.point, PatrolRecord.guard_name)
+)
+# Scans per local hour of day and point (activity heatmap): at most 24 rows per point
+_HOUR_POINT_COUNTS = (
+    select(hour_of_day(PatrolRecord.time), PatrolRecord.point, func.count().label("scans"))
+    .where(PatrolRecord.time.between(bindparam("start_time"), bindparam("end_time")))
+    .group_by(literal_column("hour_of_day"), PatrolRecord.point)
+)
+_TIME_BOUNDS = select(func.min(PatrolRecord.time), func.max(PatrolRecord.time))
+
+# Visits grouped by point, in time order within each point ((point, time) index order)
+_POINT_VISITS = (
+    select(PatrolRecord.point, PatrolRecord.time, PatrolRecord.guard_name, PatrolRecord.id)
+    .where(PatrolRecord.time.between(bindparam("start_time"), bindparam("end_time")))
+    .order_by(PatrolRecord.point.asc(), PatrolRecord.time.asc(), PatrolRecord.id.asc())
+)
+
+# Bare scans for the coverage analysis (sorted in memory, so no ORDER BY)
+_SCANS = (
+    select(PatrolRecord.point, PatrolRecord.guard_name, PatrolRecord.time)
+    .where(PatrolRecord.time.between(bindparam("start_time"), bindparam("end_time")))
+)
+
+# Every column of the records from a time on, oldest first (hot store warm-up)
+_RECENT_RECORDS = (
+    select(
+        PatrolRecord.id,
+        PatrolRecord.point,
+        PatrolRecord.guard_name,
+        PatrolRecord.time,
+        PatrolRecord.server_time,
+        PatrolRecord.image_id,
+        PatrolRecord.note
+    )
+    .where(PatrolRecord.time >= bindparam("start_time"))
+    .order_by(PatrolRecord.time.asc(), PatrolRecord.id.asc())
+)
+
+# Image references for storage reconciliation
+_RECORD_IMAGE_IDS = select(PatrolRecord.image_id).where(PatrolRecord.image_id != "")
+_REFERENCED_IMAGE_IDS = (
+    select(PatrolRecord.image_id)
+    .where(PatrolRecord.image_id.in_(bindparam("image_ids", expanding=True)))
+    .distinct()
+)
 
 
 class PatrolRepository(BaseRepository[PatrolRecord]):
@@ -10,5 +129,291 @@ class PatrolRepository(BaseRepository[PatrolRecord]):
     
     Inherits all common CRUD operations from BaseRepository
     """
-    pass
+    
+    async def create(self, data: Dict) -> PatrolRecord:
+        """
+        Create a record and count it in its hourly rollup in one transaction
+        
+        Args:
+            data: Patrol record fields
+            
+        Returns:
+            PatrolRecord: Created record
+        """
+        record = PatrolRecord(**data)
+        self.db.add(record)
+        await RollupRepository(PatrolHourlyRollup, self.db).add_scans([data])
+        await self.db.commit()
+        await self.db.refresh(record)
+        return record
+    
+    async def create_with_image(self, record_data: Dict, image_data: Dict) -> PatrolRecord:
+        """
+        Create a record together with its image's catalog entry and rollup count in one transaction
+        
+        Args:
+            record_data: Patrol record fields
+            image_data: Stored image fields (including image_id)
+            
+        Returns:
+            PatrolRecord: Created record
+            
+        Raises:
+            RuntimeError: If the image is a duplicate whose original was deleted meanwhile
+        """
+        if image_data.get("duplicate_of"):
+            # Copies the original's current location (it may have been packed)
+            image_repo = StoredImageRepository(StoredImage, self.db)
+            if not await image_repo.insert_duplicate(image_data["image_id"], image_data["duplicate_of"]):
+                raise RuntimeError(f"Image {image_data['duplicate_of']} was deleted; upload the photo again")
+        else:
+            # Never replaces an existing entry: the image ID is the primary key
+            self.db.add(StoredImage(**image_data))
+        record = PatrolRecord(**record_data)
+        self.db.add(record)
+        await RollupRepository(PatrolHourlyRollup, self.db).add_scans([record_data])
+        await self.db.commit()
+        await self.db.refresh(record)
+        return record
+    
+    async def get_changed_since(
+        self,
+        server_time: Optional[int] = None,
+        record_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[PatrolRecord]:
+        """
+        Get records that come after a (server_time, id) watermark
+        
+        Uses keyset pagination on the (server_time, id) index, so each call
+        only touches the index entries it returns - no OFFSET, no COUNT.
+        
+        Args:
+            server_time: Watermark server timestamp (None to start from the beginning)
+            record_id: Watermark record ID (None to include all records at server_time + 1 onwards)
+            limit: Maximum number of records to return
+        
+        Returns:
+            List[PatrolRecord]: Records ordered by (server_time, id) ascending
+        """
+        params = {"server_time": server_time, "record_id": record_id, "limit": limit}
+        if server_time is None:
+            query = _CHANGES_FROM_START
+        elif record_id is None:
+            query = _CHANGES_AFTER_TIME
+        else:
+            query = _CHANGES_AFTER_RECORD
+        
+        result = await self.db.execute(query, params)
+        return list(result.scalars().all())
+    
+    async def get_image_ids(self, filters: Dict, limit: int) -> List[str]:
+        """
+        Get the image IDs of matching records, oldest first
+        
+        Args:
+            filters: Dictionary of filters (operators are listed in filter_spec.OPERATORS)
+            limit: Maximum number of image IDs to return
+            
+        Returns:
+            List[str]: Image IDs ordered by record time
+        """
+        query, params = self.spec.compile(
+            "rows",
+            {**filters, "image_id__ne": ""},
+            ["time", "id"],
+            paginate=True
+        )
+        params["_limit"], params["_offset"] = limit, 0
+        
+        result = await self.db.execute(query.with_only_columns(PatrolRecord.image_id), params)
+        return list(result.scalars().all())
+    
+    async def get_duplicate_image_counts(self, start_time: int, end_time: int) -> List[Tuple[str, int, int]]:
+        """
+        Count stored images and duplicate frames per patrol point
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+            
+        Returns:
+            List[Tuple[str, int, int]]: (point, images, duplicates) for points with images
+        """
+        result = await self.db.execute(
+            _DUPLICATE_COUNTS,
+            {"start_time": start_time, "end_time": end_time}
+        )
+        return [tuple(row) for row in result]
+    
+    async def get_scan_counts(self, start_time: int, end_time: int) -> List[Tuple[str, str, int]]:
+        """
+        Count scans per patrol point and guard in a time range
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+            
+        Returns:
+            List[Tuple[str, str, int]]: (point, guard name, scans) for groups with scans
+        """
+        result = await self.db.execute(
+            _SCAN_COUNTS,
+            {"start_time": start_time, "end_time": end_time}
+        )
+        return [tuple(row) for row in result]
+    
+    async def get_hour_point_counts(
+        self,
+        start_time: int,
+        end_time: int,
+        utc_offset: int
+    ) -> List[Tuple[int, str, int]]:
+        """
+        Count scans per local hour of day and patrol point in a time range
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+            utc_offset: Local time offset from UTC in seconds
+            
+        Returns:
+            List[Tuple[int, str, int]]: (hour of day, point, scans) for groups with scans
+        """
+        result = await self.db.execute(
+            _HOUR_POINT_COUNTS,
+            {"start_time": start_time, "end_time": end_time, "utc_offset": utc_offset}
+        )
+        return [(int(hour), point, int(scans)) for hour, point, scans in result]
+    
+    async def stream_point_visits(
+        self,
+        start_time: int,
+        end_time: int,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Tuple[str, int, str, str]]:
+        """
+        Stream the visits in a time range ordered by point, then time
+        
+        Only the four columns are read, through a server-side cursor, so
+        no ORM objects are built and memory is bounded by batch_size.
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Tuple[str, int, str, str]: (point, time, guard name, record ID)
+        """
+        result = await self.db.stream(
+            _POINT_VISITS.execution_options(yield_per=batch_size),
+            {"start_time": start_time, "end_time": end_time}
+        )
+        async for row in result:
+            yield tuple(row)
+    
+    async def stream_scans(
+        self,
+        start_time: int,
+        end_time: int,
+        batch_size: int = 10000
+    ) -> AsyncIterator[Tuple[str, str, int]]:
+        """
+        Stream the point, guard and time of every scan in a time range (unordered)
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Tuple[str, str, int]: (point, guard name, time)
+        """
+        result = await self.db.stream(
+            _SCANS.execution_options(yield_per=batch_size),
+            {"start_time": start_time, "end_time": end_time}
+        )
+        async for row in result:
+            yield tuple(row)
+    
+    async def stream_recent_records(self, start_time: int, batch_size: int = 10000) -> AsyncIterator[Tuple]:
+        """
+        Stream the records from a time on, oldest first, as plain rows
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Tuple: (id, point, guard name, time, server time, image ID, note)
+        """
+        result = await self.db.stream(
+            _RECENT_RECORDS.execution_options(yield_per=batch_size),
+            {"start_time": start_time}
+        )
+        async for row in result:
+            yield tuple(row)
+    
+    async def get_time_bounds(self) -> Tuple[int, int]:
+        """
+        Get the earliest and latest record time
+        
+        Returns:
+            Tuple[int, int]: (min time, max time), or (0, -1) without records
+        """
+        result = await self.db.execute(_TIME_BOUNDS)
+        earliest, latest = result.one()
+        if earliest is None:
+            return 0, -1
+        return earliest, latest
+    
+    async def get_latest_per_point(self) -> List[PatrolRecord]:
+        """
+        Get the most recent record for each patrol point
+        
+        Cost grows with the number of points, not the number of records,
+        since both steps are index lookups on (point, time).
+        
+        Returns:
+            List[PatrolRecord]: One record per point (ties on time resolved by server_time, id)
+        """
+        result = await self.db.execute(_LATEST_PER_POINT)
+        
+        latest = {}
+        for record in result.scalars().all():
+            latest.setdefault(record.point, record)
+        return list(latest.values())
+    
+    async def stream_image_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:
+        """
+        Stream the image ID of every record without loading the table into memory
+        
+        Rows come from a server-side cursor, so memory use is bounded by
+        batch_size however many records there are.
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            str: Image IDs (repeated if several records share one; empty IDs skipped)
+        """
+        result = await self.db.stream_scalars(
+            _RECORD_IMAGE_IDS.execution_options(yield_per=batch_size)
+        )
+        async for image_id in result:
+            yield image_id
+    
+    async def get_referenced_image_ids(self, image_ids: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given image IDs are used by a record
+        
+        Args:
+            image_ids: Image identifiers to check
+            
+        Returns:
+            Set[str]: IDs referenced by at least one record
+        """
+        result = await self.db.execute(_REFERENCED_IMAGE_IDS, {"image_ids": list(image_ids)})
+        return set(result.scalars().all())
 
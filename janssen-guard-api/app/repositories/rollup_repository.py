@@ -0,0 +1,184 @@
+"""Hourly patrol rollup repository for database operations"""
+
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import Integer, select, bindparam, func, literal_column
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.repositories.base_repository import BaseRepository
+from app.models.patrol_record import PatrolRecord
+from app.models.patrol_rollup import PatrolHourlyRollup
+
+# Rollup bucket width in seconds
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Bulk statements use the Core table (no ORM bookkeeping)
+_TABLE = PatrolHourlyRollup.__table__
+
+_ROLLUP_COUNTS = (
+    select(
+        PatrolHourlyRollup.point,
+        PatrolHourlyRollup.guard_name,
+        func.sum(PatrolHourlyRollup.scans).label("scans")
+    )
+    .where(PatrolHourlyRollup.hour >= bindparam("start_hour"))
+    .where(PatrolHourlyRollup.hour < bindparam("end_hour"))
+    .group_by(PatrolHourlyRollup.point, PatrolHourlyRollup.guard_name)
+)
+
+
+def hour_of_day(column):
+    """
+    Local hour of day (0-23) of a Unix time column, for GROUP BY hour_of_day
+    
+    The offset from UTC is the "utc_offset" parameter, in seconds.
+    """
+    return ((column + bindparam("utc_offset", type_=Integer)) % DAY // HOUR).label("hour_of_day")
+
+
+# Grouped by the select alias, so the expression (and its parameter) appears once
+_ROLLUP_HOUR_POINT_COUNTS = (
+    select(
+        hour_of_day(PatrolHourlyRollup.hour),
+        PatrolHourlyRollup.point,
+        func.sum(PatrolHourlyRollup.scans).label("scans")
+    )
+    .where(PatrolHourlyRollup.hour >= bindparam("start_hour"))
+    .where(PatrolHourlyRollup.hour < bindparam("end_hour"))
+    .group_by(literal_column("hour_of_day"), PatrolHourlyRollup.point)
+)
+
+_CLEAR_HOURS = (
+    _TABLE.delete()
+    .where(_TABLE.c.hour >= bindparam("start_hour"))
+    .where(_TABLE.c.hour < bindparam("end_hour"))
+)
+
+_RECORD_HOUR = PatrolRecord.time - PatrolRecord.time % HOUR
+_REBUILD_HOURS = _TABLE.insert().from_select(
+    ["hour", "point", "guard_name", "scans"],
+    select(_RECORD_HOUR, PatrolRecord.point, PatrolRecord.guard_name, func.count())
+    .where(PatrolRecord.time >= bindparam("start_hour"))
+    .where(PatrolRecord.time < bindparam("end_hour"))
+    .group_by(_RECORD_HOUR, PatrolRecord.point, PatrolRecord.guard_name)
+)
+
+
+def hour_of(timestamp: int) -> int:
+    """
+    Get the rollup bucket of a record time
+    
+    Args:
+        timestamp: Record time (Unix timestamp)
+    
+    Returns:
+        int: Start of the hour (Unix timestamp)
+    """
+    return timestamp - timestamp % HOUR
+
+
+def _build_add_scans(dialect: str):
+    """Build the "add to the hour's count" upsert for a database dialect"""
+    if dialect == "mysql":
+        statement = mysql.insert(_TABLE)
+        return statement.on_duplicate_key_update(scans=_TABLE.c.scans + statement.inserted.scans)
+    
+    statement = (postgresql if dialect == "postgresql" else sqlite).insert(_TABLE)
+    return statement.on_conflict_do_update(
+        index_elements=[_TABLE.c.hour, _TABLE.c.point, _TABLE.c.guard_name],
+        set_={"scans": _TABLE.c.scans + statement.excluded.scans}
+    )
+
+
+# Upsert statements per dialect, built on first use
+_ADD_SCANS: Dict[str, object] = {}
+
+
+class RollupRepository(BaseRepository[PatrolHourlyRollup]):
+    """
+    Repository for hourly scan counts
+    
+    Counts are added in the transaction that inserts the records, so they
+    never drift from patrol_records; rebuild() recomputes hours from the
+    raw records (initial fill and repairs).
+    """
+    
+    async def add_scans(self, records: Iterable[Dict]) -> None:
+        """
+        Count new records in their hours (no commit; part of the insert's transaction)
+        
+        Args:
+            records: Patrol record fields (time, point, guard_name)
+        """
+        counts: Dict[Tuple[int, str, str], int] = {}
+        for record in records:
+            key = (hour_of(record["time"]), record["point"], record["guard_name"])
+            counts[key] = counts.get(key, 0) + 1
+        if not counts:
+            return
+        
+        dialect = self.db.bind.dialect.name
+        statement = _ADD_SCANS.get(dialect)
+        if statement is None:
+            statement = _ADD_SCANS[dialect] = _build_add_scans(dialect)
+        await self.db.execute(statement, [
+            {"hour": hour, "point": point, "guard_name": guard_name, "scans": scans}
+            for (hour, point, guard_name), scans in counts.items()
+        ])
+    
+    async def get_scan_counts(self, start_hour: int, end_hour: int) -> List[Tuple[str, str, int]]:
+        """
+        Sum scans per point and guard over whole hours
+        
+        Args:
+            start_hour: First hour (Unix timestamp, multiple of HOUR)
+            end_hour: End of the last hour, exclusive
+        
+        Returns:
+            List[Tuple[str, str, int]]: (point, guard name, scans)
+        """
+        result = await self.db.execute(
+            _ROLLUP_COUNTS,
+            {"start_hour": start_hour, "end_hour": end_hour}
+        )
+        return [(point, guard_name, int(scans)) for point, guard_name, scans in result]
+    
+    async def get_hour_point_counts(
+        self,
+        start_hour: int,
+        end_hour: int,
+        utc_offset: int
+    ) -> List[Tuple[int, str, int]]:
+        """
+        Sum scans per local hour of day and point over whole hours
+        
+        Args:
+            start_hour: First hour (Unix timestamp, multiple of HOUR)
+            end_hour: End of the last hour, exclusive
+            utc_offset: Local time offset from UTC in seconds (multiple of HOUR)
+        
+        Returns:
+            List[Tuple[int, str, int]]: (hour of day, point, scans)
+        """
+        result = await self.db.execute(
+            _ROLLUP_HOUR_POINT_COUNTS,
+            {"start_hour": start_hour, "end_hour": end_hour, "utc_offset": utc_offset}
+        )
+        return [(int(hour), point, int(scans)) for hour, point, scans in result]
+    
+    async def rebuild(self, start_hour: int, end_hour: int) -> int:
+        """
+        Recompute the rollups of a range of hours from patrol_records in one transaction
+        
+        Args:
+            start_hour: First hour (Unix timestamp, multiple of HOUR)
+            end_hour: End of the last hour, exclusive
+        
+        Returns:
+            int: Number of rollup rows written
+        """
+        params = {"start_hour": start_hour, "end_hour": end_hour}
+        await self.db.execute(_CLEAR_HOURS, params)
+        result = await self.db.execute(_REBUILD_HOURS, params)
+        await self.db.commit()
+        return result.rowcount
+
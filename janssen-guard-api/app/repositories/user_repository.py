@@ -1,7 +1,6 @@
 """User repository for database operations"""
 
 from typing import Optional
-from sqlalchemy import select
 from app.repositories.base_repository import BaseRepository
 from app.models.user import User
 
@@ -19,10 +18,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.username == username)
-        )
-        return result.scalar_one_or_none()
+        return await self.get_one_by("username", username)
     
     async def get_by_guard_name(self, guard_name: str) -> Optional[User]:
         """
@@ -34,10 +30,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.guard_name == guard_name)
-        )
-        return result.scalar_one_or_none()
+        return await self.get_one_by("guard_name", guard_name)
     
     async def get_by_uid(self, uid: str) -> Optional[User]:
         """
@@ -49,10 +42,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.uid == uid)
-        )
-        return result.scalar_one_or_none()
+        return await self.get_one_by("uid", uid)
     
     async def get_by_user_id(self, user_id: int) -> Optional[User]:
         """
@@ -64,8 +54,5 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Optional[User]: User or None if not found
         """
-        result = await self.db.execute(
-            select(User).where(User.user_id == user_id)
-        )
-        return result.scalar_one_or_none()
+        return await self.get_one_by("user_id", user_id)
 
@@ -12,13 +12,38 @@ from app.schemas.patrol_record import (
     PatrolRecordBase,
     PatrolRecordCreate,
     PatrolRecordResponse,
+    RoundProgress,
+    PatrolRecordCreatedResponse,
     PatrolRecordFilter,
-    PatrolRecordsResponse
+    PatrolImageArchiveRequest,
+    CameraDuplicateStats,
+    PatrolImageUploadResponse,
+    ImageUploadPolicy,
+    PatrolRecordsResponse,
+    PatrolRecordChangesResponse,
+    OverdueEvent,
+    PointDeadline,
+    OverdueEventsResponse
+)
+from app.schemas.report import (
+    ReportSummary,
+    PointDistribution,
+    GuardDistribution,
+    PointVisit,
+    PatrolPointGroup,
+    PatrolPointGroupsResponse,
+    CoverageRound,
+    PointCoverage,
+    GuardCadence,
+    CoverageReport,
+    ActivityHeatmap
 )
 from app.schemas.response import (
     SuccessResponse,
     ErrorResponse,
-    HealthResponse
+    HealthResponse,
+    ImageCacheStats,
+    HotStoreStats
 )
 
 __all__ = [
@@ -31,10 +56,33 @@ __all__ = [
     "PatrolRecordBase",
     "PatrolRecordCreate",
     "PatrolRecordResponse",
+    "RoundProgress",
+    "PatrolRecordCreatedResponse",
     "PatrolRecordFilter",
+    "PatrolImageArchiveRequest",
+    "CameraDuplicateStats",
+    "PatrolImageUploadResponse",
+    "ImageUploadPolicy",
     "PatrolRecordsResponse",
+    "PatrolRecordChangesResponse",
+    "OverdueEvent",
+    "PointDeadline",
+    "OverdueEventsResponse",
+    "ReportSummary",
+    "PointDistribution",
+    "GuardDistribution",
+    "PointVisit",
+    "PatrolPointGroup",
+    "PatrolPointGroupsResponse",
+    "CoverageRound",
+    "PointCoverage",
+    "GuardCadence",
+    "CoverageReport",
+    "ActivityHeatmap",
     "SuccessResponse",
     "ErrorResponse",
     "HealthResponse",
+    "ImageCacheStats",
+    "HotStoreStats",
 ]
 
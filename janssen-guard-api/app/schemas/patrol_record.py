@@ -17,7 +17,7 @@ class PatrolRecordCreate(PatrolRecordBase):
     """Schema for creating a patrol record"""
     id: str
     time: str | int  # Client timestamp
-    servertime: str | int  # Server timestamp
+    servertime: str | int | None = None  # Ignored: the server assigns server_time on insert
     imageid: str
     
     @field_validator('time', 'servertime', mode='before')
@@ -50,17 +50,73 @@ class PatrolRecordResponse(PatrolRecordBase):
         from_attributes = True
 
 
+class RoundProgress(BaseModel):
+    """Schema for a guard's current patrol round as tracked by the server"""
+    guardname: str
+    scanned: List[str]  # Round points scanned in this round, in point order
+    missing: List[str]
+    count: int
+    total: int  # Points in a full round
+    complete: bool
+    started: Optional[int] = None  # Time of the round's first scan (None before any scan)
+    last_scan: Optional[int] = None
+
+
+class PatrolRecordCreatedResponse(PatrolRecordResponse):
+    """Schema for a created patrol record with the guard's round progress"""
+    round: Optional[RoundProgress] = None
+
+
 class PatrolRecordFilter(BaseModel):
     """Schema for filtering patrol records"""
     page: int = Field(1, ge=1)
     limit: int = Field(10, ge=1, le=100)
-    point: Optional[str] = None
-    guardname: Optional[str] = None
+    point: Optional[List[str]] = None  # Any of these points
+    guardname: Optional[List[str]] = None  # Names containing any of these
     start_date: Optional[int] = None  # Unix timestamp
     end_date: Optional[int] = None
     has_notes: Optional[bool] = None
 
 
+class PatrolImageArchiveRequest(BaseModel):
+    """Schema for requesting a zip archive of patrol images"""
+    imageids: Optional[List[str]] = None  # Explicit image IDs; otherwise the filters below select records
+    point: Optional[List[str]] = None
+    guardname: Optional[List[str]] = None
+    start_date: Optional[int] = None  # Unix timestamp
+    end_date: Optional[int] = None
+    has_notes: Optional[bool] = None
+    size: Optional[str] = Field(None, pattern="^(thumb|preview|original)$")
+
+
+class CameraDuplicateStats(BaseModel):
+    """Schema for duplicate camera frames at one patrol point"""
+    point: str
+    images: int  # Stored images linked to the point's records
+    duplicates: int  # Byte-identical to an earlier image (frozen stream or cached frame)
+    duplicate_rate: float
+
+
+class PatrolImageUploadResponse(BaseModel):
+    """Schema for a patrol record created with an uploaded photo"""
+    record: PatrolRecordResponse
+    image_size: int  # Bytes stored
+    content_type: str
+    width: int
+    height: int
+    resized: bool  # Downscaled to the maximum edge
+    duplicate_of: Optional[str] = None  # Identical to this existing image, which is shared
+    round: Optional[RoundProgress] = None  # The guard's round progress after this scan
+
+
+class ImageUploadPolicy(BaseModel):
+    """Schema for the limits clients should apply before uploading a photo"""
+    max_bytes: int
+    max_edge: int  # Longest edge in pixels; larger photos are downscaled by the server
+    content_types: List[str]
+    jpeg_quality: int
+
+
 class PatrolRecordsResponse(BaseModel):
     """Schema for paginated patrol records response"""
     records: List[PatrolRecordResponse]
@@ -69,3 +125,38 @@ class PatrolRecordsResponse(BaseModel):
     current_page: int
     page_size: int
 
+
+class PatrolRecordChangesResponse(BaseModel):
+    """Schema for delta-sync response (records changed since a watermark)"""
+    records: List[PatrolRecordResponse]  # May repeat records of earlier polls; dedupe by id
+    watermark: Optional[str] = None  # Pass back as ?watermark= on the next poll
+    has_more: bool
+
+
+
+class OverdueEvent(BaseModel):
+    """Schema for a patrol point going past (or back within) its visit deadline"""
+    seq: int  # Increasing event number; pass the last one back as ?after=
+    type: str  # "overdue" or "resolved"
+    point: str
+    last_visit: Optional[int] = None  # Client time of the latest scan (None if never scanned)
+    guardname: Optional[str] = None  # Guard of the latest scan
+    deadline: int  # Time the point was due (Unix seconds)
+    at: int  # Server time of the event
+
+
+class PointDeadline(BaseModel):
+    """Schema for the visit deadline of one patrol point"""
+    point: str
+    last_visit: Optional[int] = None
+    guardname: Optional[str] = None
+    deadline: int
+    overdue: bool
+
+
+class OverdueEventsResponse(BaseModel):
+    """Schema for overdue events after a sequence number and every point's deadline"""
+    events: List[OverdueEvent]  # Oldest first
+    last_seq: int
+    points: List[PointDeadline]  # In point order
+
@@ -0,0 +1,107 @@
+"""Report Pydantic schemas"""
+
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+
+class ReportSummary(BaseModel):
+    """Schema for patrol totals over a date range"""
+    total_scans: int
+    unique_points: int
+    unique_guards: int
+
+
+class PointDistribution(BaseModel):
+    """Schema for one patrol point's share of the scans"""
+    point: str
+    count: int
+    percentage: float  # Share of all scans in the range
+
+
+class GuardDistribution(BaseModel):
+    """Schema for one guard's share of the scans"""
+    guard: str
+    count: int
+    percentage: float  # Share of all scans in the range
+
+
+class PointVisit(BaseModel):
+    """Schema for one scan in the per-point report table"""
+    id: str
+    guardname: str
+    time: int  # Client timestamp (Unix seconds)
+
+
+class PatrolPointGroup(BaseModel):
+    """Schema for the scans of one patrol point, oldest first"""
+    point: str  # Without leading zeros
+    count: int
+    guards: Dict[str, int]  # Scans per guard
+    visits: List[PointVisit]
+
+
+class PatrolPointGroupsResponse(BaseModel):
+    """Schema for the patrol report table: scans grouped by point"""
+    total: int
+    points: List[PatrolPointGroup]  # Points with scans, in point order
+
+
+
+class CoverageRound(BaseModel):
+    """Schema for one patrol round of a guard"""
+    guard: str
+    start: int  # Time of the round's first scan (Unix seconds)
+    end: int  # Time of its last scan
+    scans: int
+    covered: int  # Distinct round points scanned
+    missed: List[str]  # Round points not scanned
+
+
+class PointCoverage(BaseModel):
+    """Schema for the visits and gaps of one patrol point"""
+    point: str
+    visits: int
+    missed_rounds: int  # Rounds that did not scan the point
+    gap_p50: Optional[float] = None  # Seconds between consecutive visits (any guard)
+    gap_p90: Optional[float] = None
+    gap_max: Optional[float] = None
+
+
+class GuardCadence(BaseModel):
+    """Schema for the patrol cadence of one guard"""
+    guard: str
+    scans: int
+    rounds: int
+    complete_rounds: int
+    interval_p50: Optional[float] = None  # Seconds between consecutive scans within a round
+    interval_p90: Optional[float] = None
+    round_duration_p50: Optional[float] = None  # Seconds from first to last scan of a round
+    round_duration_p90: Optional[float] = None
+
+
+class CoverageReport(BaseModel):
+    """Schema for round coverage and visit cadence over a date range"""
+    round_points: List[str]  # Points a full round scans
+    round_gap_minutes: int  # Pause that ends a round
+    total_scans: int
+    other_scans: int  # Scans of points outside the round
+    total_rounds: int
+    complete_rounds: int
+    completion_rate: float  # Percentage of rounds that scanned every point
+    points: List[PointCoverage]
+    guards: List[GuardCadence]  # Most scans first
+    rounds: List[CoverageRound] = []  # Only with include_rounds, oldest first
+
+
+class ActivityHeatmap(BaseModel):
+    """Schema for scans per local hour of day and round point, as a dense matrix"""
+    hours: List[int]  # Row labels: 0..23
+    points: List[str]  # Column labels: round points in order
+    counts: List[List[int]]  # counts[hour][column]
+    hour_totals: List[int]
+    point_totals: List[int]
+    max_count: int  # Largest cell (top of the colour scale)
+    total: int
+    other_scans: int  # Scans of points outside the round
+    utc_offset_minutes: int
+
@@ -28,3 +28,27 @@ class HealthResponse(BaseModel):
     storage: str
     version: str
 
+
+class ImageCacheStats(BaseModel):
+    """In-memory image cache metrics"""
+    entries: int
+    size_bytes: int  # Memory held by cached images
+    max_bytes: int
+    max_item_bytes: int
+    hits: int
+    misses: int
+    hit_rate: float  # hits / (hits + misses) since startup
+    evictions: int
+
+
+class HotStoreStats(BaseModel):
+    """In-memory recent record store metrics"""
+    enabled: bool
+    records: int
+    covered_from: Optional[int] = None  # Every record from this time (Unix seconds) on is held
+    size_bytes: int  # Estimated memory held by the records
+    max_bytes: int
+    hits: int  # Queries answered from memory
+    misses: int  # Queries starting before covered_from (sent to the database)
+    hit_rate: float
+
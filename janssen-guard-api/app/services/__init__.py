@@ -2,8 +2,12 @@
 
 from app.services.auth_service import AuthService
 from app.services.patrol_service import PatrolService
+from app.services.image_catalog import ImageCatalog, CatalogEntry
+from app.services.rendition_service import RenditionService
 from app.services.image_service import ImageService
+from app.services.transcode_service import TranscodeService
+from app.services.pack_service import PackService
 from app.services.report_service import ReportService
 
-__all__ = ["AuthService", "PatrolService", "ImageService", "ReportService"]
+__all__ = ["AuthService", "PatrolService", "ImageCatalog", "CatalogEntry", "RenditionService", "ImageService", "TranscodeService", "PackService", "ReportService"]
 
@@ -0,0 +1,338 @@
+"""Patrol round coverage and cadence analysis"""
+
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.repositories.patrol_repository import PatrolRepository
+from app.schemas.report import CoverageReport, CoverageRound, GuardCadence, PointCoverage
+from app.services.report_service import time_range
+from app.utils.points import normalize_point, round_points
+
+# Percentiles reported for gaps, intervals and durations (1.0 is the maximum)
+_P50, _P90, _MAX = 0.5, 0.9, 1.0
+
+
+class ScanArrays(NamedTuple):
+    """Scans as parallel columns, with points and guards coded as integers"""
+    points: List[str]  # Point of each code (normalized)
+    guards: List[str]  # Guard name of each code
+    point_codes: np.ndarray  # int32 per scan
+    guard_codes: np.ndarray  # int32 per scan
+    times: np.ndarray  # int64 per scan (Unix seconds)
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, group_count: int, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Compute percentiles of values per group without looping over groups
+    
+    Values are sorted by (group, value) once; each percentile is then read
+    at its fractional position inside the group's slice, interpolating
+    linearly like np.percentile.
+    
+    Args:
+        groups: Group code of each value (0..group_count-1)
+        values: Values
+        group_count: Number of groups
+        quantiles: Quantiles in [0, 1]
+    
+    Returns:
+        np.ndarray: (group_count, len(quantiles)) floats, NaN for empty groups
+    """
+    result = np.full((group_count, len(quantiles)), np.nan)
+    if values.size == 0:
+        return result
+    
+    order = np.lexsort((values, groups))
+    ordered = values[order].astype(np.float64)
+    counts = np.bincount(groups, minlength=group_count)
+    offsets = np.cumsum(counts) - counts
+    present = counts > 0
+    
+    positions = offsets[present, None] + (counts[present, None] - 1) * np.asarray(quantiles)[None, :]
+    low = np.floor(positions).astype(np.int64)
+    high = np.ceil(positions).astype(np.int64)
+    result[present] = ordered[low] + (ordered[high] - ordered[low]) * (positions - low)
+    return result
+
+
+def first_visits(round_ids: np.ndarray, slots: np.ndarray, slot_count: int) -> np.ndarray:
+    """
+    Mark the first scan of each round point within each round
+    
+    Args:
+        round_ids: Round of each scan, non-decreasing
+        slots: Round point index of each scan (-1 for other points)
+        slot_count: Number of round points
+    
+    Returns:
+        np.ndarray: Boolean mask over the scans
+    """
+    first = np.zeros(slots.size, dtype=bool)
+    in_round = np.flatnonzero(slots >= 0)
+    # Scans are in time order within a round, so return_index finds the earliest
+    _, earliest = np.unique(round_ids[in_round] * slot_count + slots[in_round], return_index=True)
+    first[in_round[earliest]] = True
+    return first
+
+
+def segment_rounds(guard_codes: np.ndarray, times: np.ndarray, slots: np.ndarray, slot_count: int, round_gap: int) -> np.ndarray:
+    """
+    Split scans into patrol rounds
+    
+    A round starts at a guard's first scan, after a pause longer than
+    round_gap, and right after the scan that completes every round point
+    (as the scanner app starts a new round once all points are scanned).
+    The pause rule is one vectorized comparison; completion splits are
+    found in passes, each adding the next completion of every round.
+    
+    Args:
+        guard_codes: Guard of each scan, scans sorted by guard, then time
+        times: Time of each scan
+        slots: Round point index of each scan (-1 for other points)
+        slot_count: Number of round points
+        round_gap: Longest pause within a round, in seconds
+    
+    Returns:
+        np.ndarray: Boolean mask of the scans that start a round
+    """
+    starts = np.ones(times.size, dtype=bool)
+    starts[1:] = (guard_codes[1:] != guard_codes[:-1]) | (np.diff(times) > round_gap)
+    
+    while True:
+        round_ids = np.cumsum(starts) - 1
+        first = first_visits(round_ids, slots, slot_count)
+        # Distinct round points covered so far, counted from each round's start
+        covered = np.cumsum(first)
+        start_positions = np.flatnonzero(starts)
+        covered -= (covered[start_positions] - first[start_positions])[round_ids]
+        
+        following = np.flatnonzero(first & (covered == slot_count)) + 1
+        following = following[following < times.size]
+        following = following[~starts[following]]
+        if following.size == 0:
+            return starts
+        starts[following] = True
+
+
+def _seconds(value: float) -> Optional[float]:
+    """Convert a percentile to a response value (None when undefined)"""
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def analyze_coverage(scans: ScanArrays, points: List[str], round_gap: int, include_rounds: bool = False) -> Dict:
+    """
+    Compute round coverage, missed points, visit gaps and guard cadence
+    
+    CPU-bound; run it off the event loop.
+    
+    Args:
+        scans: Scans in any order
+        points: Points a full round scans
+        round_gap: Longest pause within a round, in seconds
+        include_rounds: Whether to list every round
+    
+    Returns:
+        Dict: CoverageReport fields
+    """
+    slot_count = len(points)
+    guard_count = len(scans.guards)
+    slot_of_code = np.full(len(scans.points) + 1, -1, dtype=np.int32)
+    for slot, point in enumerate(points):
+        if point in scans.points:
+            slot_of_code[scans.points.index(point)] = slot
+    
+    order = np.lexsort((scans.times, scans.guard_codes))
+    guards = scans.guard_codes[order]
+    times = scans.times[order]
+    slots = slot_of_code[scans.point_codes[order]]
+    
+    starts = segment_rounds(guards, times, slots, slot_count, round_gap)
+    round_ids = np.cumsum(starts) - 1
+    start_positions = np.flatnonzero(starts)
+    end_positions = np.append(start_positions[1:], times.size)[:start_positions.size] - 1
+    round_count = start_positions.size
+    
+    # Rounds x points: which points each round scanned
+    first = first_visits(round_ids, slots, slot_count)
+    coverage = np.zeros((round_count, slot_count), dtype=bool)
+    coverage[round_ids[first], slots[first]] = True
+    complete = coverage.all(axis=1)
+    round_guards = guards[start_positions]
+    durations = times[end_positions] - times[start_positions]
+    
+    # Gaps between consecutive visits to each point, whoever scanned it
+    in_round = slots >= 0
+    point_slots = slots[in_round]
+    point_times = times[in_round]
+    by_point = np.lexsort((point_times, point_slots))
+    point_slots = point_slots[by_point]
+    same_point = point_slots[1:] == point_slots[:-1]
+    gaps = group_percentiles(
+        point_slots[1:][same_point],
+        np.diff(point_times[by_point])[same_point],
+        slot_count,
+        (_P50, _P90, _MAX)
+    )
+    visits = np.bincount(point_slots, minlength=slot_count)
+    missed_rounds = round_count - coverage.sum(axis=0)
+    
+    # Guard cadence: scan intervals inside rounds (pauses between rounds excluded)
+    within = ~starts[1:]
+    intervals = group_percentiles(guards[1:][within], np.diff(times)[within], guard_count, (_P50, _P90))
+    round_durations = group_percentiles(round_guards, durations, guard_count, (_P50, _P90))
+    guard_scans = np.bincount(guards, minlength=guard_count)
+    guard_rounds = np.bincount(round_guards, minlength=guard_count)
+    guard_complete = np.bincount(round_guards, weights=complete, minlength=guard_count)
+    
+    complete_rounds = int(complete.sum())
+    report = {
+        "round_points": points,
+        "round_gap_minutes": round_gap // 60,
+        "total_scans": int(times.size),
+        "other_scans": int(times.size - in_round.sum()),
+        "total_rounds": round_count,
+        "complete_rounds": complete_rounds,
+        "completion_rate": round(complete_rounds / round_count * 100, 1) if round_count else 0,
+        "points": [
+            PointCoverage(
+                point=point,
+                visits=int(visits[slot]),
+                missed_rounds=int(missed_rounds[slot]),
+                gap_p50=_seconds(gaps[slot, 0]),
+                gap_p90=_seconds(gaps[slot, 1]),
+                gap_max=_seconds(gaps[slot, 2])
+            )
+            for slot, point in enumerate(points)
+        ],
+        "guards": sorted(
+            (
+                GuardCadence(
+                    guard=guard,
+                    scans=int(guard_scans[code]),
+                    rounds=int(guard_rounds[code]),
+                    complete_rounds=int(guard_complete[code]),
+                    interval_p50=_seconds(intervals[code, 0]),
+                    interval_p90=_seconds(intervals[code, 1]),
+                    round_duration_p50=_seconds(round_durations[code, 0]),
+                    round_duration_p90=_seconds(round_durations[code, 1])
+                )
+                for code, guard in enumerate(scans.guards)
+            ),
+            key=lambda cadence: (-cadence.scans, cadence.guard)
+        ),
+        "rounds": []
+    }
+    
+    if include_rounds:
+        by_time = np.argsort(times[start_positions], kind="stable")
+        report["rounds"] = [
+            CoverageRound(
+                guard=scans.guards[round_guards[index]],
+                start=int(times[start_positions[index]]),
+                end=int(times[end_positions[index]]),
+                scans=int(end_positions[index] - start_positions[index] + 1),
+                covered=int(coverage[index].sum()),
+                missed=[points[slot] for slot in np.flatnonzero(~coverage[index])]
+            )
+            for index in by_time
+        ]
+    return report
+
+
+class CoverageService:
+    """
+    Service for patrol round coverage and cadence reports
+    
+    Only (point, guard, time) is read, streamed into compact integer
+    columns; rounds, missed points and percentiles are then computed with
+    array operations instead of per-record Python loops.
+    """
+    
+    def __init__(self, patrol_repo: PatrolRepository):
+        """
+        Initialize coverage service
+        
+        Args:
+            patrol_repo: Patrol repository instance
+        """
+        self.patrol_repo = patrol_repo
+    
+    async def load_scans(self, start_time: int, end_time: int) -> ScanArrays:
+        """
+        Load the scans of a time range as integer-coded columns
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp)
+            end_time: Latest record time (Unix timestamp)
+        
+        Returns:
+            ScanArrays: Scans in database order
+        """
+        points: List[str] = []
+        guards: List[str] = []
+        # Raw spelling -> code; "05" and "5" share a code
+        point_codes: Dict[str, int] = {}
+        normalized_codes: Dict[str, int] = {}
+        guard_codes: Dict[str, int] = {}
+        point_column = array("i")
+        guard_column = array("i")
+        time_column = array("q")
+        
+        async for point, guard_name, time in self.patrol_repo.stream_scans(start_time, end_time):
+            point_code = point_codes.get(point)
+            if point_code is None:
+                normalized = normalize_point(point)
+                point_code = normalized_codes.get(normalized)
+                if point_code is None:
+                    point_code = normalized_codes[normalized] = len(points)
+                    points.append(normalized)
+                point_codes[point] = point_code
+            guard_code = guard_codes.get(guard_name)
+            if guard_code is None:
+                guard_code = guard_codes[guard_name] = len(guards)
+                guards.append(guard_name)
+            point_column.append(point_code)
+            guard_column.append(guard_code)
+            time_column.append(time)
+        
+        return ScanArrays(
+            points=points,
+            guards=guards,
+            point_codes=np.frombuffer(point_column, dtype=np.int32),
+            guard_codes=np.frombuffer(guard_column, dtype=np.int32),
+            times=np.frombuffer(time_column, dtype=np.int64)
+        )
+    
+    async def get_coverage(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        include_rounds: bool = False
+    ) -> CoverageReport:
+        """
+        Get round coverage, visit gaps per point and cadence per guard
+        
+        Args:
+            start_date: Start date (Unix timestamp)
+            end_date: End date (Unix timestamp)
+            include_rounds: Whether to list every round
+        
+        Returns:
+            CoverageReport: Coverage and cadence statistics
+        
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        start_time, end_time = time_range(start_date, end_date)
+        scans = await self.load_scans(start_time, end_time)
+        report = await run_in_threadpool(
+            analyze_coverage,
+            scans,
+            round_points(),
+            settings.PATROL_ROUND_GAP_MINUTES * 60,
+            include_rounds
+        )
+        return CoverageReport(**report)
+
@@ -0,0 +1,386 @@
+"""In-process store of recent patrol records in array-backed columns"""
+
+import sys
+import time
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patrol_record import PatrolRecord
+from app.repositories.patrol_repository import PatrolRepository
+from app.repositories.rollup_repository import DAY, HOUR
+
+logger = logging.getLogger(__name__)
+
+# Fixed bytes per row: five array columns plus three list slots
+_ROW_BYTES = 8 + 8 + 4 + 4 + 1 + 3 * 8
+
+# Age past the window before rows are trimmed, so trimming (a shift of
+# every column) happens about once per this many seconds
+_TRIM_SLACK = 3600
+
+# Repository filters the store can answer (see PatrolService._query_filters)
+_SUPPORTED_FILTERS = {
+    "point", "point__in", "guard_name__contains_any",
+    "time__between", "time__gte", "time__lte", "note__ne"
+}
+
+
+class HotRecord(NamedTuple):
+    """Patrol record served from the store (same attributes as PatrolRecord)"""
+    id: str
+    point: str
+    guard_name: str
+    time: int
+    server_time: int
+    image_id: str
+    note: str
+
+
+class HotStore:
+    """
+    Records of the last HOT_STORE_HOURS, sorted by time, as compact columns
+    
+    Times are int64 arrays searched by bisection; points and guards are
+    stored as int32 codes into small name tables, so filters are integer
+    comparisons over the time slice (NumPy views of the arrays). Records
+    created by this process are inserted in time order; rows older than
+    the window are trimmed, and the oldest rows are also dropped when the
+    estimated size exceeds HOT_STORE_MAX_MB.
+    
+    Every record with time >= covered_from is in the store, so a query
+    whose range starts there is answered exactly; the query methods mirror
+    PatrolRepository's. NumPy views never outlive a method call, since the
+    arrays cannot grow or shrink while a view of them exists.
+    """
+    
+    def __init__(self, window: int, max_bytes: int):
+        """
+        Initialize an empty store
+        
+        Args:
+            window: Seconds of records to keep
+            max_bytes: Estimated memory limit
+        """
+        self.window = window
+        self.max_bytes = max_bytes
+        self.covered_from: Optional[int] = None  # None until loaded (disabled)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._times = array("q")
+        self._server_times = array("q")
+        self._points = array("i")
+        self._guards = array("i")
+        self._has_notes = array("b")
+        self._ids: List[str] = []
+        self._image_ids: List[str] = []
+        self._notes: List[str] = []
+        self._point_names: List[str] = []
+        self._point_codes: Dict[str, int] = {}
+        self._guard_names: List[str] = []
+        self._guard_codes: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._times)
+    
+    async def load(self) -> None:
+        """Fill the store with the records of the window (application startup)"""
+        since = int(time.time()) - self.window
+        async with AsyncSessionLocal() as session:
+            repo = PatrolRepository(PatrolRecord, session)
+            self.covered_from = since
+            async for row in repo.stream_recent_records(since):
+                self._insert(*row)
+        self._trim()
+        logger.info(f"Hot store loaded: {len(self)} records since {self.covered_from}, {self.size} bytes")
+    
+    def add(self, record) -> None:
+        """
+        Add a newly created record
+        
+        Args:
+            record: PatrolRecord (or any object with its attributes)
+        """
+        if self.covered_from is None or record.time < self.covered_from:
+            return
+        self._insert(
+            record.id, record.point, record.guard_name, record.time,
+            record.server_time, record.image_id, record.note
+        )
+        self._trim()
+    
+    def covers(self, start_time: Optional[int]) -> bool:
+        """
+        Check whether a range starting at start_time can be answered from the store
+        
+        Args:
+            start_time: Start of the queried range (None or 0: unbounded)
+        
+        Returns:
+            bool: True if every record in the range is held
+        """
+        if self.covered_from is None:
+            return False
+        if start_time and start_time >= self.covered_from:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+    
+    def _insert(self, record_id: str, point: str, guard_name: str, record_time: int,
+                server_time: int, image_id: str, note: str) -> None:
+        """Insert a row at its time position (appended when in order)"""
+        point_code = self._point_codes.get(point)
+        if point_code is None:
+            point_code = self._point_codes[point] = len(self._point_names)
+            self._point_names.append(point)
+        guard_code = self._guard_codes.get(guard_name)
+        if guard_code is None:
+            guard_code = self._guard_codes[guard_name] = len(self._guard_names)
+            self._guard_names.append(guard_name)
+        
+        note = note or ""
+        columns = (
+            (self._times, record_time), (self._server_times, server_time),
+            (self._points, point_code), (self._guards, guard_code), (self._has_notes, note != ""),
+            (self._ids, str(record_id)), (self._image_ids, image_id or ""), (self._notes, note)
+        )
+        if not self._times or record_time >= self._times[-1]:
+            position = len(self._times)
+            for column, value in columns:
+                column.append(value)
+        else:
+            position = bisect_right(self._times, record_time)
+            for column, value in columns:
+                column.insert(position, value)
+        self.size += self._row_size(position)
+    
+    def _row_size(self, index: int) -> int:
+        """Estimate the memory held by one row"""
+        note = self._notes[index]
+        return (
+            _ROW_BYTES
+            + sys.getsizeof(self._ids[index])
+            + sys.getsizeof(self._image_ids[index])
+            + (sys.getsizeof(note) if note else 0)
+        )
+    
+    def _trim(self) -> None:
+        """Drop rows older than the window, then the oldest rows while over the memory limit"""
+        cutoff = int(time.time()) - self.window
+        if self._times and self._times[0] < cutoff - _TRIM_SLACK:
+            self._drop_before(cutoff)
+        
+        if self.size > self.max_bytes:
+            # Free down to 90% of the limit, so this does not run on every insert
+            excess = self.size - self.max_bytes * 9 // 10
+            count = 0
+            while count < len(self._times) and excess > 0:
+                excess -= self._row_size(count)
+                count += 1
+            if count < len(self._times):
+                # Rows sharing the cut time go too, so the kept range stays complete
+                cut = self._times[count] if self._times[count] != self._times[count - 1] else self._times[count] + 1
+            else:
+                cut = self._times[-1] + 1
+            self._drop_before(cut)
+            logger.warning(f"Hot store over {self.max_bytes} bytes: now covers records since {self.covered_from}")
+    
+    def _drop_before(self, cut: int) -> None:
+        """Remove the rows with time < cut and advance covered_from"""
+        count = bisect_left(self._times, cut)
+        self.size -= sum(self._row_size(index) for index in range(count))
+        for column in (
+            self._times, self._server_times, self._points, self._guards, self._has_notes,
+            self._ids, self._image_ids, self._notes
+        ):
+            del column[:count]
+        self.covered_from = max(self.covered_from, cut)
+    
+    def _slice(self, start_time: int, end_time: int) -> Tuple[int, int]:
+        """Row range [first, last) with start_time <= time <= end_time"""
+        return bisect_left(self._times, start_time), bisect_right(self._times, end_time)
+    
+    def _codes(self, names: Dict[str, int], wanted) -> np.ndarray:
+        """Codes of the names present in the store"""
+        return np.array([names[name] for name in wanted if name in names], dtype=np.int32)
+    
+    def _select(self, filters: Dict) -> np.ndarray:
+        """
+        Rows matching repository filters, oldest first
+        
+        Args:
+            filters: Filters built by PatrolService._query_filters
+        
+        Returns:
+            np.ndarray: Row indices
+        
+        Raises:
+            ValueError: If a filter is not supported by the store
+        """
+        unsupported = set(filters) - _SUPPORTED_FILTERS
+        if unsupported:
+            raise ValueError(f"Unsupported hot store filters: {sorted(unsupported)}")
+        
+        start_time, end_time = filters.get("time__between", (
+            filters.get("time__gte", self.covered_from),
+            filters.get("time__lte", 2 ** 62)
+        ))
+        first, last = self._slice(start_time, end_time)
+        mask = np.ones(last - first, dtype=bool)
+        
+        if "point" in filters or "point__in" in filters:
+            wanted = [filters["point"]] if "point" in filters else filters["point__in"]
+            points = np.frombuffer(self._points, dtype=np.int32)[first:last]
+            mask &= np.isin(points, self._codes(self._point_codes, wanted))
+        
+        if "guard_name__contains_any" in filters:
+            # LIKE %name% with MySQL's case-insensitive collation
+            needles = [needle.lower() for needle in filters["guard_name__contains_any"]]
+            wanted = [name for name in self._guard_names if any(needle in name.lower() for needle in needles)]
+            guards = np.frombuffer(self._guards, dtype=np.int32)[first:last]
+            mask &= np.isin(guards, self._codes(self._guard_codes, wanted))
+        
+        if "note__ne" in filters:
+            mask &= np.frombuffer(self._has_notes, dtype=np.int8)[first:last] != 0
+        
+        return np.flatnonzero(mask) + first
+    
+    def _record(self, index: int) -> HotRecord:
+        """Build the record of a row"""
+        return HotRecord(
+            id=self._ids[index],
+            point=self._point_names[self._points[index]],
+            guard_name=self._guard_names[self._guards[index]],
+            time=self._times[index],
+            server_time=self._server_times[index],
+            image_id=self._image_ids[index],
+            note=self._notes[index]
+        )
+    
+    async def get_paginated(
+        self,
+        page: int = 1,
+        limit: int = 10,
+        filters: Optional[Dict] = None,
+        order_by: Optional[List[str]] = None
+    ) -> Tuple[List[HotRecord], int]:
+        """
+        Get a page of records, newest first (as PatrolRepository.get_paginated with order_by ["-time"])
+        
+        Args:
+            page: Page number (1-indexed)
+            limit: Number of records per page
+            filters: Repository filters (range must start at or after covered_from)
+            order_by: Only ["-time"] is supported
+        
+        Returns:
+            Tuple[List[HotRecord], int]: Records and total count
+        
+        Raises:
+            ValueError: If a filter or ordering is not supported by the store
+        """
+        if order_by not in (None, ["-time"]):
+            raise ValueError(f"Unsupported hot store ordering: {order_by}")
+        rows = self._select(filters or {})[::-1]
+        offset = (page - 1) * limit
+        return [self._record(int(index)) for index in rows[offset:offset + limit]], int(rows.size)
+    
+    async def get_scan_counts(self, start_time: int, end_time: int) -> List[Tuple[str, str, int]]:
+        """
+        Count scans per point and guard in a time range
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp, at or after covered_from)
+            end_time: Latest record time (Unix timestamp)
+        
+        Returns:
+            List[Tuple[str, str, int]]: (point, guard name, scans)
+        """
+        first, last = self._slice(start_time, end_time)
+        guard_count = max(len(self._guard_names), 1)
+        keys = (
+            np.frombuffer(self._points, dtype=np.int32)[first:last].astype(np.int64) * guard_count
+            + np.frombuffer(self._guards, dtype=np.int32)[first:last]
+        )
+        groups, counts = np.unique(keys, return_counts=True)
+        return [
+            (self._point_names[group // guard_count], self._guard_names[group % guard_count], count)
+            for group, count in zip(groups.tolist(), counts.tolist())
+        ]
+    
+    async def get_hour_point_counts(self, start_time: int, end_time: int, utc_offset: int) -> List[Tuple[int, str, int]]:
+        """
+        Count scans per local hour of day and point in a time range
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp, at or after covered_from)
+            end_time: Latest record time (Unix timestamp)
+            utc_offset: Local time offset from UTC in seconds
+        
+        Returns:
+            List[Tuple[int, str, int]]: (hour of day, point, scans)
+        """
+        first, last = self._slice(start_time, end_time)
+        hours = (np.frombuffer(self._times, dtype=np.int64)[first:last] + utc_offset) % DAY // HOUR
+        keys = np.frombuffer(self._points, dtype=np.int32)[first:last].astype(np.int64) * 24 + hours
+        groups, counts = np.unique(keys, return_counts=True)
+        return [
+            (group % 24, self._point_names[group // 24], count)
+            for group, count in zip(groups.tolist(), counts.tolist())
+        ]
+    
+    async def stream_point_visits(self, start_time: int, end_time: int) -> AsyncIterator[Tuple[str, int, str, str]]:
+        """
+        Get the visits in a time range ordered by point, then time (as PatrolRepository)
+        
+        Args:
+            start_time: Earliest record time (Unix timestamp, at or after covered_from)
+            end_time: Latest record time (Unix timestamp)
+        
+        Yields:
+            Tuple[str, int, str, str]: (point, time, guard name, record ID)
+        """
+        first, last = self._slice(start_time, end_time)
+        visits = sorted(
+            (
+                (
+                    self._point_names[self._points[index]],
+                    self._times[index],
+                    self._guard_names[self._guards[index]],
+                    self._ids[index]
+                )
+                for index in range(first, last)
+            ),
+            key=lambda visit: (visit[0], visit[1], visit[3])
+        )
+        for visit in visits:
+            yield visit
+    
+    def stats(self) -> Dict:
+        """
+        Get store metrics
+        
+        Returns:
+            Dict: Record count, covered range, estimated bytes, limit, hits and misses
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.covered_from is not None,
+            "records": len(self),
+            "covered_from": self.covered_from,
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared by every request handler in this process (loaded when HOT_STORE_ENABLED)
+hot_store = HotStore(settings.HOT_STORE_HOURS * 3600, settings.HOT_STORE_MAX_MB * 1024 * 1024)
+
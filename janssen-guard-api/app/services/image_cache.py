@@ -0,0 +1,154 @@
+"""In-process LRU cache of recently served image bytes"""
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+from app.config import settings
+
+
+class ImageCache:
+    """
+    Least-recently-used image cache bounded by total bytes
+    
+    Supervisors reopen the same recent images over and over, so the bytes
+    of files the API sends itself are kept in memory, keyed by storage key
+    (plus offset for packed images). Stored objects never change under a
+    key, so entries only leave the cache by eviction or deletion. Images
+    larger than max_item_bytes are never cached, so one large file cannot
+    flush everything else.
+    """
+    
+    def __init__(self, max_bytes: int, max_item_bytes: int):
+        """
+        Initialize an empty cache
+        
+        Args:
+            max_bytes: Total size of cached images (0 disables the cache)
+            max_item_bytes: Largest image that is cached
+        """
+        self.max_bytes = max_bytes
+        self.max_item_bytes = min(max_item_bytes, max_bytes)
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def accepts(self, size: int) -> bool:
+        """
+        Check whether an image of this size would be cached
+        
+        Args:
+            size: Image size in bytes
+        
+        Returns:
+            bool: True if it fits under max_item_bytes
+        """
+        return 0 < size <= self.max_item_bytes
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get cached image bytes and mark them recently used
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Optional[bytes]: Image bytes or None on a miss
+        """
+        data = self._items.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Cache image bytes, evicting the least recently used images to make room
+        
+        Args:
+            key: Cache key
+            data: Image bytes
+        """
+        if not self.accepts(len(data)):
+            return
+        self.discard(key)
+        self._items[key] = bytes(data)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+    
+    async def read_through(self, key: str, read: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Get image bytes from the cache, reading and caching them on a miss
+        
+        Args:
+            key: Cache key
+            read: Reads the image from storage
+        
+        Returns:
+            bytes: Image bytes
+        """
+        data = self.get(key)
+        if data is None:
+            data = await read()
+            self.put(key, data)
+        return data
+    
+    def discard(self, key: str) -> None:
+        """
+        Drop an image from the cache (e.g. after deletion)
+        
+        Args:
+            key: Cache key
+        """
+        data = self._items.pop(key, None)
+        if data is not None:
+            self.size -= len(data)
+    
+    def stats(self) -> Dict:
+        """
+        Get cache metrics
+        
+        Returns:
+            Dict: Entry count, bytes used, limits, hits, misses, hit rate and evictions
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "max_item_bytes": self.max_item_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def cache_key(key: str, offset: Optional[int] = None) -> str:
+    """
+    Get the cache key of a stored image
+    
+    Args:
+        key: Storage key
+        offset: Offset within the object (packed images)
+    
+    Returns:
+        str: Cache key
+    """
+    return key if offset is None else f"{key}@{offset}"
+
+
+# Shared by every request in this process
+image_cache = ImageCache(
+    settings.IMAGE_MEMORY_CACHE_MB * 1024 * 1024,
+    settings.IMAGE_MEMORY_CACHE_MAX_ITEM_KB * 1024
+)
+
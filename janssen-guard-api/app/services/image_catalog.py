@@ -0,0 +1,218 @@
+"""In-process image catalog backed by the stored_images table"""
+
+import time
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogEntry(NamedTuple):
+    """Where and how an image is stored"""
+    path: str  # Storage key (relative to IMAGE_STORAGE_PATH)
+    size: int
+    content_type: str
+    sha256: str
+    segment_offset: Optional[int] = None  # Set when packed: the image is size bytes at this offset of path
+
+
+def _entry(row) -> CatalogEntry:
+    """Build a catalog entry from a stored_images row"""
+    return CatalogEntry(row.path, row.size, row.content_type, row.sha256, row.segment_offset)
+
+
+class ImageCatalog:
+    """
+    Image ID -> storage location index
+    
+    Every saved image is recorded in the stored_images table and kept in a
+    dict warmed at startup, so resolving an image is one dict lookup rather
+    than several blocking stat() calls. IDs missing from the dict (e.g.
+    saved by another API process) are looked up in the table once.
+    
+    Images with identical bytes share one stored file: the duplicate's
+    entry records the same path and the ID of the first copy.
+    
+    The transcoder and packer move images and only update the catalog of
+    the process they run in, so other processes re-read an entry once it
+    is older than IMAGE_CATALOG_TTL_SECONDS, and callers refresh() it
+    when its file turns out to be gone.
+    """
+    
+    def __init__(self):
+        """Initialize an empty catalog"""
+        # Image ID -> (entry, monotonic time it was read or written)
+        self._entries: Dict[str, Tuple[CatalogEntry, float]] = {}
+        self.ttl = settings.IMAGE_CATALOG_TTL_SECONDS
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    async def load(self) -> None:
+        """Warm the catalog from the database (application startup)"""
+        async with AsyncSessionLocal() as session:
+            repo = StoredImageRepository(StoredImage, session)
+            async for row in repo.stream_catalog():
+                self._entries[row.image_id] = (_entry(row), time.monotonic())
+        logger.info(f"Image catalog loaded: {len(self._entries)} images")
+    
+    async def get(self, image_id: str) -> Optional[CatalogEntry]:
+        """
+        Get the catalog entry for an image
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            Optional[CatalogEntry]: Entry or None if the image is unknown
+        """
+        cached = self._entries.get(image_id)
+        if cached is not None and (not self.ttl or time.monotonic() - cached[1] < self.ttl):
+            return cached[0]
+        return await self.refresh(image_id)
+    
+    async def refresh(self, image_id: str) -> Optional[CatalogEntry]:
+        """
+        Re-read an entry from the database (e.g. its file was moved by another process)
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            Optional[CatalogEntry]: Current entry or None if the image is unknown
+        """
+        async with AsyncSessionLocal() as session:
+            row = await StoredImageRepository(StoredImage, session).get_by_id(image_id)
+        if row is None:
+            self._entries.pop(image_id, None)
+            return None
+        entry = _entry(row)
+        self._entries[image_id] = (entry, time.monotonic())
+        return entry
+    
+    def peek(self, image_id: str) -> Optional[CatalogEntry]:
+        """
+        Get an entry from memory only (no database lookup)
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            Optional[CatalogEntry]: Entry or None if not loaded
+        """
+        cached = self._entries.get(image_id)
+        return cached[0] if cached is not None else None
+    
+    async def find_duplicate(self, sha256: str) -> Optional[Tuple[str, CatalogEntry]]:
+        """
+        Find a stored image with the given content hash
+        
+        Args:
+            sha256: Hex SHA-256 of the image bytes
+            
+        Returns:
+            Optional[Tuple[str, CatalogEntry]]: ID of the first copy and its entry, or None
+        """
+        async with AsyncSessionLocal() as session:
+            row = await StoredImageRepository(StoredImage, session).get_by_sha256(sha256)
+        if row is None:
+            return None
+        return row.duplicate_of or row.image_id, _entry(row)
+    
+    async def add(
+        self,
+        image_id: str,
+        entry: CatalogEntry,
+        duplicate_of: Optional[str] = None,
+        replace: bool = False
+    ) -> None:
+        """
+        Record a stored image
+        
+        Args:
+            image_id: Image identifier
+            entry: Storage details
+            duplicate_of: ID of the image whose file this one shares
+            replace: Overwrite an existing entry (relinking a stale one)
+            
+        Raises:
+            IntegrityError: If the image ID is already catalogued (without replace)
+        """
+        async with AsyncSessionLocal() as session:
+            await StoredImageRepository(StoredImage, session).save({
+                "image_id": image_id,
+                **entry._asdict(),
+                "duplicate_of": duplicate_of,
+                "transcoded_at": None
+            }, replace)
+        self.remember(image_id, entry)
+    
+    async def add_duplicate(self, image_id: str, duplicate_of: str) -> Optional[CatalogEntry]:
+        """
+        Record an image that shares another image's stored file
+        
+        The location is copied from the original's row when the entry is
+        inserted, not from an earlier lookup, so a pack that moved the
+        original in between is picked up.
+        
+        Args:
+            image_id: Image identifier
+            duplicate_of: ID of the image whose file this one shares
+            
+        Returns:
+            Optional[CatalogEntry]: Entry, or None if the original was deleted meanwhile
+        """
+        async with AsyncSessionLocal() as session:
+            repo = StoredImageRepository(StoredImage, session)
+            if not await repo.insert_duplicate(image_id, duplicate_of):
+                return None
+            await session.commit()
+            row = await repo.get_by_id(image_id)
+        entry = _entry(row)
+        self.remember(image_id, entry)
+        return entry
+    
+    def remember(self, image_id: str, entry: CatalogEntry) -> None:
+        """
+        Update the in-memory entry after the row was changed directly
+        
+        Args:
+            image_id: Image identifier
+            entry: Storage details
+        """
+        self._entries[image_id] = (entry, time.monotonic())
+    
+    async def remove(self, image_id: str) -> None:
+        """
+        Forget a stored image
+        
+        Duplicates of the image are re-pointed to a surviving copy.
+        
+        Args:
+            image_id: Image identifier
+        """
+        self._entries.pop(image_id, None)
+        async with AsyncSessionLocal() as session:
+            await StoredImageRepository(StoredImage, session).delete_entry(image_id)
+    
+    async def is_referenced(self, path: str) -> bool:
+        """
+        Check whether any image is still stored at a path
+        
+        Args:
+            path: Storage key
+            
+        Returns:
+            bool: True if a catalog entry uses the path
+        """
+        async with AsyncSessionLocal() as session:
+            return await StoredImageRepository(StoredImage, session).count_references(path) > 0
+
+
+# Shared by every ImageService instance in this process
+image_catalog = ImageCatalog()
+
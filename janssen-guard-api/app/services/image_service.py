@@ -1,15 +1,40 @@
 """Image storage service for handling patrol images"""
 
-import os
-import aiofiles
+import uuid
+import asyncio
+import hashlib
 import httpx
 import logging
-from typing import Optional, Dict
-from pathlib import Path
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pathlib import Path, PurePosixPath
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.services.image_cache import cache_key, image_cache
+from app.services.image_catalog import CatalogEntry, image_catalog
+from app.storage import LocalStorage, get_storage
+from app.services.rendition_service import RenditionService
+from app.utils.image_types import IMAGE_EXTENSIONS, sniff_content_type
 
 logger = logging.getLogger(__name__)
 
+# Extensions written before the catalog existed (probed by build_image_catalog)
+LEGACY_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+class ImageExists(ValueError):
+    """An image with this ID is already stored"""
+
+
+class ImageFile(NamedTuple):
+    """A servable image object"""
+    key: str  # Storage key
+    content_type: str
+    etag: Optional[str] = None  # None: derive from storage metadata
+    offset: Optional[int] = None  # Packed images: the image is size bytes at this offset of key
+    size: Optional[int] = None
+
 
 class ImageService:
     """Service for handling image storage and retrieval"""
@@ -44,9 +69,200 @@ class ImageService:
     }
     
     def __init__(self):
-        """Initialize image service and create storage directory"""
+        """Initialize image service on the configured storage backend"""
+        self.storage = get_storage()
+        # Local storage root (legacy layout probing and maintenance commands)
         self.storage_path = Path(settings.IMAGE_STORAGE_PATH)
-        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.renditions = RenditionService(self.storage)
+        # Recently read images, shared by every request in this process
+        self.cache = image_cache
+    
+    def shard_prefix(self, image_id: str) -> str:
+        """
+        Get the sharded key prefix an image is stored under
+        
+        Images are spread over 65536 directories (ab/cd/) using the MD5 of
+        the image ID, so no single directory grows large.
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            str: Key prefix for the image, e.g. "ab/cd"
+        """
+        digest = hashlib.md5(image_id.encode()).hexdigest()
+        return f"{digest[:2]}/{digest[2:4]}"
+    
+    def new_key(self, image_id: str, extension: str, tag: Optional[str] = None) -> str:
+        """
+        Get a storage key of its own for a write of an image's bytes
+        
+        Keys carry an 8-hex tag ("ab/cd/img-1.3fa2c9e1.jpg"), so concurrent
+        writes for the same image ID never replace each other's file and
+        a catalogued path always holds the bytes its row describes.
+        
+        Args:
+            image_id: Image identifier
+            extension: File extension including the dot
+            tag: 8 hex characters (e.g. from the content hash); random if omitted
+            
+        Returns:
+            str: Storage key under the image's shard prefix
+        """
+        return f"{self.shard_prefix(image_id)}/{image_id}.{tag or uuid.uuid4().hex[:8]}{extension}"
+    
+    def shard_dir(self, image_id: str) -> Path:
+        """
+        Get the local sharded directory an image is stored in
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            Path: Directory for the image under IMAGE_STORAGE_PATH
+        """
+        return self.storage_path / self.shard_prefix(image_id)
+    
+    def candidate_paths(self, image_id: str) -> Iterator[Path]:
+        """
+        Yield every path an image may be stored under
+        
+        The sharded layout comes first; the legacy flat layout stays
+        readable until migrate_image_layout has moved every file.
+        
+        Args:
+            image_id: Image identifier
+            
+        Yields:
+            Path: Candidate file paths
+        """
+        for directory in (self.shard_dir(image_id), self.storage_path):
+            for ext in LEGACY_EXTENSIONS:
+                yield directory / f"{image_id}{ext}"
+    
+    def describe_file(self, file_path: Path) -> CatalogEntry:
+        """
+        Build the catalog entry for a file already in storage (blocking)
+        
+        Args:
+            file_path: Image file path under the storage root
+            
+        Returns:
+            CatalogEntry: Path, size, content type and SHA-256 of the file
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            head = f.read(64 * 1024)
+            chunk = head
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(1024 * 1024)
+        
+        return CatalogEntry(
+            path=file_path.relative_to(self.storage_path).as_posix(),
+            size=file_path.stat().st_size,
+            content_type=sniff_content_type(head) or "image/jpeg",
+            sha256=digest.hexdigest()
+        )
+    
+    def original_key(self, image_id: str, entry: CatalogEntry) -> str:
+        """
+        Get the key an image is known by for renditions
+        
+        Loose images use their own key. Packed images are addressed by the
+        key they would have as a loose file, so renditions generated
+        before packing stay valid.
+        
+        Args:
+            image_id: Image identifier
+            entry: Catalog entry
+            
+        Returns:
+            str: Original image key
+        """
+        if entry.segment_offset is None:
+            return entry.path
+        return f"{self.shard_prefix(image_id)}/{image_id}{IMAGE_EXTENSIONS.get(entry.content_type, '.jpg')}"
+    
+    async def read_entry(self, entry: CatalogEntry) -> bytes:
+        """
+        Read a catalogued image, loose or packed, through the image cache
+        
+        Args:
+            entry: Catalog entry
+            
+        Returns:
+            bytes: Image data
+            
+        Raises:
+            FileNotFoundError: If the file or segment is missing
+        """
+        return await self.read_file(ImageFile(entry.path, entry.content_type, None, entry.segment_offset, entry.size))
+    
+    async def read_file(self, image_file: ImageFile) -> bytes:
+        """
+        Read a servable image object through the image cache
+        
+        Args:
+            image_file: Original or rendition to read
+            
+        Returns:
+            bytes: File contents
+            
+        Raises:
+            FileNotFoundError: If the file or segment is missing
+        """
+        if image_file.offset is None:
+            read = lambda: self.storage.read(image_file.key)
+        else:
+            read = lambda: self.storage.read_range(image_file.key, image_file.offset, image_file.size)
+        return await self.cache.read_through(cache_key(image_file.key, image_file.offset), read)
+    
+    def probe_image(self, image_id: str) -> Optional[Path]:
+        """
+        Find an uncatalogued image by checking every candidate path (blocking)
+        
+        Args:
+            image_id: Image identifier
+            
+        Returns:
+            Optional[Path]: File path or None if not found
+        """
+        for file_path in self.candidate_paths(image_id):
+            if file_path.exists():
+                return file_path
+        return None
+    
+    async def locate(self, image_id: str, refresh: bool = False) -> Optional[CatalogEntry]:
+        """
+        Look up where an image is stored
+        
+        Only the catalog is consulted, so unknown IDs never touch storage.
+        With IMAGE_CATALOG_PROBE_MISSES enabled (local storage only),
+        misses fall back to probing the legacy paths and the hit is
+        catalogued.
+        
+        Args:
+            image_id: Image identifier
+            refresh: Re-read the catalog row (the cached location was not found)
+            
+        Returns:
+            Optional[CatalogEntry]: Catalog entry or None if not found
+        """
+        if refresh:
+            entry = await image_catalog.refresh(image_id)
+        else:
+            entry = await image_catalog.get(image_id)
+        if entry is None and settings.IMAGE_CATALOG_PROBE_MISSES and isinstance(self.storage, LocalStorage):
+            file_path = await run_in_threadpool(self.probe_image, image_id)
+            if file_path:
+                entry = await run_in_threadpool(self.describe_file, file_path)
+                try:
+                    await image_catalog.add(image_id, entry)
+                except IntegrityError:
+                    # Catalogued meanwhile (a concurrent probe or save)
+                    entry = await image_catalog.refresh(image_id)
+        return entry
     
     def get_camera_url(self, point: str) -> Optional[str]:
         """
@@ -64,24 +280,61 @@ class ImageService:
         """
         Save image to storage
         
+        Images are content-addressed: if identical bytes are already stored
+        (a frozen camera stream, an NVR returning a cached frame), the new
+        image ID becomes a reference to that file instead of a second copy.
+        Stored images are never replaced: an ID that is already catalogued
+        is rejected, and the bytes go to a key of their own, so a
+        concurrent save of the same ID cannot overwrite them either.
+        
         Args:
             image_id: Unique image identifier
             image_data: Binary image data
             
         Returns:
-            str: Image file path
+            str: Image storage key
+            
+        Raises:
+            ImageExists: If an image with this ID is already stored
         """
-        # Determine file extension (default to .jpg)
-        extension = ".jpg"
+        if await self.locate(image_id) is not None:
+            raise ImageExists(f"Image {image_id} already exists")
         
-        # Create file path
-        file_path = self.storage_path / f"{image_id}{extension}"
+        digest = await run_in_threadpool(lambda: hashlib.sha256(image_data).hexdigest())
+        duplicate = await image_catalog.find_duplicate(digest)
+        if duplicate and duplicate[1].size == len(image_data):
+            original_id = duplicate[0]
+            try:
+                entry = await image_catalog.add_duplicate(image_id, original_id)
+            except IntegrityError:
+                raise ImageExists(f"Image {image_id} already exists")
+            if entry:
+                logger.info(f"Image {image_id} is a duplicate of {original_id}, not stored again")
+                return entry.path
+            # The original was deleted meanwhile: store the bytes after all
         
-        # Save image
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(image_data)
+        # Determine file extension from the content (default to .jpg)
+        content_type = sniff_content_type(image_data) or "image/jpeg"
+        key = self.new_key(image_id, IMAGE_EXTENSIONS[content_type])
+        await self.storage.put(key, image_data, content_type)
+        
+        # Record it so reads are a single catalog lookup
+        try:
+            await image_catalog.add(image_id, CatalogEntry(
+                path=key,
+                size=len(image_data),
+                content_type=content_type,
+                sha256=digest
+            ))
+        except IntegrityError:
+            # A concurrent save of the same ID won; its file is untouched
+            await self.storage.delete(key)
+            raise ImageExists(f"Image {image_id} already exists")
+        
+        # Fresh captures are the images most likely to be viewed next
+        self.cache.put(key, image_data)
         
-        return str(file_path)
+        return key
     
     async def get_image(self, image_id: str) -> Optional[bytes]:
         """
@@ -93,48 +346,212 @@ class ImageService:
         Returns:
             Optional[bytes]: Image data or None if not found
         """
-        # Try common extensions
-        for ext in ['.jpg', '.jpeg', '.png']:
-            file_path = self.storage_path / f"{image_id}{ext}"
-            if file_path.exists():
-                async with aiofiles.open(file_path, 'rb') as f:
-                    return await f.read()
-        
+        for refresh in (False, True):
+            entry = await self.locate(image_id, refresh)
+            if not entry:
+                return None
+            try:
+                return await self.read_entry(entry)
+            except FileNotFoundError:
+                # Possibly moved by another process: retry with the current row
+                pass
+        logger.warning(f"Catalogued image {image_id} is missing from storage: {entry.path}")
         return None
     
     async def delete_image(self, image_id: str) -> bool:
         """
         Delete image from storage
         
+        The file is only removed once no duplicate references it. Packed
+        images are only dropped from the catalog; their bytes stay in the
+        segment file as dead space.
+        
         Args:
             image_id: Image identifier
             
         Returns:
             bool: True if deleted, False if not found
         """
-        for ext in ['.jpg', '.jpeg', '.png']:
-            file_path = self.storage_path / f"{image_id}{ext}"
-            if file_path.exists():
-                os.remove(file_path)
-                return True
-        return False
+        entry = await self.locate(image_id)
+        if not entry:
+            return False
+        
+        await image_catalog.remove(image_id)
+        if entry.segment_offset is not None:
+            self.cache.discard(cache_key(entry.path, entry.segment_offset))
+            await self.delete_renditions(self.original_key(image_id, entry))
+        elif not await image_catalog.is_referenced(entry.path):
+            await self.storage.delete(entry.path)
+            self.cache.discard(entry.path)
+            await self.delete_renditions(entry.path)
+        return True
     
-    def get_image_path(self, image_id: str) -> Optional[Path]:
+    async def delete_renditions(self, original: str) -> None:
         """
-        Get image file path if exists
+        Delete the renditions of an image from storage and the image cache
+        
+        Args:
+            original: Original image key
+        """
+        for size in self.renditions.SIZES:
+            self.cache.discard(self.renditions.rendition_key(original, size))
+        await self.renditions.delete_renditions(original)
+    
+    async def get_image_file(
+        self,
+        image_id: str,
+        size: Optional[str] = None,
+        refresh: bool = False
+    ) -> Optional[ImageFile]:
+        """
+        Get the object to serve for an image request
+        
+        Originals carry their catalogued content type and a content-hash
+        ETag; renditions are JPEGs validated by storage metadata. Callers
+        that find the object gone retry with refresh, since another
+        process may have transcoded or packed the image.
         
         Args:
             image_id: Image identifier
+            size: Rendition name ("thumb" or "preview"), None for the original
+            refresh: Re-read the catalog row instead of using the cached entry
             
         Returns:
-            Optional[Path]: File path or None if not found
+            Optional[ImageFile]: File to serve or None if the image does not exist
+            
+        Raises:
+            ValueError: If the size is unknown
         """
-        for ext in ['.jpg', '.jpeg', '.png']:
-            file_path = self.storage_path / f"{image_id}{ext}"
-            if file_path.exists():
-                return file_path
+        entry = await self.locate(image_id, refresh)
+        if not entry:
+            return None
+        
+        original = ImageFile(
+            entry.path,
+            entry.content_type,
+            f'"{entry.sha256[:32]}"',
+            entry.segment_offset,
+            entry.size
+        )
+        if not size:
+            return original
+        
+        original_key = self.original_key(image_id, entry)
+        rendition = await self.get_rendition_key(
+            original_key,
+            size,
+            None if entry.segment_offset is None else lambda: self.read_entry(entry)
+        )
+        if rendition == original_key:
+            return original
+        return ImageFile(rendition, "image/jpeg")
+    
+    async def read_image_file(self, image_id: str, size: Optional[str] = None) -> Optional[Tuple[ImageFile, bytes]]:
+        """
+        Resolve and read the file served for an image request
+        
+        Args:
+            image_id: Image identifier
+            size: Rendition name ("thumb" or "preview"), None for the original
+            
+        Returns:
+            Optional[Tuple[ImageFile, bytes]]: File and its contents, or None if not found
+        """
+        for refresh in (False, True):
+            image_file = await self.get_image_file(image_id, size, refresh)
+            if not image_file:
+                return None
+            try:
+                return image_file, await self.read_file(image_file)
+            except FileNotFoundError:
+                # Possibly moved by another process: retry with the current row
+                pass
+        logger.warning(f"Image {image_id} is missing from storage: {image_file.key}")
         return None
     
+    async def iter_archive_entries(
+        self,
+        image_ids: Iterable[str],
+        size: Optional[str] = None,
+        concurrency: int = 8
+    ) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Read images for an archive, a bounded number at a time, in request order
+        
+        Up to `concurrency` reads (and rendition renders) run ahead of the
+        entry being yielded, so memory stays bounded by the window rather
+        than the number of images. IDs that cannot be found are listed in
+        a trailing MISSING.txt entry.
+        
+        Args:
+            image_ids: Image identifiers
+            size: Rendition name ("thumb" or "preview"), None for originals
+            concurrency: Maximum images read in parallel
+            
+        Yields:
+            Tuple[str, bytes]: Archive entry name and contents
+        """
+        ids = iter(image_ids)
+        window = deque()
+        missing: List[str] = []
+        
+        def schedule() -> None:
+            for image_id in ids:
+                window.append((image_id, asyncio.create_task(self.read_image_file(image_id, size))))
+                return
+        
+        try:
+            for _ in range(max(concurrency, 1)):
+                schedule()
+            
+            while window:
+                image_id, task = window.popleft()
+                result = await task
+                schedule()
+                
+                if result is None:
+                    missing.append(image_id)
+                    continue
+                image_file, data = result
+                extension = IMAGE_EXTENSIONS.get(image_file.content_type) or PurePosixPath(image_file.key).suffix
+                yield f"{image_id}{extension}", data
+        finally:
+            # Client went away: stop reading ahead
+            for _, task in window:
+                task.cancel()
+        
+        if missing:
+            yield "MISSING.txt", ("\n".join(missing) + "\n").encode()
+    
+    async def get_rendition_key(
+        self,
+        original: str,
+        size: str,
+        read_source: Optional[Callable[[], Awaitable[bytes]]] = None
+    ) -> str:
+        """
+        Get the storage key of a resized rendition, generating it on first request
+        
+        Args:
+            original: Original image key
+            size: Rendition name ("thumb" or "preview")
+            read_source: Reads the original's bytes (packed images, whose key is not an object)
+            
+        Returns:
+            str: Rendition key (the original's key if it cannot be decoded)
+            
+        Raises:
+            ValueError: If the size is unknown
+        """
+        try:
+            return await self.renditions.get_rendition(original, size, read_source)
+        except ValueError:
+            raise
+        except Exception as e:
+            # Undecodable image: serve the original rather than nothing
+            logger.error(f"Error generating {size} rendition for {original}: {str(e)}", exc_info=True)
+            return original
+    
     async def fetch_image_from_camera(self, camera_url: str, timeout: int = 10) -> Optional[bytes]:
         """
         Fetch image from IP camera URL
@@ -193,6 +610,9 @@ class ImageService:
             file_path = await self.save_image(image_id, image_data)
             logger.info(f"Successfully saved camera image: {file_path}")
             return file_path
+        except ImageExists as e:
+            logger.warning(f"Camera image not saved: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"Error saving camera image: {str(e)}", exc_info=True)
             return None
@@ -0,0 +1,198 @@
+"""In-process monitor raising events for overdue patrol points"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patrol_record import PatrolRecord
+from app.repositories.patrol_repository import PatrolRepository
+from app.schemas.patrol_record import OverdueEvent, OverdueEventsResponse, PointDeadline
+from app.utils.points import normalize_point, point_sort_key, round_points
+
+logger = logging.getLogger(__name__)
+
+
+class OverdueMonitor:
+    """
+    Last-visit deadline per round point, kept in a hashed timer wheel
+    
+    Each scan moves its point's deadline to scan time + SLA by appending
+    to one wheel slot (constant cost; the old entry is ignored when its
+    slot comes round). A deadline goes in the slot of the first tick at
+    or after it, so every entry of a processed slot is due. A background
+    task advances the wheel at each tick boundary and raises an "overdue"
+    event for each point whose current deadline has passed, at most one
+    tick late; the point's next scan raises "resolved". Deadlines live
+    in memory only: the database is read once at startup, never polled.
+    
+    Only scans handled by this process are seen, so run a single API
+    worker when relying on the alerts.
+    """
+    
+    def __init__(self, sla: int, tick: int):
+        """
+        Initialize an empty monitor
+        
+        Args:
+            sla: Seconds a round point may go without a scan
+            tick: Timer wheel resolution in seconds
+        """
+        self.sla = sla
+        self.tick = tick
+        # One revolution spans more than the SLA, so a new deadline always
+        # lands within the next revolution
+        self._wheel: List[List[Tuple[int, str]]] = [[] for _ in range(self.sla // self.tick + 3)]
+        self._cursor: Optional[int] = None  # Last tick processed
+        self._points: Set[str] = set(round_points())
+        self._visits: Dict[str, Tuple[int, str]] = {}  # point -> (time, guard name)
+        self._deadlines: Dict[str, int] = {}
+        self._overdue: Set[str] = set()
+        self._events: Deque[OverdueEvent] = deque(maxlen=settings.PATROL_OVERDUE_EVENT_HISTORY)
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+    
+    async def load(self) -> None:
+        """Seed deadlines from each point's latest record (application startup)"""
+        async with AsyncSessionLocal() as session:
+            latest = await PatrolRepository(PatrolRecord, session).get_latest_per_point()
+        now = int(time.time())
+        self._cursor = now // self.tick
+        for record in latest:
+            self.record_visit(record.point, record.guard_name, record.time, now)
+        # Points never scanned are due one SLA after startup
+        for point in self._points - self._deadlines.keys():
+            self._schedule(point, now + self.sla, now)
+        logger.info(f"Overdue monitor loaded: {len(self._points)} points, SLA {self.sla}s")
+    
+    def record_visit(self, point: str, guard_name: str, visit_time: int, now: Optional[int] = None) -> None:
+        """
+        Move a point's deadline after a scan
+        
+        Args:
+            point: Scanned point
+            guard_name: Guard who scanned it
+            visit_time: Client time of the scan (Unix seconds)
+            now: Current time (default: the clock)
+        """
+        point = normalize_point(point)
+        if self._cursor is None or point not in self._points:
+            return  # Not started (disabled) or not a round point
+        last = self._visits.get(point)
+        if last is not None and last[0] >= visit_time:
+            return  # An older scan synced late
+        self._visits[point] = (visit_time, guard_name)
+        self._schedule(point, visit_time + self.sla, int(time.time()) if now is None else now)
+    
+    def _schedule(self, point: str, deadline: int, now: int) -> None:
+        """Set a point's deadline, resolving or raising its alert as needed"""
+        self._deadlines[point] = deadline
+        if deadline <= now:
+            if point not in self._overdue:
+                self._expire(point, now)
+            return
+        if point in self._overdue:
+            self._overdue.discard(point)
+            self._emit("resolved", point, now)
+        # Slot of tick ceil(deadline / tick): never one already processed, since deadline > now
+        self._wheel[-(-deadline // self.tick) % len(self._wheel)].append((deadline, point))
+    
+    def _expire(self, point: str, now: int) -> None:
+        """Mark a point overdue and raise its event"""
+        self._overdue.add(point)
+        self._emit("overdue", point, now)
+    
+    def _emit(self, event_type: str, point: str, now: int) -> None:
+        """Record an event and wake the waiting readers"""
+        self._seq += 1
+        last_time, guard_name = self._visits.get(point, (None, None))
+        self._events.append(OverdueEvent(
+            seq=self._seq,
+            type=event_type,
+            point=point,
+            last_visit=last_time,
+            guardname=guard_name,
+            deadline=self._deadlines[point],
+            at=now
+        ))
+        if event_type == "overdue":
+            logger.warning(f"Patrol point {point} overdue (last visit {last_time}, guard {guard_name})")
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+    
+    def advance(self, now: Optional[int] = None) -> None:
+        """
+        Process the wheel slots of every tick up to now
+        
+        Args:
+            now: Current time (default: the clock)
+        """
+        now = int(time.time()) if now is None else now
+        target = now // self.tick
+        if self._cursor is None:
+            self._cursor = target - 1
+        # After a long stall one pass over every slot catches up
+        first = max(self._cursor + 1, target - len(self._wheel) + 1)
+        for tick in range(first, target + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            if not slot:
+                continue
+            pending = []
+            for deadline, point in slot:
+                if self._deadlines.get(point) != deadline:
+                    continue  # Superseded by a later scan
+                if deadline > now:
+                    pending.append((deadline, point))  # Due in a later revolution (or a future client clock)
+                elif point not in self._overdue:
+                    self._expire(point, now)
+            slot[:] = pending
+        self._cursor = max(self._cursor, target)
+    
+    async def run_forever(self) -> None:
+        """Advance the wheel at every tick boundary until cancelled (application lifetime)"""
+        while True:
+            try:
+                self.advance()
+            except Exception as e:
+                logger.error(f"Overdue monitor tick failed: {e}")
+            # Sleep to the next boundary, so a slot is processed as soon as its tick starts
+            await asyncio.sleep(self.tick - time.time() % self.tick)
+    
+    async def get_events(self, after: int = 0, wait: float = 0) -> OverdueEventsResponse:
+        """
+        Get the events after a sequence number, optionally waiting for one
+        
+        Args:
+            after: Last event number already seen
+            wait: Seconds to wait when there are no newer events (long polling)
+        
+        Returns:
+            OverdueEventsResponse: Newer events (at most the retained history) and every deadline
+        """
+        if wait > 0 and self._seq <= after:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        
+        return OverdueEventsResponse(
+            events=[event for event in self._events if event.seq > after],
+            last_seq=self._seq,
+            points=[
+                PointDeadline(
+                    point=point,
+                    last_visit=self._visits.get(point, (None, None))[0],
+                    guardname=self._visits.get(point, (None, None))[1],
+                    deadline=deadline,
+                    overdue=point in self._overdue
+                )
+                for point, deadline in sorted(self._deadlines.items(), key=lambda item: point_sort_key(item[0]))
+            ]
+        )
+
+
+# Shared by the request handlers and the background task in this process
+overdue_monitor = OverdueMonitor(settings.PATROL_POINT_SLA_MINUTES * 60, settings.PATROL_OVERDUE_TICK_SECONDS)
+
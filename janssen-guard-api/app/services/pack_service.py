@@ -0,0 +1,162 @@
+"""Background packing of cold images into segment files"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+from app.services.image_catalog import image_catalog
+from app.services.image_service import ImageService
+from app.storage import LocalStorage
+from app.storage.segments import SegmentWriter
+
+logger = logging.getLogger(__name__)
+
+
+class PackService:
+    """
+    Move images older than IMAGE_PACK_AFTER_DAYS into segment files
+    
+    Old images are rarely viewed, but as loose files each one costs an
+    inode, a directory entry and a partially used filesystem block.
+    Packing appends them to large append-only segment files and records
+    (segment, offset, size) in the catalog, so a read is a single pread
+    and thousands of images share one file. Recent images stay loose.
+    Local storage only.
+    """
+    
+    def __init__(self):
+        """
+        Initialize packer
+        
+        Raises:
+            ValueError: If the storage backend is not local
+        """
+        self.image_service = ImageService()
+        storage = self.image_service.storage
+        if not isinstance(storage, LocalStorage):
+            raise ValueError("Image packing requires IMAGE_STORAGE_BACKEND=local")
+        self.storage = storage
+        self.writer = SegmentWriter(storage.root, settings.IMAGE_SEGMENT_MAX_MB * 1024 * 1024)
+        # Packed loose files are removed one pass later, so responses that
+        # already resolved the old key can still finish
+        self._superseded: List[Dict] = []
+    
+    def _append(self, images: List[StoredImage]) -> List[Dict]:
+        """
+        Append a batch of loose images to the segments (blocking)
+        
+        Duplicates sharing a file are appended once.
+        
+        Args:
+            images: Catalog rows to pack
+            
+        Returns:
+            List[Dict]: Catalog updates for the files that were packed
+        """
+        rows = []
+        packed = set()
+        # Offsets are only published once the batch has been synced to disk
+        with self.writer.batch():
+            for image in images:
+                if image.path in packed:
+                    continue
+                packed.add(image.path)
+                try:
+                    data = self.storage.local_path(image.path).read_bytes()
+                except FileNotFoundError:
+                    logger.warning(f"Catalogued image {image.image_id} is missing from storage: {image.path}")
+                    continue
+                
+                key, offset = self.writer.append(image.image_id, data)
+                rows.append({
+                    "loose_path": image.path,
+                    "loose_sha256": image.sha256,
+                    "packed_path": key,
+                    "packed_offset": offset,
+                })
+        return rows
+    
+    async def run_once(self) -> int:
+        """
+        Pack one batch of eligible images
+        
+        Returns:
+            int: Number of files packed
+        """
+        if self._superseded:
+            # Entries that still point at a loose file (a duplicate catalogued
+            # while its original was being packed) are moved before the file goes
+            await self._publish(self._superseded)
+            for row in self._superseded:
+                # Anything still there is a different file saved under the same key
+                if not await image_catalog.is_referenced(row["loose_path"]):
+                    await self.storage.delete(row["loose_path"])
+            self._superseded.clear()
+        
+        created_before = datetime.utcnow() - timedelta(days=settings.IMAGE_PACK_AFTER_DAYS)
+        async with AsyncSessionLocal() as session:
+            images = await StoredImageRepository(StoredImage, session).get_pack_candidates(
+                created_before,
+                settings.IMAGE_PACK_BATCH_SIZE,
+                # Pack the transcoded bytes, not originals about to be replaced
+                transcoded_only=settings.IMAGE_TRANSCODE_ENABLED
+            )
+        if not images:
+            return 0
+        
+        rows = await run_in_threadpool(self._append, images)
+        if not rows:
+            return 0
+        
+        await self._publish(rows)
+        self._superseded.extend(rows)
+        
+        logger.info(f"Packed {len(rows)} files into {self.writer.number:06d}.seg")
+        return len(rows)
+    
+    async def _publish(self, rows: List[Dict]) -> None:
+        """
+        Point every catalog entry stored at the packed loose files at their segment locations
+        
+        Args:
+            rows: {"loose_path", "loose_sha256", "packed_path", "packed_offset"} per packed file
+        """
+        async with AsyncSessionLocal() as session:
+            repo = StoredImageRepository(StoredImage, session)
+            image_ids = await repo.get_image_ids_by_path(row["loose_path"] for row in rows)
+            if not image_ids:
+                return
+            await repo.mark_packed(rows)
+        
+        for row in rows:
+            for image_id in image_ids.get(row["loose_path"], []):
+                entry = image_catalog.peek(image_id)
+                if entry and entry.sha256 == row["loose_sha256"]:
+                    image_catalog.remember(
+                        image_id,
+                        entry._replace(path=row["packed_path"], segment_offset=row["packed_offset"])
+                    )
+    
+    async def run_forever(self) -> None:
+        """Pack in the background until cancelled (application lifetime)"""
+        try:
+            while True:
+                try:
+                    packed = await self.run_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Packer pass failed: {str(e)}", exc_info=True)
+                    packed = 0
+                
+                # Full batch: more work is waiting, keep going
+                if packed < settings.IMAGE_PACK_BATCH_SIZE:
+                    await asyncio.sleep(settings.IMAGE_PACK_INTERVAL_SECONDS)
+        finally:
+            await run_in_threadpool(self.writer.close)
+
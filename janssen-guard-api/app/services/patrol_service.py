@@ -1,15 +1,28 @@
 """Patrol service for managing patrol records"""
 
+import time
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
 from app.repositories.patrol_repository import PatrolRepository
 from app.schemas.patrol_record import (
     PatrolRecordCreate,
     PatrolRecordResponse,
+    PatrolRecordCreatedResponse,
     PatrolRecordFilter,
-    PatrolRecordsResponse
+    PatrolImageArchiveRequest,
+    CameraDuplicateStats,
+    PatrolImageUploadResponse,
+    PatrolRecordsResponse,
+    PatrolRecordChangesResponse
 )
+from app.services.image_catalog import image_catalog
 from app.services.image_service import ImageService
+from app.services.hot_store import hot_store
+from app.services.overdue_monitor import overdue_monitor
+from app.services.round_tracker import round_tracker
+from app.services.upload_service import UploadedImage
+from app.utils.points import point_sort_key
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +48,7 @@ class PatrolService:
     async def create_patrol_record(
         self,
         record_data: PatrolRecordCreate
-    ) -> PatrolRecordResponse:
+    ) -> PatrolRecordCreatedResponse:
         """
         Create a new patrol record and fetch image from camera if configured
         
@@ -43,12 +56,8 @@ class PatrolService:
             record_data: Patrol record data
             
         Returns:
-            PatrolRecordResponse: Created patrol record
+            PatrolRecordCreatedResponse: Created patrol record and the guard's round progress
         """
-        # Convert timestamps to integers if needed
-        time_int = int(record_data.time) if isinstance(record_data.time, str) else record_data.time
-        servertime_int = int(record_data.servertime) if isinstance(record_data.servertime, str) else record_data.servertime
-        
         # Fetch image from camera if camera URL is configured for this point
         image_path = await self.image_service.fetch_and_save_image_for_point(
             record_data.imageid,
@@ -60,25 +69,59 @@ class PatrolService:
             logger.debug(f"No camera configured or failed to fetch image for point {record_data.point}, continuing without image")
         
         # Create record in database
-        record = await self.patrol_repo.create({
-            "id": record_data.id,
-            "point": record_data.point,
-            "guard_name": record_data.guardname,
-            "time": time_int,
-            "server_time": servertime_int,
-            "image_id": record_data.imageid,
-            "note": record_data.note
-        })
+        record = await self.patrol_repo.create(self._record_fields(record_data))
+        hot_store.add(record)
+        overdue_monitor.record_visit(record.point, record.guard_name, record.time)
         
         # Return response
-        return PatrolRecordResponse(
-            id=str(record.id),
-            point=record.point,
-            guardname=record.guard_name,
-            time=str(record.time),
-            servertime=str(record.server_time),
-            imageid=record.image_id,
-            note=record.note
+        return PatrolRecordCreatedResponse(
+            **self._to_response(record).model_dump(),
+            round=round_tracker.record_scan(record.guard_name, record.point, record.time)
+        )
+    
+    async def create_patrol_record_with_image(
+        self,
+        record_data: PatrolRecordCreate,
+        uploaded: UploadedImage
+    ) -> PatrolImageUploadResponse:
+        """
+        Create a patrol record for a photo uploaded from the guard's phone
+        
+        The record and the image's catalog entry are committed in one
+        transaction, so a record never points at a missing image and no
+        image is left without its record.
+        
+        Args:
+            record_data: Patrol record data
+            uploaded: Image stored by UploadService.receive
+            
+        Returns:
+            PatrolImageUploadResponse: Created record and stored image details
+        """
+        record = await self.patrol_repo.create_with_image(
+            self._record_fields(record_data),
+            {
+                "image_id": uploaded.image_id,
+                **uploaded.entry._asdict(),
+                "duplicate_of": uploaded.duplicate_of,
+                "transcoded_at": None
+            }
+        )
+        if uploaded.duplicate_of is None:
+            # A duplicate's location was copied in the database; it is loaded on first use
+            image_catalog.remember(uploaded.image_id, uploaded.entry)
+        hot_store.add(record)
+        overdue_monitor.record_visit(record.point, record.guard_name, record.time)
+        
+        return PatrolImageUploadResponse(
+            record=self._to_response(record),
+            image_size=uploaded.entry.size,
+            content_type=uploaded.entry.content_type,
+            width=uploaded.width,
+            height=uploaded.height,
+            resized=uploaded.resized,
+            duplicate_of=uploaded.duplicate_of,
+            round=round_tracker.record_scan(record.guard_name, record.point, record.time)
         )
     
     async def get_patrol_records(
@@ -88,35 +131,21 @@ class PatrolService:
         """
         Get paginated and filtered patrol records
         
+        Ranges starting inside the hot store's window are served from memory.
+        
         Args:
             filters: Filter parameters
             
         Returns:
             PatrolRecordsResponse: Paginated patrol records
         """
-        # Build query filters
-        query_filters = {}
-        
-        if filters.point:
-            query_filters["point"] = filters.point
-        
-        if filters.guardname:
-            query_filters["guard_name__like"] = f"%{filters.guardname}%"
-        
-        if filters.start_date:
-            query_filters["time__gte"] = filters.start_date
-        
-        if filters.end_date:
-            query_filters["time__lte"] = filters.end_date
-        
-        if filters.has_notes:
-            query_filters["note__ne"] = ""
+        source = hot_store if hot_store.covers(filters.start_date) else self.patrol_repo
         
         # Get paginated records
-        records, total = await self.patrol_repo.get_paginated(
+        records, total = await source.get_paginated(
             page=filters.page,
             limit=filters.limit,
-            filters=query_filters,
+            filters=self._query_filters(filters),
             order_by=["-time"]  # Order by time descending
         )
         
@@ -124,18 +153,7 @@ class PatrolService:
         total_pages = (total + filters.limit - 1) // filters.limit
         
         # Convert to response format
-        record_responses = [
-            PatrolRecordResponse(
-                id=str(record.id),
-                point=record.point,
-                guardname=record.guard_name,
-                time=str(record.time),
-                servertime=str(record.server_time),
-                imageid=record.image_id,
-                note=record.note
-            )
-            for record in records
-        ]
+        record_responses = [self._to_response(record) for record in records]
         
         return PatrolRecordsResponse(
             records=record_responses,
@@ -145,6 +163,176 @@ class PatrolService:
             page_size=len(record_responses)
         )
     
+    async def get_archive_image_ids(
+        self,
+        request: PatrolImageArchiveRequest,
+        max_images: int
+    ) -> List[str]:
+        """
+        Resolve the images to include in an archive
+        
+        Args:
+            request: Explicit image IDs, or record filters selecting them
+            max_images: Maximum number of images allowed in one archive
+            
+        Returns:
+            List[str]: Image IDs in archive order (duplicates removed)
+            
+        Raises:
+            ValueError: If more than max_images images are selected
+        """
+        if request.imageids:
+            image_ids = list(dict.fromkeys(request.imageids))
+        else:
+            # One extra row tells an oversized window apart from an exact fit
+            image_ids = list(dict.fromkeys(
+                await self.patrol_repo.get_image_ids(self._query_filters(request), max_images + 1)
+            ))
+        
+        if len(image_ids) > max_images:
+            raise ValueError(f"Too many images selected (maximum {max_images}); narrow the filters")
+        return image_ids
+    
+    async def get_duplicate_image_stats(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None
+    ) -> List[CameraDuplicateStats]:
+        """
+        Get duplicate frame counts per patrol point (camera)
+        
+        A camera whose stream is frozen keeps returning the same frame, so
+        a high duplicate rate flags a camera that needs attention.
+        
+        Args:
+            start_date: Start date filter (Unix timestamp)
+            end_date: End date filter (Unix timestamp)
+            
+        Returns:
+            List[CameraDuplicateStats]: Counts per point, ordered by point
+            
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        start_time = start_date if start_date is not None else 0
+        end_time = end_date if end_date is not None else 2 ** 62
+        if start_time > end_time:
+            raise ValueError("start_date must not be after end_date")
+        
+        counts = await self.patrol_repo.get_duplicate_image_counts(start_time, end_time)
+        counts.sort(key=lambda row: point_sort_key(row[0]))
+        return [
+            CameraDuplicateStats(
+                point=point,
+                images=images,
+                duplicates=duplicates,
+                duplicate_rate=round(duplicates / images, 4) if images else 0.0
+            )
+            for point, images, duplicates in counts
+        ]
+    
+    async def get_changes_since(
+        self,
+        watermark: Optional[str],
+        limit: int
+    ) -> PatrolRecordChangesResponse:
+        """
+        Get records created after a delta-sync watermark
+        
+        server_time is assigned by this server on insert, so it only grows
+        apart from transactions that commit after a later one. To cover
+        those, the watermark of a final page (has_more false) is held back
+        to SYNC_REREAD_SECONDS before now: the next poll reads that window
+        again, and clients skip the records whose id they already have.
+        
+        Args:
+            watermark: Opaque watermark returned by the previous call (None for a full sync)
+            limit: Maximum number of records to return
+            
+        Returns:
+            PatrolRecordChangesResponse: New records, next watermark and has_more flag
+            
+        Raises:
+            ValueError: If the watermark is malformed
+        """
+        server_time, record_id = self.parse_watermark(watermark)
+        
+        # Fetch one extra row to know whether the client should poll again right away
+        records = await self.patrol_repo.get_changed_since(
+            server_time=server_time,
+            record_id=record_id,
+            limit=limit + 1
+        )
+        has_more = len(records) > limit
+        records = records[:limit]
+        
+        if records:
+            last = records[-1]
+            server_time = last.server_time
+            watermark = self.format_watermark(last.server_time, last.id)
+        
+        settled = int(time.time()) - settings.SYNC_REREAD_SECONDS
+        if not has_more and server_time is not None and server_time >= settled:
+            # A bare timestamp re-reads every record with server_time >= settled
+            watermark = str(settled - 1)
+        
+        return PatrolRecordChangesResponse(
+            records=[self._to_response(record) for record in records],
+            watermark=watermark,
+            has_more=has_more
+        )
+    
+    async def get_latest_per_point(self) -> List[PatrolRecordResponse]:
+        """
+        Get the most recent scan of every patrol point
+        
+        Returns:
+            List[PatrolRecordResponse]: Latest record per point, ordered by point
+        """
+        records = await self.patrol_repo.get_latest_per_point()
+        records.sort(key=lambda record: point_sort_key(record.point))
+        return [self._to_response(record) for record in records]
+    
+    @staticmethod
+    def format_watermark(server_time: int, record_id: str) -> str:
+        """
+        Build a delta-sync watermark from the last record seen
+        
+        Args:
+            server_time: Server timestamp of the last record
+            record_id: ID of the last record
+            
+        Returns:
+            str: Watermark in "<server_time>:<id>" format
+        """
+        return f"{server_time}:{record_id}"
+    
+    @staticmethod
+    def parse_watermark(watermark: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Parse a delta-sync watermark
+        
+        Accepts "<server_time>:<id>" as returned by the API, or a bare
+        server timestamp to start syncing from a point in time.
+        
+        Args:
+            watermark: Watermark string or None
+            
+        Returns:
+            Tuple[Optional[int], Optional[str]]: Server timestamp and record ID
+            
+        Raises:
+            ValueError: If the watermark is malformed
+        """
+        if not watermark:
+            return None, None
+        
+        server_time, _, record_id = watermark.partition(":")
+        try:
+            return int(server_time), record_id or None
+        except ValueError:
+            raise ValueError(f"Invalid watermark: {watermark}")
+    
     async def get_image(self, image_id: str) -> Optional[bytes]:
         """
         Get patrol image by ID
@@ -156,4 +344,76 @@ class PatrolService:
             Optional[bytes]: Image data or None if not found
         """
         return await self.image_service.get_image(image_id)
+    
+    @staticmethod
+    def _record_fields(record_data: PatrolRecordCreate) -> Dict:
+        """Map a create request onto patrol record columns"""
+        # Convert timestamps to integers if needed
+        time_int = int(record_data.time) if isinstance(record_data.time, str) else record_data.time
+        return {
+            "id": record_data.id,
+            "point": record_data.point,
+            "guard_name": record_data.guardname,
+            "time": time_int,
+            # Set here, not by the client: delta sync uses it as its watermark
+            "server_time": int(time.time()),
+            "image_id": record_data.imageid,
+            "note": record_data.note
+        }
+    
+    @staticmethod
+    def _query_filters(filters) -> Dict:
+        """
+        Convert record filter parameters to repository filters
+        
+        Args:
+            filters: PatrolRecordFilter or PatrolImageArchiveRequest
+            
+        Returns:
+            Dict: Repository filters
+        """
+        query_filters = {}
+        
+        if filters.point:
+            if len(filters.point) == 1:
+                query_filters["point"] = filters.point[0]
+            else:
+                query_filters["point__in"] = filters.point
+        
+        if filters.guardname:
+            # Partial match, however many names are given
+            query_filters["guard_name__contains_any"] = filters.guardname
+        
+        if filters.start_date and filters.end_date:
+            query_filters["time__between"] = (filters.start_date, filters.end_date)
+        elif filters.start_date:
+            query_filters["time__gte"] = filters.start_date
+        elif filters.end_date:
+            query_filters["time__lte"] = filters.end_date
+        
+        if filters.has_notes:
+            query_filters["note__ne"] = ""
+        
+        return query_filters
+    
+    @staticmethod
+    def _to_response(record) -> PatrolRecordResponse:
+        """
+        Convert a patrol record model to its API representation
+        
+        Args:
+            record: PatrolRecord instance
+            
+        Returns:
+            PatrolRecordResponse: Patrol record response
+        """
+        return PatrolRecordResponse(
+            id=str(record.id),
+            point=record.point,
+            guardname=record.guard_name,
+            time=str(record.time),
+            servertime=str(record.server_time),
+            imageid=record.image_id,
+            note=record.note
+        )
 
@@ -0,0 +1,179 @@
+"""Image rendition service for thumbnails and previews"""
+
+import io
+import os
+import asyncio
+import logging
+from pathlib import PurePosixPath
+from typing import Awaitable, Callable, Dict, Optional, Union
+from PIL import Image, ImageOps
+from app.config import settings
+from app.storage import StorageBackend, get_storage
+from app.utils.process_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Renditions being generated, keyed by target key, so concurrent
+# requests for the same rendition share one resize
+_pending: Dict[str, asyncio.Future] = {}
+
+
+def render_rendition(
+    source: Union[str, bytes],
+    target: Optional[str],
+    max_edge: int,
+    quality: int
+) -> Optional[bytes]:
+    """
+    Decode, resize and re-encode an image (runs in a worker process)
+    
+    Args:
+        source: Original image path, or its bytes
+        target: Rendition path to write, or None to return the bytes
+        max_edge: Longest edge of the rendition in pixels
+        quality: JPEG quality
+        
+    Returns:
+        Optional[bytes]: Rendition bytes if target is None
+    """
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        # Let the JPEG decoder downscale while decoding - far cheaper than a full decode
+        image.draft("RGB", (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        
+        if target is None:
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            return buffer.getvalue()
+        
+        temp_path = f"{target}.tmp"
+        image.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    
+    # Atomic rename: readers never see a half-written rendition
+    os.replace(temp_path, target)
+    return None
+
+
+class RenditionService:
+    """Service for producing resized image renditions on demand"""
+    
+    SIZES = ("thumb", "preview")
+    
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        """
+        Initialize rendition service
+        
+        Args:
+            storage: Storage backend holding originals and renditions
+        """
+        self.storage = storage or get_storage()
+    
+    def max_edge(self, size: str) -> int:
+        """
+        Get the longest edge for a rendition size
+        
+        Args:
+            size: Rendition name ("thumb" or "preview")
+            
+        Returns:
+            int: Longest edge in pixels
+        """
+        if size == "thumb":
+            return settings.IMAGE_THUMBNAIL_SIZE
+        return settings.IMAGE_PREVIEW_SIZE
+    
+    def rendition_key(self, original: str, size: str) -> str:
+        """
+        Get the storage key of a rendition (next to the original)
+        
+        Args:
+            original: Original image key
+            size: Rendition name
+            
+        Returns:
+            str: Rendition key, e.g. ab/cd/IMG_1.thumb.jpg
+        """
+        path = PurePosixPath(original)
+        return path.with_name(f"{path.stem}.{size}.jpg").as_posix()
+    
+    async def get_rendition(
+        self,
+        original: str,
+        size: str,
+        read_source: Optional[Callable[[], Awaitable[bytes]]] = None
+    ) -> str:
+        """
+        Get a rendition, generating and caching it on first request
+        
+        Args:
+            original: Original image key
+            size: Rendition name ("thumb" or "preview")
+            read_source: Reads the original's bytes when they are not stored under its key
+            
+        Returns:
+            str: Rendition key
+            
+        Raises:
+            ValueError: If the size is unknown
+        """
+        if size not in self.SIZES:
+            raise ValueError(f"Unknown image size: {size}")
+        
+        target = self.rendition_key(original, size)
+        if await self.storage.exists(target):
+            return target
+        
+        pending = _pending.get(target)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(original, target, size, read_source))
+            _pending[target] = pending
+            pending.add_done_callback(lambda _: _pending.pop(target, None))
+        
+        await asyncio.shield(pending)
+        logger.debug(f"Generated {size} rendition: {target}")
+        return target
+    
+    async def _render(
+        self,
+        original: str,
+        target: str,
+        size: str,
+        read_source: Optional[Callable[[], Awaitable[bytes]]] = None
+    ) -> None:
+        """Generate a rendition and store it under its key"""
+        source_path = self.storage.local_path(original)
+        target_path = self.storage.local_path(target)
+        if source_path and target_path and read_source is None:
+            # Local files: the worker reads and writes them directly
+            await run_in_process(
+                render_rendition,
+                str(source_path),
+                str(target_path),
+                self.max_edge(size),
+                settings.IMAGE_RENDITION_QUALITY
+            )
+            return
+        
+        data = await read_source() if read_source else await self.storage.read(original)
+        rendition = await run_in_process(
+            render_rendition,
+            data,
+            None,
+            self.max_edge(size),
+            settings.IMAGE_RENDITION_QUALITY
+        )
+        await self.storage.put(target, rendition, "image/jpeg")
+    
+    async def delete_renditions(self, original: str) -> None:
+        """
+        Delete cached renditions of an image
+        
+        Args:
+            original: Original image key
+        """
+        for size in self.SIZES:
+            await self.storage.delete(self.rendition_key(original, size))
+
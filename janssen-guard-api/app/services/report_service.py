@@ -1,21 +1,135 @@
 """Report service for generating statistics and reports"""
 
-from typing import Dict, List, Optional
-from collections import defaultdict
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
 from app.repositories.patrol_repository import PatrolRepository
+from app.repositories.rollup_repository import HOUR, RollupRepository
+from app.schemas.report import ActivityHeatmap, PatrolPointGroup, PatrolPointGroupsResponse, PointVisit
+from app.services.hot_store import hot_store
+from app.utils.points import normalize_point, point_sort_key, round_points
+
+# Upper bound used when no end date is given
+MAX_TIME = 2 ** 62
+
+
+def time_range(start_date: Optional[int], end_date: Optional[int]) -> Tuple[int, int]:
+    """
+    Resolve optional report dates to an inclusive time range
+    
+    Args:
+        start_date: Start date (Unix timestamp)
+        end_date: End date (Unix timestamp)
+    
+    Returns:
+        Tuple[int, int]: (start_time, end_time)
+    
+    Raises:
+        ValueError: If start_date is after end_date
+    """
+    start_time = start_date if start_date is not None else 0
+    end_time = end_date if end_date is not None else MAX_TIME
+    if start_time > end_time:
+        raise ValueError("start_date must not be after end_date")
+    return start_time, end_time
+
+
+def whole_hours(start_time: int, end_time: int) -> Tuple[int, int]:
+    """
+    Get the whole rollup hours inside an inclusive time range
+    
+    Args:
+        start_time: Earliest record time (Unix timestamp)
+        end_time: Latest record time (Unix timestamp)
+    
+    Returns:
+        Tuple[int, int]: [first_hour, end_hour); empty when first_hour >= end_hour
+    """
+    return -(-start_time // HOUR) * HOUR, (end_time + 1) // HOUR * HOUR
+
+
+def distribution(counts: List[Tuple[str, int]], key: str) -> List[Dict]:
+    """
+    Add each group's share of the total to its count
+    
+    Args:
+        counts: (group, scans) pairs in output order
+        key: Name of the group field
+    
+    Returns:
+        List[Dict]: {key, "count", "percentage"} per group
+    """
+    total = sum(count for _, count in counts)
+    return [
+        {
+            key: group,
+            "count": count,
+            "percentage": round((count / total * 100), 1) if total > 0 else 0
+        }
+        for group, count in counts
+    ]
 
 
 class ReportService:
-    """Service for generating patrol reports and statistics"""
+    """
+    Service for generating patrol reports and statistics
     
-    def __init__(self, patrol_repo: PatrolRepository):
+    Every report is built from scan counts per (point, guard), so the
+    database returns one row per group and no records are loaded. With
+    REPORT_ROLLUPS_ENABLED, the whole hours of the range come from the
+    hourly rollups and only the partial hours at either end are counted
+    from patrol_records. Ranges starting inside the hot store's window are
+    answered from memory.
+    """
+    
+    def __init__(self, patrol_repo: PatrolRepository, rollup_repo: RollupRepository):
         """
         Initialize report service
         
         Args:
             patrol_repo: Patrol repository instance
+            rollup_repo: Hourly rollup repository instance
         """
         self.patrol_repo = patrol_repo
+        self.rollup_repo = rollup_repo
+    
+    async def get_scan_counts(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        Count scans per point and guard
+        
+        Args:
+            start_date: Start date (Unix timestamp)
+            end_date: End date (Unix timestamp)
+            
+        Returns:
+            Dict[Tuple[str, str], int]: Scans per (point, guard name)
+            
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        start_time, end_time = time_range(start_date, end_date)
+        first_hour, end_hour = whole_hours(start_time, end_time)
+        
+        if hot_store.covers(start_time):
+            parts = [await hot_store.get_scan_counts(start_time, end_time)]
+        elif not settings.REPORT_ROLLUPS_ENABLED or first_hour >= end_hour:
+            parts = [await self.patrol_repo.get_scan_counts(start_time, end_time)]
+        else:
+            parts = [await self.rollup_repo.get_scan_counts(first_hour, end_hour)]
+            if start_time < first_hour:
+                parts.append(await self.patrol_repo.get_scan_counts(start_time, first_hour - 1))
+            if end_hour <= end_time:
+                parts.append(await self.patrol_repo.get_scan_counts(end_hour, end_time))
+        
+        counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        for part in parts:
+            for point, guard_name, scans in part:
+                counts[(point, guard_name)] += scans
+        return counts
     
     async def get_summary_statistics(
         self,
@@ -28,27 +142,19 @@ class ReportService:
         Args:
             start_date: Start date (Unix timestamp)
             end_date: End date (Unix timestamp)
-            
+        
         Returns:
             Dict: Summary statistics
-        """
-        # Get all records in date range
-        filters = {}
-        if start_date:
-            filters["time__gte"] = start_date
-        if end_date:
-            filters["time__lte"] = end_date
         
-        records, _ = await self.patrol_repo.get_all(filters=filters)
-        
-        # Calculate statistics
-        unique_points = set(record.point for record in records)
-        unique_guards = set(record.guard_name for record in records)
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        counts = await self.get_scan_counts(start_date, end_date)
         
         return {
-            "total_scans": len(records),
-            "unique_points": len(unique_points),
-            "unique_guards": len(unique_guards)
+            "total_scans": sum(counts.values()),
+            "unique_points": len({point for point, _ in counts}),
+            "unique_guards": len({guard for _, guard in counts})
         }
     
     async def get_point_distribution(
@@ -62,36 +168,18 @@ class ReportService:
         Args:
             start_date: Start date (Unix timestamp)
             end_date: End date (Unix timestamp)
-            
+        
         Returns:
-            List[Dict]: Point distribution data
+            List[Dict]: Point distribution data, ordered by point
+        
+        Raises:
+            ValueError: If start_date is after end_date
         """
-        filters = {}
-        if start_date:
-            filters["time__gte"] = start_date
-        if end_date:
-            filters["time__lte"] = end_date
-        
-        records, _ = await self.patrol_repo.get_all(filters=filters)
-        
-        # Count by point
-        point_counts = defaultdict(int)
-        for record in records:
-            point_counts[record.point] += 1
-        
-        total = len(records)
-        
-        # Format response
-        distribution = [
-            {
-                "point": point,
-                "count": count,
-                "percentage": round((count / total * 100), 1) if total > 0 else 0
-            }
-            for point, count in sorted(point_counts.items())
-        ]
-        
-        return distribution
+        point_counts: Dict[str, int] = defaultdict(int)
+        for (point, _), scans in (await self.get_scan_counts(start_date, end_date)).items():
+            point_counts[point] += scans
+        
+        return distribution(sorted(point_counts.items(), key=lambda x: point_sort_key(x[0])), "point")
     
     async def get_guard_distribution(
         self,
@@ -104,38 +192,134 @@ class ReportService:
         Args:
             start_date: Start date (Unix timestamp)
             end_date: End date (Unix timestamp)
+        
+        Returns:
+            List[Dict]: Guard distribution data, most scans first
+        
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        guard_counts: Dict[str, int] = defaultdict(int)
+        for (_, guard), scans in (await self.get_scan_counts(start_date, end_date)).items():
+            guard_counts[guard] += scans
+        
+        return distribution(sorted(guard_counts.items(), key=lambda x: (-x[1], x[0])), "guard")
+    
+    async def get_activity_heatmap(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        utc_offset_minutes: int = 0
+    ) -> ActivityHeatmap:
+        """
+        Get scans per local hour of day and round point
+        
+        The database returns at most 24 rows per point. Whole-hour offsets
+        can read the whole hours of the range from the rollups (each UTC
+        hour then falls in one local hour), like get_scan_counts.
+        
+        Args:
+            start_date: Start date (Unix timestamp)
+            end_date: End date (Unix timestamp)
+            utc_offset_minutes: Local time offset from UTC in minutes
             
         Returns:
-            List[Dict]: Guard distribution data
+            ActivityHeatmap: 24 x round points matrix of scan counts
+            
+        Raises:
+            ValueError: If start_date is after end_date
         """
-        filters = {}
-        if start_date:
-            filters["time__gte"] = start_date
-        if end_date:
-            filters["time__lte"] = end_date
-        
-        records, _ = await self.patrol_repo.get_all(filters=filters)
-        
-        # Count by guard
-        guard_counts = defaultdict(int)
-        for record in records:
-            guard_counts[record.guard_name] += 1
-        
-        total = len(records)
-        
-        # Format response
-        distribution = [
-            {
-                "guard": guard,
-                "count": count,
-                "percentage": round((count / total * 100), 1) if total > 0 else 0
-            }
-            for guard, count in sorted(
-                guard_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-        ]
-        
-        return distribution
+        start_time, end_time = time_range(start_date, end_date)
+        first_hour, end_hour = whole_hours(start_time, end_time)
+        utc_offset = utc_offset_minutes * 60
+        
+        if hot_store.covers(start_time):
+            parts = [await hot_store.get_hour_point_counts(start_time, end_time, utc_offset)]
+        elif not settings.REPORT_ROLLUPS_ENABLED or utc_offset % HOUR or first_hour >= end_hour:
+            parts = [await self.patrol_repo.get_hour_point_counts(start_time, end_time, utc_offset)]
+        else:
+            parts = [await self.rollup_repo.get_hour_point_counts(first_hour, end_hour, utc_offset)]
+            if start_time < first_hour:
+                parts.append(await self.patrol_repo.get_hour_point_counts(start_time, first_hour - 1, utc_offset))
+            if end_hour <= end_time:
+                parts.append(await self.patrol_repo.get_hour_point_counts(end_hour, end_time, utc_offset))
+        
+        points = round_points()
+        columns = {point: column for column, point in enumerate(points)}
+        counts = [[0] * len(points) for _ in range(24)]
+        other_scans = 0
+        for part in parts:
+            for hour, point, scans in part:
+                column = columns.get(normalize_point(point))
+                if column is None:
+                    other_scans += scans
+                else:
+                    counts[hour][column] += scans
+        
+        hour_totals = [sum(row) for row in counts]
+        return ActivityHeatmap(
+            hours=list(range(24)),
+            points=points,
+            counts=counts,
+            hour_totals=hour_totals,
+            point_totals=[sum(column) for column in zip(*counts)],
+            max_count=max(max(row) for row in counts),
+            total=sum(hour_totals),
+            other_scans=other_scans,
+            utc_offset_minutes=utc_offset_minutes
+        )
+    
+    async def get_point_groups(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None
+    ) -> PatrolPointGroupsResponse:
+        """
+        Get every scan grouped by patrol point for the report table
+        
+        Built from one query ordered by point and time, streamed from the
+        database, so each point's visits arrive already sorted and only
+        the columns the table shows are read.
+        
+        Args:
+            start_date: Start date (Unix timestamp)
+            end_date: End date (Unix timestamp)
+            
+        Returns:
+            PatrolPointGroupsResponse: Visits, guards and counts per point
+            
+        Raises:
+            ValueError: If start_date is after end_date
+        """
+        start_time, end_time = time_range(start_date, end_date)
+        source = hot_store if hot_store.covers(start_time) else self.patrol_repo
+        
+        groups: Dict[str, List[PointVisit]] = {}
+        # Points stored in several spellings ("05", "5") are merged and re-sorted
+        merged = set()
+        current = None
+        async for point, time, guard_name, record_id in source.stream_point_visits(start_time, end_time):
+            if point != current:
+                current = point
+                key = normalize_point(point)
+                if key in groups:
+                    merged.add(key)
+                visits = groups.setdefault(key, [])
+            visits.append(PointVisit(id=record_id, guardname=guard_name, time=time))
+        
+        for key in merged:
+            groups[key].sort(key=lambda visit: (visit.time, visit.id))
+        
+        return PatrolPointGroupsResponse(
+            total=sum(len(visits) for visits in groups.values()),
+            points=[
+                PatrolPointGroup(
+                    point=point,
+                    count=len(visits),
+                    guards=dict(Counter(visit.guardname for visit in visits)),
+                    visits=visits
+                )
+                for point, visits in sorted(groups.items(), key=lambda item: point_sort_key(item[0]))
+            ]
+        )
 
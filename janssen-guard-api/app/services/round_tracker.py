@@ -0,0 +1,149 @@
+"""In-process tracker of each guard's current patrol round"""
+
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patrol_record import PatrolRecord
+from app.repositories.patrol_repository import PatrolRepository
+from app.schemas.patrol_record import RoundProgress
+from app.services.report_service import MAX_TIME
+from app.utils.points import normalize_point, round_points
+
+logger = logging.getLogger(__name__)
+
+
+class _Round:
+    """Round points scanned so far (bit i = i-th round point) and the round's span"""
+    __slots__ = ("points", "started", "last_scan", "seen")
+    
+    def __init__(self, started: int):
+        self.points = 0
+        self.started = started
+        self.last_scan = started
+        self.seen = time.monotonic()  # When the round was last updated (eviction)
+
+
+class RoundTracker:
+    """
+    Current round of every active guard, kept as a bitset over the round points
+    
+    Rounds follow the coverage report's rules: a guard's scan after a
+    completed round, or after a pause longer than PATROL_ROUND_GAP_MINUTES,
+    starts a new round. State is updated from each created record and
+    rebuilt at startup by replaying the last PATROL_ROUND_REBUILD_HOURS of
+    records, so progress survives restarts and phone changes without
+    clients storing it. Only scans handled by this process are seen, and
+    reset() is not persisted: a restart rebuilds a reset round from its
+    records.
+    """
+    
+    def __init__(self):
+        """Initialize an empty tracker"""
+        self.gap = settings.PATROL_ROUND_GAP_MINUTES * 60
+        self._points = round_points()
+        self._slots = {point: slot for slot, point in enumerate(self._points)}
+        self._full = (1 << len(self._points)) - 1
+        # Least recently updated first, so idle guards are evicted from the front
+        self._rounds: "OrderedDict[str, _Round]" = OrderedDict()
+    
+    async def load(self) -> None:
+        """Restore rounds in progress from recent records (application startup)"""
+        since = int(time.time()) - settings.PATROL_ROUND_REBUILD_HOURS * 3600
+        async with AsyncSessionLocal() as session:
+            repo = PatrolRepository(PatrolRecord, session)
+            scans = [scan async for scan in repo.stream_scans(since, MAX_TIME)]
+        for point, guard_name, visit_time in sorted(scans, key=lambda scan: scan[2]):
+            self.record_scan(guard_name, point, visit_time)
+        self._evict()
+        logger.info(f"Round tracker loaded: {len(self._rounds)} active guards from {len(scans)} scans")
+    
+    def record_scan(self, guard_name: str, point: str, visit_time: int) -> RoundProgress:
+        """
+        Add a scan to the guard's current round
+        
+        Args:
+            guard_name: Guard who scanned
+            point: Scanned point
+            visit_time: Client time of the scan (Unix seconds)
+        
+        Returns:
+            RoundProgress: The guard's round after the scan
+        """
+        state = self._rounds.get(guard_name)
+        if state is not None and visit_time < state.started:
+            return self._progress(guard_name, state)  # Belongs to an earlier round (synced late)
+        if state is None or (
+            visit_time > state.last_scan
+            and (state.points == self._full or visit_time - state.last_scan > self.gap)
+        ):
+            state = _Round(visit_time)
+        
+        slot = self._slots.get(normalize_point(point))
+        if slot is not None:
+            state.points |= 1 << slot
+        state.last_scan = max(state.last_scan, visit_time)
+        state.seen = time.monotonic()
+        self._rounds[guard_name] = state
+        self._rounds.move_to_end(guard_name)
+        self._evict()
+        return self._progress(guard_name, state)
+    
+    def get_progress(self, guard_name: str) -> RoundProgress:
+        """
+        Get a guard's current round
+        
+        Args:
+            guard_name: Guard name
+        
+        Returns:
+            RoundProgress: Current round (empty if the last one has ended)
+        """
+        state = self._rounds.get(guard_name)
+        if state is not None and (state.points == self._full or time.time() - state.last_scan > self.gap):
+            state = None  # The next scan starts a new round
+        return self._progress(guard_name, state)
+    
+    def reset(self, guard_name: str) -> RoundProgress:
+        """
+        End a guard's current round (the next scan starts a new one)
+        
+        Only this process's state is changed; load() after a restart
+        replays the scans from before the reset.
+        
+        Args:
+            guard_name: Guard name
+        
+        Returns:
+            RoundProgress: Empty round
+        """
+        self._rounds.pop(guard_name, None)
+        return self._progress(guard_name, None)
+    
+    def _evict(self) -> None:
+        """Forget guards whose rounds have not changed for longer than the round gap"""
+        idle = time.monotonic() - self.gap
+        while self._rounds and next(iter(self._rounds.values())).seen < idle:
+            self._rounds.popitem(last=False)
+    
+    def _progress(self, guard_name: str, state: Optional[_Round]) -> RoundProgress:
+        """Describe a round for the API"""
+        points = state.points if state is not None else 0
+        scanned = [point for slot, point in enumerate(self._points) if points >> slot & 1]
+        return RoundProgress(
+            guardname=guard_name,
+            scanned=scanned,
+            missing=[point for slot, point in enumerate(self._points) if not points >> slot & 1],
+            count=len(scanned),
+            total=len(self._points),
+            complete=points == self._full,
+            started=state.started if state is not None else None,
+            last_scan=state.last_scan if state is not None else None
+        )
+
+
+# Shared by the request handlers in this process
+round_tracker = RoundTracker()
+
@@ -0,0 +1,202 @@
+"""Background transcoding of stored images to a smaller format"""
+
+import io
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stored_image import StoredImage
+from app.repositories.image_repository import StoredImageRepository
+from app.services.image_catalog import CatalogEntry, image_catalog
+from app.services.image_service import ImageService
+from app.utils.image_types import IMAGE_EXTENSIONS
+from app.utils.process_pool import run_in_background_process
+
+logger = logging.getLogger(__name__)
+
+# IMAGE_TRANSCODE_FORMAT -> (Pillow format, content type)
+TRANSCODE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+# Seconds before an image whose transcode failed is tried again
+RETRY_SECONDS = 3600
+
+
+def transcode_image(data: bytes, image_format: str, quality: int) -> bytes:
+    """
+    Re-encode an image (runs in a worker process)
+    
+    Args:
+        data: Stored image bytes
+        image_format: Pillow format name ("WEBP" or "JPEG")
+        quality: Encoder quality
+        
+    Returns:
+        bytes: Re-encoded image
+    """
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as image:
+        # EXIF is not carried over, so bake the orientation into the pixels
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        if image_format == "WEBP":
+            image.save(buffer, image_format, quality=quality, method=4)
+        else:
+            image.save(buffer, image_format, quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+class TranscodeService:
+    """
+    Re-encode images older than IMAGE_TRANSCODE_AFTER_DAYS
+    
+    Camera snapshots are kept as the NVR delivered them while they are
+    recent; after that they are re-encoded to IMAGE_TRANSCODE_FORMAT at
+    IMAGE_TRANSCODE_QUALITY if the result is smaller. Encoding runs one
+    image at a time in the low-priority background process pool, with a
+    pause between images, so it never competes with request handling.
+    
+    Stored files are never rewritten: the re-encoded image gets a new key
+    and the catalog is repointed to it. The replaced file is deleted by the
+    first pass IMAGE_SUPERSEDED_GRACE_SECONDS later; if the process stops
+    first, it is left as an orphan file that reconcile_images --repair
+    removes.
+    """
+    
+    def __init__(self):
+        """Initialize transcoder"""
+        self.image_service = ImageService()
+        self.image_format, self.content_type = TRANSCODE_FORMATS[settings.IMAGE_TRANSCODE_FORMAT]
+        # (key, monotonic time replaced) of originals kept until the grace
+        # period ends, so responses and presigned URLs for the old key still work
+        self._superseded: List[Tuple[str, float]] = []
+        # Path -> monotonic time of a failed transcode (skipped until RETRY_SECONDS later)
+        self._failed: Dict[str, float] = {}
+    
+    async def transcode(self, image: StoredImage) -> Optional[CatalogEntry]:
+        """
+        Transcode one image and update its catalog entries
+        
+        Duplicates share the image's file, so all of them are updated. The
+        image is only marked as processed when the transcode completes
+        (re-encoded or kept as is); on failure it is tried again later.
+        
+        Args:
+            image: Catalog row
+            
+        Returns:
+            Optional[CatalogEntry]: New entry, or None if the image was kept as is
+            
+        Raises:
+            Exception: If reading, re-encoding or storing the image fails
+        """
+        storage = self.image_service.storage
+        source = image.path
+        
+        data = await storage.read(source)
+        encoded = await run_in_background_process(
+            transcode_image,
+            data,
+            self.image_format,
+            settings.IMAGE_TRANSCODE_QUALITY
+        )
+        
+        entry = None
+        # Keep the original unless re-encoding actually saves space
+        if len(encoded) < len(data):
+            digest = await run_in_threadpool(lambda: hashlib.sha256(encoded).hexdigest())
+            # A new key per encoding, so no cached or served copy of the old bytes goes stale
+            target = self.image_service.new_key(image.image_id, IMAGE_EXTENSIONS[self.content_type], digest[:8])
+            await storage.put(target, encoded, self.content_type)
+            entry = CatalogEntry(
+                path=target,
+                size=len(encoded),
+                content_type=self.content_type,
+                sha256=digest
+            )
+        
+        async with AsyncSessionLocal() as session:
+            repo = StoredImageRepository(StoredImage, session)
+            image_ids = (await repo.get_image_ids_by_path([source])).get(source, [])
+            await repo.mark_transcoded(source, entry._asdict() if entry else {})
+        
+        if entry:
+            for image_id in image_ids:
+                image_catalog.remember(image_id, entry)
+            self._superseded.append((source, time.monotonic()))
+        return entry
+    
+    async def run_once(self) -> int:
+        """
+        Transcode one batch of eligible images
+        
+        Returns:
+            int: Number of images processed (transcoded or kept)
+        """
+        now = time.monotonic()
+        grace = settings.IMAGE_SUPERSEDED_GRACE_SECONDS
+        expired = [key for key, replaced_at in self._superseded if now - replaced_at >= grace]
+        self._superseded = [(key, replaced_at) for key, replaced_at in self._superseded if now - replaced_at < grace]
+        for key in expired:
+            await self.image_service.storage.delete(key)
+            await self.image_service.delete_renditions(key)
+            self.image_service.cache.discard(key)
+        
+        self._failed = {path: failed_at for path, failed_at in self._failed.items() if now - failed_at < RETRY_SECONDS}
+        
+        created_before = datetime.utcnow() - timedelta(days=settings.IMAGE_TRANSCODE_AFTER_DAYS)
+        async with AsyncSessionLocal() as session:
+            # Images that failed recently stay candidates, so fetch past them
+            candidates = await StoredImageRepository(StoredImage, session).get_transcode_candidates(
+                created_before,
+                settings.IMAGE_TRANSCODE_BATCH_SIZE + len(self._failed)
+            )
+        images = [image for image in candidates if image.path not in self._failed]
+        images = images[:settings.IMAGE_TRANSCODE_BATCH_SIZE]
+        
+        # Duplicates sharing a file are transcoded once
+        files = {}
+        for image in images:
+            files.setdefault(image.path, image)
+        
+        saved = failed = 0
+        for image in files.values():
+            try:
+                entry = await self.transcode(image)
+            except Exception as e:
+                logger.error(f"Error transcoding {image.image_id}: {str(e)}")
+                self._failed[image.path] = time.monotonic()
+                failed += 1
+                entry = None
+            if entry:
+                saved += image.size - entry.size
+            await asyncio.sleep(settings.IMAGE_TRANSCODE_PAUSE_SECONDS)
+        
+        if images:
+            logger.info(f"Transcoded batch of {len(images)} images ({failed} failed), saved {saved // 1024} KB")
+        return len(images)
+    
+    async def run_forever(self) -> None:
+        """Transcode in the background until cancelled (application lifetime)"""
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcoder pass failed: {str(e)}", exc_info=True)
+                processed = 0
+            
+            # Full batch: more work is waiting, keep going
+            if processed < settings.IMAGE_TRANSCODE_BATCH_SIZE:
+                await asyncio.sleep(settings.IMAGE_TRANSCODE_INTERVAL_SECONDS)
+
@@ -0,0 +1,359 @@
+"""Streaming image uploads from guard phones"""
+
+import io
+import asyncio
+import hashlib
+import logging
+import re
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Tuple, Union
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.schemas.patrol_record import PatrolRecordCreate
+from app.services.image_catalog import CatalogEntry, image_catalog
+from app.services.image_service import ImageExists, ImageService
+from app.services.rendition_service import render_rendition
+from app.utils.image_types import IMAGE_EXTENSIONS, sniff_content_type
+from app.utils.multipart_stream import PartHeaders
+from app.utils.process_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Bytes needed to recognise the image format
+SNIFF_BYTES = 16
+# Bytes kept to read the dimensions (JPEG size markers follow the EXIF block;
+# a larger EXIF/APP segment is measured from the stored file instead)
+HEAD_BYTES = 256 * 1024
+# Largest accepted record field
+MAX_RECORD_BYTES = 64 * 1024
+# Chunks buffered between the request and the storage write
+QUEUE_CHUNKS = 8
+# Image IDs become storage keys, so path separators are not allowed
+IMAGE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,99}$")
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeds IMAGE_UPLOAD_MAX_MB"""
+
+
+class UnsupportedImage(ValueError):
+    """The upload is not a JPEG, PNG or WebP image"""
+
+
+class UploadedImage(NamedTuple):
+    """An image stored by an upload, not yet linked to a record"""
+    image_id: str
+    entry: CatalogEntry
+    width: int
+    height: int
+    resized: bool  # Downscaled to the negotiated maximum edge
+    duplicate_of: Optional[str] = None  # Existing image with the same bytes (nothing new was stored)
+
+
+def measure_image(head: Union[bytes, Path]) -> Optional[Tuple[int, int]]:
+    """
+    Read image dimensions from the start of the file
+    
+    Args:
+        head: First bytes of the image, or the path of the stored file
+    
+    Returns:
+        Optional[Tuple[int, int]]: (width, height), or None if the header is not in head
+    """
+    try:
+        with Image.open(io.BytesIO(head) if isinstance(head, bytes) else head) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+class ImageUpload:
+    """
+    One image written to storage while it is still arriving
+    
+    Chunks are sniffed, hashed and counted as they come in and handed to
+    storage.put() through a small queue, so memory use is bounded by the
+    queue rather than the image, and an oversized or non-image upload is
+    rejected as soon as it is detected.
+    """
+    
+    def __init__(self, image_service: ImageService, image_id: str, max_edge: int):
+        """
+        Initialize upload
+        
+        Args:
+            image_service: Image service (storage and key layout)
+            image_id: Image identifier
+            max_edge: Longest edge to store; larger images are downscaled
+        """
+        self.image_service = image_service
+        self.storage = image_service.storage
+        self.image_id = image_id
+        self.max_edge = max_edge
+        self.max_bytes = settings.IMAGE_UPLOAD_MAX_MB * 1024 * 1024
+        self.key: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._head = bytearray()
+        self._queue: asyncio.Queue = asyncio.Queue(QUEUE_CHUNKS)
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        """Feed queued chunks to storage until the end marker"""
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
+    
+    async def _send(self, chunk: Optional[bytes]) -> None:
+        """Queue a chunk for storage, surfacing a failed write"""
+        put = asyncio.ensure_future(self._queue.put(chunk))
+        await asyncio.wait({put, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            self._task.result()
+    
+    async def _start(self) -> None:
+        """Start the storage write once the format is known"""
+        self.content_type = sniff_content_type(bytes(self._head))
+        if not self.content_type:
+            raise UnsupportedImage("Upload is not a JPEG, PNG or WebP image")
+        
+        # A key of its own: a concurrent upload with the same imageid cannot replace these bytes
+        self.key = self.image_service.new_key(self.image_id, IMAGE_EXTENSIONS[self.content_type])
+        self._task = asyncio.create_task(self.storage.put(self.key, self._chunks(), self.content_type))
+        # Bytes that arrived before the format was known
+        await self._send(bytes(self._head))
+    
+    async def write(self, chunk: bytes) -> None:
+        """
+        Receive the next piece of the image
+        
+        Args:
+            chunk: Image bytes
+        
+        Raises:
+            UploadTooLarge: If the image exceeds IMAGE_UPLOAD_MAX_MB
+            UnsupportedImage: If the image is not a JPEG, PNG or WebP
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"Image exceeds {settings.IMAGE_UPLOAD_MAX_MB} MB")
+        self._digest.update(chunk)
+        
+        head_before = len(self._head)
+        if head_before < HEAD_BYTES:
+            self._head.extend(chunk[:HEAD_BYTES - head_before])
+        
+        if self._task is None:
+            if len(self._head) >= SNIFF_BYTES:
+                await self._start()
+                # _start sent the head; send whatever of this chunk did not fit in it
+                rest = chunk[HEAD_BYTES - head_before:]
+                if rest:
+                    await self._send(rest)
+            return
+        await self._send(chunk)
+    
+    async def finish(self) -> UploadedImage:
+        """
+        Complete the write, downscale if needed and check for duplicates
+        
+        Returns:
+            UploadedImage: Stored image, ready to be linked to a record
+        
+        Raises:
+            UnsupportedImage: If the image is empty, unreadable or not a JPEG, PNG or WebP
+        """
+        if self._task is None:
+            await self._start()
+        await self._send(None)
+        await self._task
+        
+        dimensions = measure_image(bytes(self._head))
+        if dimensions is None and self.size > len(self._head):
+            # The size markers lie past HEAD_BYTES (a large EXIF/APP segment)
+            dimensions = await self._measure_stored()
+        if dimensions is None:
+            await self.storage.delete(self.key)
+            raise UnsupportedImage("Image header could not be read")
+        width, height = dimensions
+        
+        entry = CatalogEntry(
+            path=self.key,
+            size=self.size,
+            content_type=self.content_type,
+            sha256=self._digest.hexdigest()
+        )
+        
+        resized = max(width, height) > self.max_edge
+        if resized:
+            entry, (width, height) = await self._downscale(entry)
+        
+        duplicate = await image_catalog.find_duplicate(entry.sha256)
+        if duplicate and duplicate[1].path != entry.path and duplicate[1].size == entry.size:
+            original_id, original = duplicate
+            await self.storage.delete(entry.path)
+            return UploadedImage(self.image_id, original, width, height, resized, original_id)
+        
+        return UploadedImage(self.image_id, entry, width, height, resized)
+    
+    async def _measure_stored(self) -> Optional[Tuple[int, int]]:
+        """Read the dimensions from the stored file (Pillow only reads up to the header)"""
+        path = self.storage.local_path(self.key)
+        if path is None:
+            return await run_in_threadpool(measure_image, await self.storage.read(self.key))
+        return await run_in_threadpool(measure_image, path)
+    
+    async def _downscale(self, entry: CatalogEntry) -> Tuple[CatalogEntry, Tuple[int, int]]:
+        """Replace the stored image with a JPEG no larger than max_edge"""
+        data = await self.storage.read(entry.path)
+        encoded = await run_in_process(
+            render_rendition,
+            data,
+            None,
+            self.max_edge,
+            settings.IMAGE_UPLOAD_QUALITY
+        )
+        
+        key = PurePosixPath(entry.path).with_suffix(".jpg").as_posix()
+        await self.storage.put(key, encoded, "image/jpeg")
+        if key != entry.path:
+            await self.storage.delete(entry.path)
+        
+        logger.info(f"Downscaled uploaded image {self.image_id} from {entry.size} to {len(encoded)} bytes")
+        digest = await run_in_threadpool(lambda: hashlib.sha256(encoded).hexdigest())
+        return (
+            CatalogEntry(path=key, size=len(encoded), content_type="image/jpeg", sha256=digest),
+            measure_image(encoded)
+        )
+    
+    async def abort(self) -> None:
+        """Stop the write and remove anything already stored"""
+        if self._task is not None and not self._task.done():
+            # Cancelling the put discards the temporary file / multipart upload
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        elif self.key:
+            await self.storage.delete(self.key)
+
+
+class UploadService:
+    """Service for receiving patrol records with a photo from the guard's phone"""
+    
+    def __init__(self, image_service: ImageService):
+        """
+        Initialize upload service
+        
+        Args:
+            image_service: Image service instance
+        """
+        self.image_service = image_service
+    
+    def policy(self) -> Dict:
+        """
+        Get the upload limits clients should apply before sending
+        
+        Returns:
+            Dict: Maximum size, maximum edge, accepted content types and suggested JPEG quality
+        """
+        return {
+            "max_bytes": settings.IMAGE_UPLOAD_MAX_MB * 1024 * 1024,
+            "max_edge": settings.IMAGE_UPLOAD_MAX_EDGE,
+            "content_types": list(IMAGE_EXTENSIONS),
+            "jpeg_quality": settings.IMAGE_UPLOAD_QUALITY,
+        }
+    
+    async def receive(
+        self,
+        events: AsyncIterator[Tuple[str, object]],
+        max_edge: Optional[int] = None
+    ) -> Tuple[PatrolRecordCreate, UploadedImage]:
+        """
+        Receive a record and its image from a streamed multipart form
+        
+        The "record" field (patrol record JSON) must come before the
+        "image" file field, so the image can be stored while it arrives.
+        Image IDs that are already stored are rejected before anything is
+        written. Each upload writes a key of its own, so of two concurrent
+        uploads with the same imageid the one whose catalog row is
+        committed keeps its bytes and the other only removes its own file.
+        
+        Args:
+            events: Parsed form events (see utils.multipart_stream.iter_multipart)
+            max_edge: Longest edge the client asked to store (capped by IMAGE_UPLOAD_MAX_EDGE)
+        
+        Returns:
+            Tuple[PatrolRecordCreate, UploadedImage]: Record to create and its stored image
+        
+        Raises:
+            UploadTooLarge: If the image exceeds IMAGE_UPLOAD_MAX_MB
+            UnsupportedImage: If the image is not a JPEG, PNG or WebP
+            ImageExists: If an image with the record's imageid is already stored
+            ValueError: If the form is malformed, incomplete or the record is invalid
+        """
+        max_edge = min(max_edge or settings.IMAGE_UPLOAD_MAX_EDGE, settings.IMAGE_UPLOAD_MAX_EDGE)
+        record: Optional[PatrolRecordCreate] = None
+        record_bytes = bytearray()
+        upload: Optional[ImageUpload] = None
+        uploaded: Optional[UploadedImage] = None
+        part: Optional[PartHeaders] = None
+        
+        try:
+            async for kind, payload in events:
+                if kind == "part":
+                    part = payload
+                    if part.name == "image":
+                        if record is None:
+                            raise ValueError("The record field must come before the image")
+                        if not IMAGE_ID_PATTERN.match(record.imageid):
+                            raise ValueError("imageid may only contain letters, digits, '_', '-' and '.'")
+                        if upload is not None:
+                            raise ValueError("Only one image may be uploaded per record")
+                        if await self.image_service.locate(record.imageid) is not None:
+                            raise ImageExists(f"Image {record.imageid} already exists")
+                        upload = ImageUpload(self.image_service, record.imageid, max_edge)
+                elif kind == "data":
+                    if part.name == "image":
+                        await upload.write(payload)
+                    elif part.name == "record":
+                        record_bytes.extend(payload)
+                        if len(record_bytes) > MAX_RECORD_BYTES:
+                            raise ValueError("Record field is too large")
+                elif kind == "end":
+                    if part.name == "record":
+                        record = PatrolRecordCreate.model_validate_json(bytes(record_bytes))
+                    elif part.name == "image":
+                        uploaded = await upload.finish()
+                    part = None
+        except BaseException:
+            if uploaded is not None:
+                await self.discard(uploaded)
+            elif upload is not None:
+                await upload.abort()
+            raise
+        
+        if record is None:
+            raise ValueError("Missing record field")
+        if uploaded is None:
+            if upload is not None:
+                await upload.abort()
+            raise ValueError("Missing or incomplete image field")
+        return record, uploaded
+    
+    async def discard(self, uploaded: UploadedImage) -> None:
+        """
+        Remove an uploaded image that could not be linked to its record
+        
+        Files the catalog references are kept (the row was committed
+        before the failure).
+        
+        Args:
+            uploaded: Image returned by receive()
+        """
+        if uploaded.duplicate_of is None and not await image_catalog.is_referenced(uploaded.entry.path):
+            await self.image_service.storage.delete(uploaded.entry.path)
+
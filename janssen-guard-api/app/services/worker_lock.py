@@ -0,0 +1,138 @@
+"""Database locks electing the one process that runs each background worker"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to take a lock held by another process
+RETRY_SECONDS = 60
+# Seconds between checks that the lock is still held
+CHECK_SECONDS = 30
+
+# dialect -> (try to take the lock, check it is still held by this connection)
+_LOCK_SQL = {
+    "mysql": (
+        "SELECT GET_LOCK(:name, 0)",
+        "SELECT IS_USED_LOCK(:name) = CONNECTION_ID()",
+    ),
+    "postgresql": (
+        "SELECT pg_try_advisory_lock(hashtext(:name))",
+        "SELECT true",  # Session locks last as long as the connection
+    ),
+}
+
+
+class WorkerLock:
+    """
+    Named lock held on a dedicated database connection
+    
+    The database releases the lock when the connection ends, so a
+    process that dies or loses its connection hands the work over to the
+    next process that tries. Databases without advisory locks (SQLite,
+    used for development) are single-host, and the lock is always taken.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Initialize lock
+        
+        Args:
+            name: Lock name, shared by every process running the same worker
+        """
+        self.name = f"janssen_guard:{name}"
+        self._sql = _LOCK_SQL.get(engine.dialect.name)
+        self._connection: Optional[AsyncConnection] = None
+    
+    async def acquire(self) -> bool:
+        """
+        Take the lock if no other process holds it
+        
+        Returns:
+            bool: True if this process now holds the lock
+        """
+        if self._sql is None:
+            return True
+        connection = await engine.connect()
+        try:
+            held = (await connection.execute(text(self._sql[0]), {"name": self.name})).scalar()
+        except BaseException:
+            await connection.close()
+            raise
+        if not held:
+            await connection.close()
+            return False
+        self._connection = connection
+        return True
+    
+    async def is_held(self) -> bool:
+        """
+        Check that the lock's connection is alive and still holds it
+        
+        Returns:
+            bool: True if this process still holds the lock
+        """
+        if self._sql is None:
+            return True
+        if self._connection is None:
+            return False
+        try:
+            return bool((await self._connection.execute(text(self._sql[1]), {"name": self.name})).scalar())
+        except Exception as e:
+            logger.warning(f"Lost connection holding {self.name}: {str(e)}")
+            return False
+    
+    async def release(self) -> None:
+        """Release the lock by closing its connection"""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                await connection.close()
+            except Exception:
+                pass
+
+
+async def run_elected(name: str, work: Callable[[], Awaitable[None]]) -> None:
+    """
+    Run a background worker in only one process at a time (application lifetime)
+    
+    Every process enabling the worker calls this; the one that takes the
+    lock runs it, the others retry every RETRY_SECONDS and take over if
+    it stops. A process that loses the lock cancels its worker.
+    
+    Args:
+        name: Worker name (the lock name)
+        work: Starts the worker; runs until cancelled
+    """
+    lock = WorkerLock(name)
+    while True:
+        try:
+            acquired = await lock.acquire()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Could not take the {name} lock: {str(e)}")
+            acquired = False
+        if not acquired:
+            await asyncio.sleep(RETRY_SECONDS)
+            continue
+        
+        logger.info(f"Running the {name} in this process")
+        task = asyncio.create_task(work())
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=CHECK_SECONDS)
+                if not task.done() and not await lock.is_held():
+                    logger.warning(f"Lost the {name} lock; stopping it in this process")
+                    break
+            if task.done() and not task.cancelled() and task.exception():
+                logger.error(f"The {name} stopped: {str(task.exception())}")
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await lock.release()
+
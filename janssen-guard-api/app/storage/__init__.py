@@ -0,0 +1,52 @@
+"""Image storage backends"""
+
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+from app.storage.base import ObjectInfo, StorageBackend
+from app.storage.local import LocalStorage
+from app.storage.s3 import S3Storage
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """
+    Get the configured storage backend, creating it on first use
+    
+    Returns:
+        StorageBackend: LocalStorage or S3Storage (IMAGE_STORAGE_BACKEND)
+        
+    Raises:
+        ValueError: If IMAGE_STORAGE_BACKEND is unknown
+    """
+    global _storage
+    if _storage is None:
+        if settings.IMAGE_STORAGE_BACKEND == "local":
+            _storage = LocalStorage(Path(settings.IMAGE_STORAGE_PATH))
+        elif settings.IMAGE_STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                endpoint_url=settings.S3_ENDPOINT_URL or f"https://s3.{settings.S3_REGION}.amazonaws.com",
+                bucket=settings.S3_BUCKET,
+                region=settings.S3_REGION,
+                access_key=settings.S3_ACCESS_KEY_ID,
+                secret_key=settings.S3_SECRET_ACCESS_KEY,
+                prefix=settings.S3_KEY_PREFIX,
+                public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+                max_connections=settings.S3_MAX_CONNECTIONS
+            )
+        else:
+            raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {settings.IMAGE_STORAGE_BACKEND}")
+    return _storage
+
+
+async def close_storage() -> None:
+    """Close the storage backend (application shutdown)"""
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
+
+
+__all__ = ["ObjectInfo", "StorageBackend", "LocalStorage", "S3Storage", "get_storage", "close_storage"]
+
@@ -0,0 +1,159 @@
+"""Image storage backend interface"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, NamedTuple, Optional, Union
+
+
+class ObjectInfo(NamedTuple):
+    """Metadata of a stored object"""
+    size: int
+    mtime: float  # Unix timestamp
+    etag: Optional[str] = None  # Backend ETag, quoted (None if the backend has none)
+
+
+class StorageBackend(ABC):
+    """
+    Key/value store for image bytes
+    
+    Keys are relative POSIX paths ("ab/cd/img-1.jpg"), the same paths the
+    image catalog records. Missing keys raise FileNotFoundError from
+    read operations, whatever the backend.
+    """
+    
+    def local_path(self, key: str) -> Optional[Path]:
+        """
+        Get the filesystem path of an object, if the backend has one
+        
+        Callers use this to hand files to sendfile, nginx or Pillow
+        directly; remote backends return None.
+        
+        Args:
+            key: Object key
+            
+        Returns:
+            Optional[Path]: Local file path or None
+        """
+        return None
+    
+    @abstractmethod
+    async def put(self, key: str, data: Union[bytes, AsyncIterable[bytes]], content_type: str) -> int:
+        """
+        Store an object atomically (readers see the old object or the new one)
+        
+        Args:
+            key: Object key
+            data: Object bytes, or an async iterable of chunks to stream
+            content_type: MIME type
+            
+        Returns:
+            int: Number of bytes stored
+        """
+    
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        """
+        Read a whole object
+        
+        Args:
+            key: Object key
+            
+        Returns:
+            bytes: Object bytes
+            
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+    
+    @abstractmethod
+    def iter_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Stream part of an object in chunks
+        
+        Args:
+            key: Object key
+            offset: First byte
+            length: Number of bytes (None for the rest of the object)
+            
+        Yields:
+            bytes: Object chunks
+            
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+    
+    async def read_range(self, key: str, offset: int, length: int) -> bytes:
+        """
+        Read part of an object (e.g. one image packed into a segment file)
+        
+        Args:
+            key: Object key
+            offset: First byte
+            length: Number of bytes
+            
+        Returns:
+            bytes: The requested bytes
+            
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+        return b"".join([chunk async for chunk in self.iter_range(key, offset, length)])
+    
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        """
+        Get object metadata
+        
+        Args:
+            key: Object key
+            
+        Returns:
+            Optional[ObjectInfo]: Metadata or None if the object does not exist
+        """
+    
+    async def exists(self, key: str) -> bool:
+        """
+        Check whether an object exists
+        
+        Args:
+            key: Object key
+            
+        Returns:
+            bool: True if it exists
+        """
+        return await self.stat(key) is not None
+    
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Delete an object (missing objects are ignored)
+        
+        Args:
+            key: Object key
+        """
+    
+    async def presigned_url(self, key: str, expires: int) -> Optional[str]:
+        """
+        Get a time-limited URL clients can fetch the object from directly
+        
+        Args:
+            key: Object key
+            expires: Validity in seconds
+            
+        Returns:
+            Optional[str]: URL, or None if the backend cannot presign
+        """
+        return None
+    
+    @abstractmethod
+    async def is_available(self) -> bool:
+        """
+        Check that the backend can be reached
+        
+        Returns:
+            bool: True if available
+        """
+    
+    async def close(self) -> None:
+        """Release connections (application shutdown)"""
+
@@ -0,0 +1,93 @@
+"""Local filesystem storage backend"""
+
+import os
+import uuid
+import aiofiles
+import aiofiles.os
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+from starlette.concurrency import run_in_threadpool
+from app.storage.base import ObjectInfo, StorageBackend
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _pread(path: Path, offset: int, length: int) -> bytes:
+    """Read a byte range with one positioned read (blocking)"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, length, offset)
+    finally:
+        os.close(fd)
+
+
+class LocalStorage(StorageBackend):
+    """Objects stored as files under a root directory"""
+    
+    def __init__(self, root: Path):
+        """
+        Initialize local storage and create the root directory
+        
+        Args:
+            root: Storage root (IMAGE_STORAGE_PATH)
+        """
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+    
+    async def put(self, key: str, data: Union[bytes, AsyncIterable[bytes]], content_type: str) -> int:
+        path = self.local_path(key)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        
+        # Write to a unique temp file, then rename: readers never see partial files
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        size = 0
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    await f.write(data)
+                    size = len(data)
+                else:
+                    async for chunk in data:
+                        await f.write(chunk)
+                        size += len(chunk)
+            await aiofiles.os.replace(temp_path, path)
+        except BaseException:
+            await run_in_threadpool(temp_path.unlink, missing_ok=True)
+            raise
+        return size
+    
+    async def read(self, key: str) -> bytes:
+        async with aiofiles.open(self.local_path(key), 'rb') as f:
+            return await f.read()
+    
+    async def iter_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.local_path(key), 'rb') as f:
+            await f.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = await f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    async def read_range(self, key: str, offset: int, length: int) -> bytes:
+        return await run_in_threadpool(_pread, self.local_path(key), offset, length)
+    
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            stat_result = await run_in_threadpool(os.stat, self.local_path(key))
+        except FileNotFoundError:
+            return None
+        return ObjectInfo(stat_result.st_size, stat_result.st_mtime)
+    
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.local_path(key).unlink, missing_ok=True)
+    
+    async def is_available(self) -> bool:
+        return await run_in_threadpool(self.root.is_dir)
+
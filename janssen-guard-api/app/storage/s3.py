@@ -0,0 +1,267 @@
+"""S3-compatible object storage backend (AWS S3, MinIO, Ceph RGW, ...)"""
+
+import time
+import hashlib
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Union
+from urllib.parse import quote
+import httpx
+from starlette.concurrency import run_in_threadpool
+from app.storage.base import ObjectInfo, StorageBackend
+from app.storage.sigv4 import EMPTY_SHA256, presign_url, sign_headers
+
+logger = logging.getLogger(__name__)
+
+S3_NAMESPACE = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects stored in an S3 bucket, signed with SigV4
+    
+    Uses path-style URLs (endpoint/bucket/key), which every S3-compatible
+    server accepts. One pooled HTTP client is shared by all requests.
+    Streamed uploads larger than one part use multipart upload, so an
+    upload never needs more than part_size bytes of memory.
+    """
+    
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        region: str,
+        access_key: str,
+        secret_key: str,
+        prefix: str = "",
+        public_endpoint_url: str = "",
+        max_connections: int = 20,
+        part_size: int = 8 * 1024 * 1024,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize S3 storage
+        
+        Args:
+            endpoint_url: S3 endpoint (e.g. http://minio:9000)
+            bucket: Bucket name
+            region: Signing region
+            access_key: Access key ID
+            secret_key: Secret access key
+            prefix: Key prefix inside the bucket
+            public_endpoint_url: Endpoint used in presigned URLs (defaults to endpoint_url)
+            max_connections: Connection pool size
+            part_size: Multipart upload part size (S3 minimum is 5 MB)
+            timeout: Request timeout in seconds
+        """
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.prefix = prefix
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+    
+    def _url(self, key: Optional[str], endpoint: Optional[str] = None, query: str = "") -> str:
+        """Build the path-style URL of an object (or of the bucket if key is None)"""
+        path = f"/{self.bucket}" if key is None else f"/{self.bucket}/{self.prefix}{key}"
+        url = f"{endpoint or self.endpoint_url}{quote(path, safe='/-_.~')}"
+        return f"{url}?{query}" if query else url
+    
+    async def _send(
+        self,
+        method: str,
+        key: Optional[str],
+        query: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+        stream: bool = False
+    ) -> httpx.Response:
+        """Sign and send a request"""
+        url = self._url(key, query=query)
+        payload_hash = (
+            await run_in_threadpool(lambda: hashlib.sha256(content).hexdigest())
+            if content else EMPTY_SHA256
+        )
+        signed = sign_headers(
+            method,
+            url,
+            headers or {},
+            payload_hash,
+            self.access_key,
+            self.secret_key,
+            self.region
+        )
+        request = self._client.build_request(method, url, headers=signed, content=content)
+        return await self._client.send(request, stream=stream)
+    
+    @staticmethod
+    def _check(response: httpx.Response, key: Optional[str]) -> None:
+        """Map S3 errors: 404 -> FileNotFoundError, other errors -> HTTPStatusError"""
+        if response.status_code == 404:
+            raise FileNotFoundError(key)
+        response.raise_for_status()
+    
+    async def put(self, key: str, data: Union[bytes, AsyncIterable[bytes]], content_type: str) -> int:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            await self._put_object(key, bytes(data), content_type)
+            return len(data)
+        
+        # Buffer one part; small uploads still go out as a single PUT
+        buffer = bytearray()
+        chunks = data.__aiter__()
+        async for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= self.part_size:
+                return await self._put_multipart(key, buffer, chunks, content_type)
+        await self._put_object(key, bytes(buffer), content_type)
+        return len(buffer)
+    
+    async def _put_object(self, key: str, data: bytes, content_type: str) -> None:
+        """Upload an object in a single request"""
+        response = await self._send("PUT", key, headers={"Content-Type": content_type}, content=data)
+        self._check(response, key)
+    
+    async def _put_multipart(
+        self,
+        key: str,
+        buffer: bytearray,
+        chunks: AsyncIterator[bytes],
+        content_type: str
+    ) -> int:
+        """Upload an object part by part (buffer holds the first part's bytes)"""
+        response = await self._send("POST", key, query="uploads=", headers={"Content-Type": content_type})
+        self._check(response, key)
+        upload_id = ET.fromstring(response.content).findtext(f"{S3_NAMESPACE}UploadId")
+        upload_query = f"uploadId={quote(upload_id, safe='')}"
+        
+        parts: List[str] = []
+        size = 0
+        
+        async def upload_part(data: bytes) -> None:
+            response = await self._send(
+                "PUT",
+                key,
+                query=f"partNumber={len(parts) + 1}&{upload_query}",
+                content=data
+            )
+            self._check(response, key)
+            parts.append(response.headers["etag"])
+        
+        try:
+            while True:
+                # Every part but the last is exactly part_size bytes
+                while len(buffer) >= self.part_size:
+                    data = bytes(buffer[:self.part_size])
+                    del buffer[:self.part_size]
+                    await upload_part(data)
+                    size += len(data)
+                try:
+                    buffer += await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+            if buffer:
+                await upload_part(bytes(buffer))
+                size += len(buffer)
+            
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(parts, start=1)
+            )
+            response = await self._send(
+                "POST",
+                key,
+                query=upload_query,
+                content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode()
+            )
+            self._check(response, key)
+            # S3 can report a failed completion inside a 200 response
+            if b"<Error>" in response.content:
+                raise RuntimeError(f"Multipart upload of {key} failed: {response.text}")
+        except BaseException:
+            try:
+                await self._send("DELETE", key, query=upload_query)
+            except Exception as e:
+                logger.warning(f"Could not abort multipart upload of {key}: {str(e)}")
+            raise
+        return size
+    
+    async def read(self, key: str) -> bytes:
+        response = await self._send("GET", key)
+        self._check(response, key)
+        return response.content
+    
+    async def iter_range(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        if length == 0:
+            return
+        
+        headers = {}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            headers["Range"] = f"bytes={offset}-{end}"
+        
+        response = await self._send("GET", key, headers=headers, stream=True)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+            self._check(response, key)
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+    
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        response = await self._send("HEAD", key)
+        if response.status_code == 404:
+            return None
+        self._check(response, key)
+        
+        last_modified = response.headers.get("last-modified")
+        mtime = parsedate_to_datetime(last_modified).timestamp() if last_modified else 0.0
+        return ObjectInfo(
+            size=int(response.headers.get("content-length", 0)),
+            mtime=mtime,
+            etag=response.headers.get("etag")
+        )
+    
+    async def delete(self, key: str) -> None:
+        response = await self._send("DELETE", key)
+        self._check(response, key)
+    
+    async def presigned_url(self, key: str, expires: int) -> str:
+        """
+        Get a presigned GET URL, valid for between expires and 2 x expires seconds
+        
+        The signing time is rounded down to a multiple of expires, so
+        repeated requests within a window get the same URL and the browser
+        can reuse its cached copy of the image.
+        """
+        window = max(expires, 1)
+        signed_at = datetime.fromtimestamp(int(time.time()) // window * window, timezone.utc)
+        return presign_url(
+            "GET",
+            self._url(key, endpoint=self.public_endpoint_url),
+            self.access_key,
+            self.secret_key,
+            self.region,
+            min(window * 2, 604800),
+            now=signed_at
+        )
+    
+    async def is_available(self) -> bool:
+        try:
+            response = await self._send("HEAD", None)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+    
+    async def close(self) -> None:
+        await self._client.aclose()
+
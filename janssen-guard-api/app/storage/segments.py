@@ -0,0 +1,140 @@
+"""Append-only segment files for packed cold images"""
+
+import os
+import fcntl
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Tuple
+
+# Segment files live under this key prefix in local storage
+SEGMENT_DIR = "segments"
+SEGMENT_SUFFIX = ".seg"
+
+# Each record is a header, the image ID and the image bytes. Offsets in the
+# catalog point at the image bytes, so reads never parse headers; the
+# headers only make a segment self-describing for recovery tools.
+RECORD_MAGIC = b"JGIM"
+RECORD_HEADER = struct.Struct(">4sHI")  # magic, ID length, data length
+
+
+def segment_key(number: int) -> str:
+    """
+    Get the storage key of a segment file
+    
+    Args:
+        number: Segment sequence number
+    
+    Returns:
+        str: Segment key, e.g. segments/000001.seg
+    """
+    return f"{SEGMENT_DIR}/{number:06d}{SEGMENT_SUFFIX}"
+
+
+class SegmentWriter:
+    """
+    Appends images to the newest segment file (blocking)
+    
+    Segments are only ever appended to, and a new one is started once the
+    current one reaches max_bytes, so readers can pread published ranges
+    while the writer is running. Appends happen inside batch(), which
+    holds an exclusive flock on the active segment and takes offsets from
+    its size on disk once locked, so writers in other processes never
+    hand out the same offset. Appended bytes are only durable after
+    sync(); batch() syncs before returning, and callers must not record
+    offsets anywhere before that.
+    """
+    
+    def __init__(self, root: Path, max_bytes: int):
+        """
+        Initialize writer and resume the newest segment
+        
+        Args:
+            root: Storage root (IMAGE_STORAGE_PATH)
+            max_bytes: Size at which a new segment is started
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.directory = root / SEGMENT_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.number = self._newest()
+        self._file = None
+        self._size = 0
+    
+    def _newest(self) -> int:
+        """Number of the newest segment on disk (1 if there is none)"""
+        numbers = [
+            int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}")
+            if path.stem.isdigit()
+        ]
+        return max(numbers, default=1)
+    
+    def _open(self, number: int) -> None:
+        """Open and lock a segment for appending"""
+        self.close()
+        self.number = number
+        self._file = open(self.root / segment_key(number), "ab")
+        # Blocks while another process appends; its records are then in the size
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        self._size = os.fstat(self._file.fileno()).st_size
+    
+    @contextmanager
+    def batch(self) -> Iterator["SegmentWriter"]:
+        """
+        Lock the newest segment for a batch of appends
+        
+        The lock is released, after a sync(), when the block exits.
+        
+        Yields:
+            SegmentWriter: This writer
+        """
+        # Another process may have started a newer segment since the last batch
+        self._open(max(self.number, self._newest()))
+        try:
+            yield self
+        finally:
+            self.close()
+    
+    def append(self, image_id: str, data: bytes) -> Tuple[str, int]:
+        """
+        Append one image (inside batch())
+        
+        Args:
+            image_id: Image identifier
+            data: Image bytes
+        
+        Returns:
+            Tuple[str, int]: Segment key and offset of the image bytes in it
+            
+        Raises:
+            RuntimeError: If called outside batch()
+        """
+        if self._file is None:
+            raise RuntimeError("SegmentWriter.append() must be called inside batch()")
+        
+        encoded_id = image_id.encode()
+        record_size = RECORD_HEADER.size + len(encoded_id) + len(data)
+        if self._size and self._size + record_size > self.max_bytes:
+            self.sync()
+            self._open(self.number + 1)
+        
+        self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, len(encoded_id), len(data)))
+        self._file.write(encoded_id)
+        offset = self._size + RECORD_HEADER.size + len(encoded_id)
+        self._file.write(data)
+        self._size += record_size
+        return segment_key(self.number), offset
+    
+    def sync(self) -> None:
+        """Flush appended records to disk"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def close(self) -> None:
+        """Flush and close the current segment, releasing its lock"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
@@ -0,0 +1,160 @@
+"""AWS Signature Version 4 signing for S3-compatible requests"""
+
+import hmac
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import quote, urlsplit, parse_qsl
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str) -> str:
+    return quote(value, safe="-_.~")
+
+
+def _canonical_query(query: str) -> str:
+    """Sort and re-encode query parameters as SigV4 requires"""
+    pairs = parse_qsl(query, keep_blank_values=True)
+    return "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(pairs))
+
+
+def _signature(
+    secret_key: str,
+    region: str,
+    service: str,
+    amz_date: str,
+    canonical_request: str
+) -> str:
+    """Derive the signing key and sign a canonical request"""
+    date_stamp = amz_date[:8]
+    scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([
+        ALGORITHM,
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    
+    key = _hmac(f"AWS4{secret_key}".encode(), date_stamp)
+    for part in (region, service, "aws4_request"):
+        key = _hmac(key, part)
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_headers(
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    service: str = "s3",
+    now: Optional[datetime] = None
+) -> Dict[str, str]:
+    """
+    Sign a request with an Authorization header
+    
+    Every header passed in is signed, so only pass headers the client
+    will send unchanged.
+    
+    Args:
+        method: HTTP method
+        url: Full request URL (path already percent-encoded)
+        headers: Headers to send (Host is derived from the URL)
+        payload_hash: Hex SHA-256 of the body, or UNSIGNED_PAYLOAD
+        access_key: Access key ID
+        secret_key: Secret access key
+        region: Signing region
+        service: Signing service name
+        now: Signing time (defaults to the current time)
+        
+    Returns:
+        Dict[str, str]: Headers including Host, X-Amz-Date, X-Amz-Content-Sha256 and Authorization
+    """
+    parts = urlsplit(url)
+    amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    signed = {k.lower(): str(v).strip() for k, v in headers.items()}
+    signed.update({
+        "host": parts.netloc,
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+    })
+    names = sorted(signed)
+    signed_headers = ";".join(names)
+    
+    canonical_request = "\n".join([
+        method,
+        parts.path or "/",
+        _canonical_query(parts.query),
+        "".join(f"{name}:{signed[name]}\n" for name in names),
+        signed_headers,
+        payload_hash
+    ])
+    signature = _signature(secret_key, region, service, amz_date, canonical_request)
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    
+    signed["authorization"] = (
+        f"{ALGORITHM} Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return signed
+
+
+def presign_url(
+    method: str,
+    url: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    expires: int,
+    service: str = "s3",
+    now: Optional[datetime] = None
+) -> str:
+    """
+    Build a presigned URL (query-string authentication)
+    
+    Args:
+        method: HTTP method the URL is valid for
+        url: Object URL (path already percent-encoded, may carry query parameters)
+        access_key: Access key ID
+        secret_key: Secret access key
+        region: Signing region
+        expires: Validity in seconds (at most 604800)
+        service: Signing service name
+        now: Signing time (defaults to the current time)
+        
+    Returns:
+        str: URL that grants access without credentials until it expires
+    """
+    parts = urlsplit(url)
+    amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    
+    params = parse_qsl(parts.query, keep_blank_values=True) + [
+        ("X-Amz-Algorithm", ALGORITHM),
+        ("X-Amz-Credential", f"{access_key}/{scope}"),
+        ("X-Amz-Date", amz_date),
+        ("X-Amz-Expires", str(expires)),
+        ("X-Amz-SignedHeaders", "host"),
+    ]
+    query = "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(params))
+    
+    canonical_request = "\n".join([
+        method,
+        parts.path or "/",
+        query,
+        f"host:{parts.netloc}\n",
+        "host",
+        UNSIGNED_PAYLOAD
+    ])
+    signature = _signature(secret_key, region, service, amz_date, canonical_request)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}?{query}&X-Amz-Signature={signature}"
+
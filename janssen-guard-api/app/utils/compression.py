@@ -0,0 +1,37 @@
+"""Response compression helpers"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Payloads that are already compressed: gzip only burns CPU on them and
+# forces streamed file responses through an in-memory buffer
+UNCOMPRESSIBLE_TYPES = ("image/", "video/", "application/zip")
+
+
+class MediaAwareGZipResponder(GZipResponder):
+    """GZip responder that passes already-compressed media through untouched"""
+    
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(UNCOMPRESSIBLE_TYPES):
+                # Same pass-through path GZipResponder uses for encoded bodies
+                self.content_encoding_set = True
+
+
+class MediaAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that skips images and archives"""
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = MediaAwareGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
@@ -0,0 +1,433 @@
+"""HTTP responses for stored patrol images"""
+
+import os
+import hashlib
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import Request
+from fastapi.responses import Response, FileResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.image_cache import ImageCache, cache_key
+from app.storage import StorageBackend
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_etag(name: str, size: int, mtime_ns: int) -> str:
+    """
+    Build a strong ETag from file identity
+    
+    Stored images are never rewritten in place, so name + size + mtime
+    identifies the exact bytes.
+    
+    Args:
+        name: File name
+        size: File size in bytes
+        mtime_ns: Modification time in nanoseconds
+    
+    Returns:
+        str: Quoted strong ETag
+    """
+    digest = hashlib.sha1(f"{name}:{size}:{mtime_ns}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str, mtime: Optional[float]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since
+    
+    Args:
+        request: Incoming request
+        etag: Current ETag
+        mtime: Modification time (Unix timestamp), None if unknown
+    
+    Returns:
+        bool: True if the client copy is still valid (304)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and mtime is not None:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    
+    return False
+
+
+def parse_range(request: Request, size: int, etag: str, last_modified: str) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range from the Range header
+    
+    Multiple ranges and stale If-Range validators fall back to the full
+    body (allowed by RFC 9110).
+    
+    Args:
+        request: Incoming request
+        size: Total size in bytes
+        etag: Current ETag
+        last_modified: Current Last-Modified header value
+    
+    Returns:
+        Optional[Tuple[int, int]]: Inclusive (start, end), or None for the full body
+    
+    Raises:
+        ValueError: If the range cannot be satisfied (416)
+    """
+    range_header = request.headers.get("range")
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range not in (etag, last_modified):
+        return None
+    
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        raise ValueError("Invalid range")
+    
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+async def iter_file(path: Path, offset: int, length: int) -> AsyncIterator[bytes]:
+    """
+    Stream part of a file in chunks
+    
+    Args:
+        path: File path
+        offset: First byte to send
+        length: Number of bytes to send
+    
+    Yields:
+        bytes: File chunks
+    """
+    async with await anyio.open_file(path, mode="rb") as file:
+        await file.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def bytes_response(
+    data: bytes,
+    byte_range: Optional[Tuple[int, int]],
+    media_type: str,
+    headers: dict
+) -> Response:
+    """
+    Build a 200 or 206 response from image bytes held in memory
+    
+    Args:
+        data: Whole image
+        byte_range: Inclusive (start, end), or None for the full body
+        media_type: Content type
+        headers: Validator and caching headers
+    
+    Returns:
+        Response: Image response
+    """
+    if byte_range is None:
+        return Response(data, media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    return Response(
+        data[start:end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{len(data)}"}
+    )
+
+
+async def image_response(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    media_type: Optional[str] = None,
+    etag: Optional[str] = None,
+    offset: Optional[int] = None,
+    size: Optional[int] = None,
+    cache: Optional[ImageCache] = None
+) -> Response:
+    """
+    Build a cacheable, range-aware response for a stored image
+    
+    Images are immutable once written, so responses carry a strong ETag,
+    Last-Modified and a long-lived Cache-Control, conditional requests
+    get 304, and single byte ranges get 206 so large images can resume.
+    
+    Behind nginx (IMAGE_ACCEL_REDIRECT_PREFIX set) the API only returns
+    an X-Accel-Redirect header and nginx sends the file itself (and
+    handles Range), so the bytes never pass through the Python worker.
+    Otherwise the file is sent with FileResponse (sendfile) or, for a
+    range, streamed from disk in chunks; the page cache already holds
+    recently read files, so the in-memory cache is not used for them.
+    Remote backends are handled by remote_image_response, images packed
+    into segment files by packed_image_response (both use the cache).
+    
+    Args:
+        request: Incoming request (conditional and Range headers)
+        storage: Storage backend holding the image
+        key: Storage key
+        media_type: Content type (guessed from the key if omitted)
+        etag: Quoted ETag (derived from storage metadata if omitted)
+        offset: Offset of the image within the object (packed images)
+        size: Image size (packed images)
+        cache: Cache for the bytes of packed and remote images
+    
+    Returns:
+        Response: Image response (200, 206, 304, 307 or 416)
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
+    """
+    media_type = media_type or mimetypes.guess_type(key)[0] or "image/jpeg"
+    if offset is not None:
+        return await packed_image_response(request, storage, key, offset, size, media_type, etag, cache)
+    
+    path = storage.local_path(key)
+    if path is None:
+        return await remote_image_response(request, storage, key, media_type, etag, cache)
+    
+    stat_result = await run_in_threadpool(os.stat, path)
+    size = stat_result.st_size
+    etag = etag or make_etag(path.name, size, stat_result.st_mtime_ns)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": settings.IMAGE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = f"inline; filename={path.name}"
+    
+    if settings.IMAGE_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = (
+            f"{settings.IMAGE_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(key)}"
+        )
+        return Response(media_type=media_type, headers=headers)
+    
+    try:
+        byte_range = parse_range(request, size, etag, last_modified)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+    
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        iter_file(path, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+async def remote_image_response(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    media_type: str,
+    etag: Optional[str] = None,
+    cache: Optional[ImageCache] = None
+) -> Response:
+    """
+    Build the response for an image held by a remote backend (S3)
+    
+    With IMAGE_PRESIGNED_REDIRECTS the client is redirected to a presigned
+    URL and fetches the bytes from storage directly; a catalogued ETag
+    still answers conditional requests without contacting storage.
+    Otherwise the object is proxied, with the same Range handling as
+    local files and the same in-memory cache.
+    
+    Args:
+        request: Incoming request (conditional and Range headers)
+        storage: Storage backend holding the image
+        key: Storage key
+        media_type: Content type
+        etag: Quoted ETag (the backend's ETag if omitted)
+        cache: Cache for the bytes of proxied images
+    
+    Returns:
+        Response: Image response (200, 206, 304, 307 or 416)
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
+    """
+    if etag and is_not_modified(request, etag, None):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": settings.IMAGE_CACHE_CONTROL}
+        )
+    
+    if settings.IMAGE_PRESIGNED_REDIRECTS:
+        url = await storage.presigned_url(key, settings.IMAGE_PRESIGNED_URL_EXPIRES)
+        if url:
+            # The URL is valid for at least the expiry window, so the redirect may be cached that long
+            return RedirectResponse(
+                url,
+                status_code=307,
+                headers={"Cache-Control": f"private, max-age={settings.IMAGE_PRESIGNED_URL_EXPIRES}"}
+            )
+    
+    info = await storage.stat(key)
+    if info is None:
+        raise FileNotFoundError(key)
+    
+    size = info.size
+    etag = etag or info.etag or make_etag(key, size, int(info.mtime * 1e9))
+    last_modified = formatdate(info.mtime, usegmt=True)
+    name = key.rsplit("/", 1)[-1]
+    
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": settings.IMAGE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    
+    if is_not_modified(request, etag, info.mtime):
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = f"inline; filename={name}"
+    
+    try:
+        byte_range = parse_range(request, size, etag, last_modified)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if cache and cache.accepts(size):
+        data = await cache.read_through(key, lambda: storage.read(key))
+        return bytes_response(data, byte_range, media_type, headers)
+    
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_range(key, start, length),
+        status_code=206 if byte_range else 200,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+async def packed_image_response(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    offset: int,
+    size: int,
+    media_type: str,
+    etag: str,
+    cache: Optional[ImageCache] = None
+) -> Response:
+    """
+    Build the response for an image packed into a segment file
+    
+    The image is a byte slice of the segment, so it is always streamed
+    from the API (nginx can only send whole files); the catalogued ETag
+    validates it, since the segment's mtime changes as it grows.
+    
+    Args:
+        request: Incoming request (conditional and Range headers)
+        storage: Storage backend holding the segment
+        key: Segment key
+        offset: Offset of the image in the segment
+        size: Image size
+        media_type: Content type
+        etag: Quoted ETag
+        cache: Cache for the image bytes
+    
+    Returns:
+        Response: Image response (200, 206, 304 or 416)
+    
+    Raises:
+        FileNotFoundError: If the segment does not exist
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.IMAGE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = parse_range(request, size, etag, "")
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if cache and cache.accepts(size):
+        data = await cache.read_through(
+            cache_key(key, offset),
+            lambda: storage.read_range(key, offset, size)
+        )
+        return bytes_response(data, byte_range, media_type, headers)
+    
+    if not await storage.exists(key):
+        raise FileNotFoundError(key)
+    
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_range(key, offset + start, length),
+        status_code=206 if byte_range else 200,
+        media_type=media_type,
+        headers=headers
+    )
+
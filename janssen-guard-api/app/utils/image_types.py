@@ -0,0 +1,30 @@
+"""Image format detection helpers"""
+
+from typing import Optional
+
+# Content type -> file extension used in storage
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+
+
+def sniff_content_type(data: bytes) -> Optional[str]:
+    """
+    Detect an image format from its leading bytes
+    
+    Args:
+        data: At least the first 12 bytes of the file
+        
+    Returns:
+        Optional[str]: Content type, or None if not a supported image
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
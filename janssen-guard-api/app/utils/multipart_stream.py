@@ -0,0 +1,94 @@
+"""Incremental multipart/form-data parsing over a request stream"""
+
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class PartHeaders(NamedTuple):
+    """Headers of one form part"""
+    name: str
+    filename: Optional[str]
+    content_type: str
+
+
+async def iter_multipart(request: Request) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Parse a multipart/form-data body as it arrives
+    
+    python-multipart's push parser is fed each received chunk and its
+    callbacks are turned into events, so part data is handed on chunk by
+    chunk and never buffered as a whole (unlike request.form(), which
+    spools every file before the handler runs).
+    
+    Args:
+        request: Incoming multipart request
+    
+    Yields:
+        Tuple[str, object]: ("part", PartHeaders) when a part starts,
+        ("data", bytes) for each piece of its body and ("end", None) when it ends
+    
+    Raises:
+        ValueError: If the body is not multipart/form-data or is malformed
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+    
+    events: List[Tuple[str, object]] = []
+    raw_headers: Dict[bytes, bytes] = {}
+    field = bytearray()
+    value = bytearray()
+    
+    def on_part_begin() -> None:
+        raw_headers.clear()
+    
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        field.extend(data[start:end])
+    
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        value.extend(data[start:end])
+    
+    def on_header_end() -> None:
+        raw_headers[bytes(field).lower()] = bytes(value)
+        field.clear()
+        value.clear()
+    
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(raw_headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        events.append(("part", PartHeaders(
+            name=disposition.get(b"name", b"").decode("latin-1"),
+            filename=filename.decode("latin-1") if filename is not None else None,
+            content_type=raw_headers.get(b"content-type", b"").decode("latin-1")
+        )))
+    
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append(("data", bytes(data[start:end])))
+    
+    def on_part_end() -> None:
+        events.append(("end", None))
+    
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    
+    # Parse errors are ValueErrors (multipart.exceptions.ParseError)
+    async for chunk in request.stream():
+        if chunk:
+            parser.write(chunk)
+        # Callbacks only queue events; hand them on before reading more
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    for event in events:
+        yield event
+
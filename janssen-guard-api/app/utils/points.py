@@ -0,0 +1,44 @@
+"""Patrol point helpers"""
+
+from typing import List, Tuple
+from app.config import settings
+
+
+def point_sort_key(point: str) -> Tuple[int, int, str]:
+    """
+    Sort key that orders numeric points numerically ("2" before "10")
+    
+    Args:
+        point: Patrol point identifier
+        
+    Returns:
+        Tuple[int, int, str]: Sort key (numeric points first)
+    """
+    if point.isdigit():
+        return (0, int(point), point)
+    return (1, 0, point)
+
+
+
+def normalize_point(point: str) -> str:
+    """
+    Normalize a patrol point identifier ("05" and "5" are the same point)
+    
+    Args:
+        point: Patrol point identifier
+        
+    Returns:
+        str: Point without leading zeros (non-numeric points unchanged)
+    """
+    return str(int(point)) if point.isdecimal() else point
+
+
+def round_points() -> List[str]:
+    """
+    Get the points a full patrol round scans
+    
+    Returns:
+        List[str]: "1".."PATROL_POINT_COUNT", in point order
+    """
+    return [str(point) for point in range(1, settings.PATROL_POINT_COUNT + 1)]
+
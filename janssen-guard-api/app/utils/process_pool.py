@@ -0,0 +1,86 @@
+"""Shared process pools for CPU-bound work (image decoding, resizing, transcoding)"""
+
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from app.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+_background_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool, creating it on first use
+    
+    Returns:
+        ProcessPoolExecutor: Process pool sized by IMAGE_PROCESS_WORKERS
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _executor
+
+
+def get_background_pool() -> ProcessPoolExecutor:
+    """
+    Get the low-priority pool for background work, creating it on first use
+    
+    Workers run at IMAGE_TRANSCODE_NICE, so the OS schedules request-path
+    work (renditions, the API itself) ahead of them.
+    
+    Returns:
+        ProcessPoolExecutor: Process pool sized by IMAGE_TRANSCODE_WORKERS
+    """
+    global _background_executor
+    if _background_executor is None:
+        _background_executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_TRANSCODE_WORKERS,
+            initializer=os.nice,
+            initargs=(settings.IMAGE_TRANSCODE_NICE,)
+        )
+    return _background_executor
+
+
+async def run_in_process(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a picklable function in the shared process pool without blocking the event loop
+    
+    Args:
+        func: Module-level function to run
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+        
+    Returns:
+        Any: Function result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+async def run_in_background_process(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a picklable function in the low-priority background pool
+    
+    Args:
+        func: Module-level function to run
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+        
+    Returns:
+        Any: Function result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_background_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the process pools (application shutdown)"""
+    global _executor, _background_executor
+    for executor in (_executor, _background_executor):
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    _executor = _background_executor = None
+
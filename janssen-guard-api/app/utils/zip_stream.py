@@ -0,0 +1,52 @@
+"""Streaming zip archive writer"""
+
+import time
+import zipfile
+from typing import AsyncIterator, List, Tuple
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        """Return and forget everything written so far"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """
+    Stream a zip archive as its entries arrive
+    
+    The sink is not seekable, so zipfile writes sizes and CRCs in data
+    descriptors after each entry; only the entry being written is held in
+    memory. Entries are stored uncompressed since images are already
+    compressed.
+    
+    Args:
+        entries: (name, data) pairs in archive order
+        
+    Yields:
+        bytes: Archive chunks (one per entry, then the central directory)
+    """
+    sink = _ChunkSink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+            yield sink.drain()
+    yield sink.drain()
+
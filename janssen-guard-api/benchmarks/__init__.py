@@ -0,0 +1,2 @@
+"""Micro-benchmarks for Janssen Guard API hot paths"""
+
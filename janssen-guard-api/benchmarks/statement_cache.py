@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: per-request statement overhead of hot repository queries
+
+Compares three ways of producing the SQL for the same query:
+
+- rebuild:  construct select() and derive its cache key on every call
+            (the old repository code; SQLAlchemy's compiled cache still hits)
+- compile:  construct select() and compile it from scratch
+            (what a compiled-cache miss costs)
+- cached:   reuse the prebuilt statement from FilterSpec and bind new values
+            (the current repository code)
+
+No database is needed; timings cover only the Python side of a request.
+
+Usage (from the janssen-guard-api directory):
+    python -m benchmarks.statement_cache [--iterations 20000]
+"""
+
+import argparse
+import timeit
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+from app.models import User, PatrolRecord
+from app.repositories.filter_spec import FilterSpec
+
+
+def build_cases():
+    """Return (name, rebuild, cached) callables for each hot query"""
+    users = FilterSpec.for_model(User)
+    records = FilterSpec.for_model(PatrolRecord)
+
+    def rebuild_username():
+        return select(User).where(User.username == "guard01")
+
+    def cached_username():
+        return users.compile("rows", {"username": "guard01"})[0]
+
+    def rebuild_by_id():
+        return select(PatrolRecord).where(PatrolRecord.id == "0b6f9a0e-5b8e-4c1e-9f77-3f1c0c6d2a11")
+
+    def cached_by_id():
+        return records.compile("rows", {"id": "0b6f9a0e-5b8e-4c1e-9f77-3f1c0c6d2a11"})[0]
+
+    def rebuild_page():
+        return (
+            select(PatrolRecord)
+            .where(PatrolRecord.point == "5")
+            .where(PatrolRecord.time >= 1705320000)
+            .where(PatrolRecord.time <= 1705406400)
+            .order_by(PatrolRecord.time.desc())
+            .offset(40)
+            .limit(20)
+        )
+
+    def cached_page():
+        statement, params = records.compile(
+            "rows",
+            {"point": "5", "time__between": (1705320000, 1705406400)},
+            ["-time"],
+            paginate=True
+        )
+        params["_limit"], params["_offset"] = 20, 40
+        return statement
+
+    return [
+        ("UserRepository.get_by_username", rebuild_username, cached_username),
+        ("BaseRepository.get_by_id", rebuild_by_id, cached_by_id),
+        ("PatrolRepository.get_paginated", rebuild_page, cached_page),
+    ]
+
+
+def per_call_us(fn, iterations: int) -> float:
+    """Best-of-5 time per call in microseconds"""
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    dialect = mysql.dialect()
+    print(f"{'query':34} {'rebuild':>10} {'compile':>10} {'cached':>10} {'saved':>10}")
+    for name, rebuild, cached in build_cases():
+        rebuild_us = per_call_us(lambda: rebuild()._generate_cache_key(), args.iterations)
+        compile_us = per_call_us(lambda: rebuild().compile(dialect=dialect), max(args.iterations // 10, 1))
+        cached_us = per_call_us(lambda: cached()._generate_cache_key(), args.iterations)
+        print(
+            f"{name:34} {rebuild_us:>8.1f}us {compile_us:>8.1f}us "
+            f"{cached_us:>8.1f}us {rebuild_us - cached_us:>8.1f}us"
+        )
+    print("\nsaved = rebuild - cached, per request; compile = cost of a compiled-cache miss")
+
+
+if __name__ == "__main__":
+    main()
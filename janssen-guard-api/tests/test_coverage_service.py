@@ -0,0 +1,90 @@
+"""Tests for the vectorized round segmentation and percentiles of the coverage report"""
+
+import numpy as np
+import pytest
+from app.services.coverage_service import group_percentiles, segment_rounds
+
+QUANTILES = (0.0, 0.25, 0.5, 0.9, 1.0)
+
+
+def reference_rounds(guard_codes, times, slots, slot_count, round_gap):
+    """One scan at a time: new guard, a long pause, or the previous scan completed the round"""
+    starts, covered = [], set()
+    for index in range(len(times)):
+        start = (
+            index == 0
+            or guard_codes[index] != guard_codes[index - 1]
+            or times[index] - times[index - 1] > round_gap
+            or len(covered) == slot_count
+        )
+        if start:
+            covered = set()
+        starts.append(start)
+        if slots[index] >= 0:
+            covered.add(slots[index])
+    return starts
+
+
+def rounds(guards, times, slots, slot_count=3, round_gap=100):
+    """Start flags from segment_rounds as a list"""
+    return segment_rounds(
+        np.array(guards), np.array(times, dtype=np.int64), np.array(slots), slot_count, round_gap
+    ).tolist()
+
+
+def test_round_ends_once_every_point_is_scanned():
+    # Points 0 1 2 complete a round; the next scan starts a new one
+    assert rounds([0] * 6, [0, 10, 20, 30, 40, 50], [0, 1, 2, 0, 2, 1]) == [True, False, False, True, False, False]
+
+
+def test_repeated_and_other_points_do_not_complete_a_round():
+    assert rounds([0] * 6, [0, 10, 20, 30, 40, 50], [0, 0, -1, 1, 1, 2]) == [True] + [False] * 5
+
+
+def test_pause_and_guard_change_start_rounds():
+    assert rounds([0, 0, 0, 1, 1], [0, 10, 200, 210, 220], [0, 1, 0, 1, 2]) == [True, False, True, True, False]
+
+
+def test_pause_equal_to_gap_stays_in_round():
+    assert rounds([0, 0], [0, 100], [0, 1]) == [True, False]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_segment_rounds_matches_reference(seed):
+    """Random scans (several completions per pause-free stretch) agree with the loop"""
+    rng = np.random.default_rng(seed)
+    size = int(rng.integers(1, 400))
+    slot_count = int(rng.integers(1, 6))
+    guard_codes = np.sort(rng.integers(0, 4, size))
+    times = np.cumsum(rng.integers(0, 60, size)).astype(np.int64)
+    slots = rng.integers(-1, slot_count, size)
+    
+    expected = reference_rounds(guard_codes.tolist(), times.tolist(), slots.tolist(), slot_count, 50)
+    assert segment_rounds(guard_codes, times, slots, slot_count, 50).tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_group_percentiles_match_numpy(seed):
+    rng = np.random.default_rng(seed)
+    group_count = 6
+    groups = rng.integers(0, group_count - 1, 300)  # The last group stays empty
+    values = rng.integers(0, 10_000, groups.size)
+    
+    result = group_percentiles(groups, values, group_count, QUANTILES)
+    
+    assert result.shape == (group_count, len(QUANTILES))
+    for group in range(group_count - 1):
+        in_group = values[groups == group]
+        if in_group.size:
+            assert np.allclose(result[group], np.percentile(in_group, [q * 100 for q in QUANTILES]))
+        else:
+            assert np.isnan(result[group]).all()
+    assert np.isnan(result[-1]).all()
+
+
+def test_group_percentiles_single_value_and_empty_input():
+    result = group_percentiles(np.array([1]), np.array([42]), 2, (0.5, 0.9))
+    assert np.isnan(result[0]).all() and result[1].tolist() == [42.0, 42.0]
+    
+    assert np.isnan(group_percentiles(np.array([], dtype=np.int64), np.array([]), 3, (0.5,))).all()
+
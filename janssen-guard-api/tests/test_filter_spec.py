@@ -0,0 +1,122 @@
+"""Tests for compiled repository filters and their statement cache"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models import PatrolRecord
+from app.repositories.filter_spec import FilterSpec
+
+RECORDS = [
+    ("r1", "1", "Alice Smith", 100, ""),
+    ("r2", "2", "alice jones", 200, "gate open"),
+    ("r3", "10", "Bob", 300, ""),
+    ("r4", "2", "100%_guard", 400, ""),
+    ("r5", "3", "Carol", 500, "late"),
+]
+
+
+@pytest.fixture(scope="module")
+def session():
+    """SQLite session with a few patrol records"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            PatrolRecord(id=id, point=point, guard_name=guard, time=time, server_time=time, image_id="", note=note)
+            for id, point, guard, time, note in RECORDS
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def ids(session: Session, filters=None, order_by=None):
+    """IDs of the records a filter selects"""
+    statement, params = FilterSpec.for_model(PatrolRecord).compile("rows", filters, order_by or ["time"])
+    return [record.id for record in session.execute(statement, params).scalars()]
+
+
+def test_spec_is_shared_per_model():
+    assert FilterSpec.for_model(PatrolRecord) is FilterSpec.for_model(PatrolRecord)
+    assert FilterSpec.for_model(PatrolRecord).primary_key == "id"
+
+
+def test_statement_is_cached_per_filter_shape():
+    """Only the bind values change between queries of the same shape"""
+    spec = FilterSpec(PatrolRecord)
+    
+    first, first_params = spec.compile("rows", {"point": "1", "time__gte": 10}, ["-time"])
+    second, second_params = spec.compile("rows", {"time__gte": 99, "point": "7"}, ["-time"])
+    assert first is second
+    assert first_params == {"point__eq": "1", "time__gte": 10}
+    assert second_params == {"point__eq": "7", "time__gte": 99}
+    
+    assert spec.compile("rows", {"point": "1"}, ["-time"])[0] is not first
+    assert spec.compile("rows", {"point": "1", "time__gte": 10}, ["time"])[0] is not first
+    assert spec.compile("count", {"point": "1", "time__gte": 10}, ["-time"])[0] is not first
+    # Ordering does not change a count
+    assert spec.compile("count", {"point": "1"}, ["time"])[0] is spec.compile("count", {"point": "1"})[0]
+
+
+def test_variadic_operators_are_cached_per_value_count():
+    spec = FilterSpec(PatrolRecord)
+    
+    two, params = spec.compile("rows", {"guard_name__contains_any": ["a", "b"]})
+    assert spec.compile("rows", {"guard_name__contains_any": ["c", "d"]})[0] is two
+    assert spec.compile("rows", {"guard_name__contains_any": ["a"]})[0] is not two
+    assert params == {"guard_name__contains_any_0": "%a%", "guard_name__contains_any_1": "%b%"}
+
+
+def test_none_compares_with_is_null():
+    spec = FilterSpec(PatrolRecord)
+    
+    statement, params = spec.compile("rows", {"note": None})
+    assert "IS NULL" in str(statement)
+    assert params == {}
+    assert "IS NOT NULL" in str(spec.compile("rows", {"note__ne": None})[0])
+
+
+@pytest.mark.parametrize("key, error", [
+    ("color", "Unknown filter field: color"),
+    ("point__regex", "Unknown filter operator: regex"),
+])
+def test_unknown_keys_are_rejected(key, error):
+    with pytest.raises(ValueError, match=error):
+        FilterSpec(PatrolRecord).compile("rows", {key: "x"})
+
+
+def test_unknown_order_field_is_rejected():
+    with pytest.raises(ValueError, match="Unknown order field: color"):
+        FilterSpec(PatrolRecord).compile("rows", {}, ["-color"])
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({}, ["r1", "r2", "r3", "r4", "r5"]),
+    ({"point": "2"}, ["r2", "r4"]),
+    ({"point__in": ["1", "3"]}, ["r1", "r5"]),
+    ({"time__between": (200, 400)}, ["r2", "r3", "r4"]),
+    ({"time__gt": 200, "time__lte": 400}, ["r3", "r4"]),
+    ({"note__ne": ""}, ["r2", "r5"]),
+    ({"point__prefix": "1"}, ["r1", "r3"]),
+    ({"guard_name__contains_any": ["alice"]}, ["r1", "r2"]),
+    ({"guard_name__contains_any": ["bob", "carol"]}, ["r3", "r5"]),
+    # Wildcards in values match literally
+    ({"guard_name__contains_any": ["%_"]}, ["r4"]),
+    ({"guard_name__prefix": "_"}, []),
+])
+def test_filters_select_matching_rows(session, filters, expected):
+    assert ids(session, filters) == expected
+
+
+def test_ordering_and_pagination(session):
+    spec = FilterSpec.for_model(PatrolRecord)
+    filters = {"point__in": ["1", "2", "10"]}
+    
+    statement, params = spec.compile("rows", filters, ["-time"], paginate=True)
+    params.update({"_limit": 2, "_offset": 1})
+    assert [record.id for record in session.execute(statement, params).scalars()] == ["r3", "r2"]
+    
+    count, params = spec.compile("count", filters)
+    assert session.execute(count, params).scalar() == 4
+
@@ -0,0 +1,114 @@
+"""Tests for the in-memory store of recent patrol records"""
+
+import time
+from types import SimpleNamespace
+import pytest
+from app.services.hot_store import HotStore
+
+WINDOW = 24 * 3600
+
+
+def store(max_bytes: int = 10 * 1024 * 1024) -> HotStore:
+    """Empty store that covers the whole window (as after load())"""
+    hot = HotStore(WINDOW, max_bytes)
+    hot.covered_from = int(time.time()) - WINDOW
+    return hot
+
+
+def record(number: int, record_time: int, point: str = "1", guard_name: str = "Alice", note: str = ""):
+    """Object with the attributes of a PatrolRecord"""
+    return SimpleNamespace(
+        id=f"r{number}", point=point, guard_name=guard_name, time=record_time,
+        server_time=record_time, image_id=f"img-{number}", note=note
+    )
+
+
+async def ids(hot: HotStore, filters=None, page: int = 1, limit: int = 100):
+    records, total = await hot.get_paginated(page, limit, filters, ["-time"])
+    return [item.id for item in records], total
+
+
+@pytest.mark.asyncio
+async def test_records_are_kept_in_time_order():
+    hot = store()
+    now = int(time.time())
+    for number, offset in enumerate([50, 10, 30, 10, 40]):
+        hot.add(record(number, now - offset))
+    
+    assert list(hot._times) == sorted(hot._times)
+    # Newest first; equal times keep insertion order, reversed
+    assert await ids(hot) == (["r3", "r1", "r2", "r4", "r0"], 5)
+    assert await ids(hot, page=2, limit=2) == (["r2", "r4"], 5)
+
+
+@pytest.mark.asyncio
+async def test_filters():
+    hot = store()
+    now = int(time.time())
+    hot.add(record(1, now - 40, "1", "Alice Smith"))
+    hot.add(record(2, now - 30, "2", "bob", note="gate open"))
+    hot.add(record(3, now - 20, "3", "ALICE jones"))
+    hot.add(record(4, now - 10, "2", "Carol"))
+    
+    assert await ids(hot, {"point": "2"}) == (["r4", "r2"], 2)
+    assert await ids(hot, {"point__in": ["1", "3", "9"]}) == (["r3", "r1"], 2)
+    assert await ids(hot, {"point": "9"}) == ([], 0)
+    assert await ids(hot, {"guard_name__contains_any": ["alice"]}) == (["r3", "r1"], 2)
+    assert await ids(hot, {"guard_name__contains_any": ["OB", "caro"]}) == (["r4", "r2"], 2)
+    assert await ids(hot, {"note__ne": ""}) == (["r2"], 1)
+    assert await ids(hot, {"time__between": (now - 30, now - 20)}) == (["r3", "r2"], 2)
+    assert await ids(hot, {"time__gte": now - 20, "point__in": ["2", "3"]}) == (["r4", "r3"], 2)
+    assert sorted(await hot.get_scan_counts(now - 40, now)) == [
+        ("1", "Alice Smith", 1), ("2", "Carol", 1), ("2", "bob", 1), ("3", "ALICE jones", 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unsupported_queries_are_rejected():
+    hot = store()
+    
+    with pytest.raises(ValueError, match="Unsupported hot store filters"):
+        await hot.get_paginated(filters={"image_id": "x"})
+    with pytest.raises(ValueError, match="Unsupported hot store ordering"):
+        await hot.get_paginated(order_by=["time"])
+
+
+def test_records_before_the_window_are_ignored():
+    hot = store()
+    hot.add(record(1, hot.covered_from - 1))
+    assert len(hot) == 0
+    
+    assert not HotStore(WINDOW, 1024).covers(int(time.time()))  # Not loaded
+    assert hot.covers(hot.covered_from) and not hot.covers(hot.covered_from - 1) and not hot.covers(None)
+
+
+def test_rows_older_than_the_window_are_trimmed():
+    hot = HotStore(WINDOW, 10 * 1024 * 1024)
+    now = int(time.time())
+    hot.covered_from = now - 3 * WINDOW
+    for number, offset in enumerate([3 * WINDOW, 2 * WINDOW, WINDOW // 2]):
+        hot._insert(f"r{number}", "1", "Alice", now - offset, now, "", "")
+    full_size = hot.size
+    
+    hot.add(record(9, now))
+    
+    assert hot._ids == ["r2", "r9"]
+    assert hot.covered_from >= now - WINDOW
+    assert 0 < hot.size < full_size
+
+
+def test_memory_limit_drops_oldest_rows_and_keeps_the_range_complete():
+    """Rows sharing the cut time are dropped together, so covered_from stays exact"""
+    hot = store(max_bytes=20_000)
+    start = hot.covered_from
+    for number in range(400):
+        # Two records per second
+        hot.add(record(number, start + number // 2))
+        assert hot.size <= hot.max_bytes
+    
+    kept = list(hot._times)
+    assert hot.covered_from > start and kept and kept[0] >= hot.covered_from
+    # Every added record at or after covered_from is still held
+    assert len(kept) == sum(1 for number in range(400) if start + number // 2 >= hot.covered_from)
+    assert hot.size == sum(hot._row_size(index) for index in range(len(hot)))
+
@@ -0,0 +1,84 @@
+"""Tests for conditional request and byte range handling of image responses"""
+
+import pytest
+from fastapi import Request
+from app.utils.image_response import is_not_modified, make_etag, parse_range
+
+ETAG = make_etag("img-1.jpg", 1000, 1_700_000_000_000_000_000)
+LAST_MODIFIED = "Tue, 14 Nov 2023 22:13:20 GMT"
+MTIME = 1_700_000_000.5
+
+
+def request(**headers) -> Request:
+    """Request carrying the given headers (underscores become dashes)"""
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_etag_is_strong_and_tracks_file_identity():
+    assert ETAG.startswith('"') and ETAG.endswith('"') and not ETAG.startswith("W/")
+    assert ETAG == make_etag("img-1.jpg", 1000, 1_700_000_000_000_000_000)
+    assert ETAG != make_etag("img-1.jpg", 1001, 1_700_000_000_000_000_000)
+    assert ETAG != make_etag("img-1.jpg", 1000, 1_700_000_000_000_000_001)
+    assert ETAG != make_etag("img-2.jpg", 1000, 1_700_000_000_000_000_000)
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, False),
+    ({"if_none_match": ETAG}, True),
+    ({"if_none_match": f'"other", {ETAG}'}, True),
+    ({"if_none_match": f"W/{ETAG}"}, True),
+    ({"if_none_match": "*"}, True),
+    ({"if_none_match": '"other"'}, False),
+    ({"if_modified_since": LAST_MODIFIED}, True),
+    ({"if_modified_since": "Tue, 14 Nov 2023 22:13:19 GMT"}, False),
+    ({"if_modified_since": "not a date"}, False),
+    # If-None-Match wins over If-Modified-Since
+    ({"if_none_match": '"other"', "if_modified_since": LAST_MODIFIED}, False),
+])
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(request(**headers), ETAG, MTIME) is expected
+
+
+def test_if_modified_since_needs_a_modification_time():
+    assert not is_not_modified(request(if_modified_since=LAST_MODIFIED), ETAG, None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=999-999", (999, 999)),
+    # Full body: other units, multiple ranges, no dash
+    ("items=0-1", None),
+    ("bytes=0-1,5-6", None),
+    ("bytes=5", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(request(range=header), 1000, ETAG, LAST_MODIFIED) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=500-100", "bytes=-0", "bytes=a-b", "bytes=-"])
+def test_unsatisfiable_ranges_raise(header):
+    with pytest.raises(ValueError):
+        parse_range(request(range=header), 1000, ETAG, LAST_MODIFIED)
+
+
+def test_no_range_header_is_full_body():
+    assert parse_range(request(), 1000, ETAG, LAST_MODIFIED) is None
+
+
+@pytest.mark.parametrize("validator, expected", [
+    (ETAG, (0, 9)),
+    (LAST_MODIFIED, (0, 9)),
+    ('"stale"', None),
+    ("Mon, 13 Nov 2023 00:00:00 GMT", None),
+])
+def test_if_range(validator, expected):
+    """A stale If-Range validator sends the full (new) body instead of a range"""
+    assert parse_range(request(range="bytes=0-9", if_range=validator), 1000, ETAG, LAST_MODIFIED) == expected
+
@@ -0,0 +1,100 @@
+"""Tests for the incremental multipart/form-data parser"""
+
+from typing import List
+import pytest
+from fastapi import Request
+from app.utils.multipart_stream import PartHeaders, iter_multipart
+
+BOUNDARY = "----patrol-boundary"
+IMAGE = bytes(range(256)) * 40 + f"\r\n--{BOUNDARY[:-1]}".encode()  # Includes a near-boundary
+
+
+def form_body() -> bytes:
+    return b"".join([
+        f"--{BOUNDARY}\r\n".encode(),
+        b'Content-Disposition: form-data; name="record"\r\n\r\n',
+        b'{"imageid": "img-1"}\r\n',
+        f"--{BOUNDARY}\r\n".encode(),
+        b'Content-Disposition: form-data; name="image"; filename="photo.jpg"\r\n',
+        b"Content-Type: image/jpeg\r\n\r\n",
+        IMAGE + b"\r\n",
+        f"--{BOUNDARY}--\r\n".encode(),
+    ])
+
+
+def request(chunks: List[bytes], content_type: str = f"multipart/form-data; boundary={BOUNDARY}") -> Request:
+    """Request whose body arrives in the given chunks"""
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    
+    async def receive():
+        return messages.pop(0)
+    
+    return Request({"type": "http", "headers": [(b"content-type", content_type.encode())]}, receive)
+
+
+async def parts(chunks: List[bytes]):
+    """Collect (headers, body) per part and check events arrive in order"""
+    collected, current = [], None
+    async for kind, value in iter_multipart(request(chunks)):
+        if kind == "part":
+            assert current is None
+            current = (value, bytearray())
+        elif kind == "data":
+            current[1].extend(value)
+        else:
+            collected.append((current[0], bytes(current[1])))
+            current = None
+    assert current is None
+    return collected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1 << 20])
+async def test_parts_are_parsed_whatever_the_chunking(chunk_size):
+    body = form_body()
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+    
+    assert await parts(chunks) == [
+        (PartHeaders("record", None, ""), b'{"imageid": "img-1"}'),
+        (PartHeaders("image", "photo.jpg", "image/jpeg"), IMAGE),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_data_is_handed_on_before_the_body_ends():
+    """Events of the first chunk are yielded before the next chunk is read"""
+    body = form_body()
+    half = len(body) // 2
+    received = []
+    
+    async def receive():
+        received.append(True)
+        if len(received) == 1:
+            return {"type": "http.request", "body": body[:half], "more_body": True}
+        return {"type": "http.request", "body": body[half:], "more_body": False}
+    
+    events = iter_multipart(Request({
+        "type": "http",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    }, receive))
+    seen = [await events.__anext__() for _ in range(4)]
+    assert [kind for kind, _ in seen] == ["part", "data", "end", "part"]
+    assert len(received) == 1
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["application/json", "multipart/form-data", "multipart/mixed; boundary=x"])
+async def test_non_form_bodies_are_rejected(content_type):
+    with pytest.raises(ValueError, match="Expected a multipart/form-data body"):
+        async for _ in iter_multipart(request([b"{}"], content_type)):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_malformed_body_raises_value_error():
+    with pytest.raises(ValueError):
+        async for _ in iter_multipart(request([b"--not-the-boundary\r\n\r\n"])):
+            pass
+
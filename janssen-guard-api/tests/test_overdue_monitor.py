@@ -0,0 +1,55 @@
+"""Tests for the overdue patrol point monitor"""
+
+import asyncio
+import pytest
+from app.services.overdue_monitor import OverdueMonitor
+from app.utils.points import round_points
+
+START = 1000
+
+
+def first_overdue(monitor: OverdueMonitor, point: str, step: int, until: int) -> int:
+    """Advance the wheel from START in steps and return when the point's alert was raised"""
+    for now in range(START, until, step):
+        monitor.advance(now)
+        events = asyncio.run(monitor.get_events()).events
+        if any(event.type == "overdue" and event.point == point for event in events):
+            return now
+    pytest.fail(f"No overdue event for point {point} before {until}")
+
+
+@pytest.mark.parametrize("step", [1, 5])
+@pytest.mark.parametrize("due_after", [1, 3, 5, 7, 60])
+def test_alert_fires_within_one_tick_of_deadline(step, due_after):
+    """A deadline inside a tick is raised when that tick ends, not a revolution later"""
+    monitor = OverdueMonitor(sla=60, tick=5)
+    monitor.advance(START)
+    
+    point = round_points()[0]
+    deadline = START + due_after
+    monitor.record_visit(point, "guard", deadline - monitor.sla, now=START)
+    
+    raised = first_overdue(monitor, point, step, START + 10 * monitor.sla)
+    assert deadline <= raised < deadline + monitor.tick
+
+
+def test_later_scan_resolves_and_moves_deadline():
+    """A scan after the alert resolves it, and the new deadline is honoured"""
+    monitor = OverdueMonitor(sla=60, tick=5)
+    monitor.advance(START)
+    
+    point = round_points()[0]
+    monitor.record_visit(point, "guard", START - monitor.sla + 3, now=START)
+    raised = first_overdue(monitor, point, 1, START + 100)
+    
+    monitor.record_visit(point, "guard", raised, now=raised)
+    events = asyncio.run(monitor.get_events()).events
+    assert events[-1].type == "resolved"
+    
+    for now in range(raised, raised + monitor.sla):
+        monitor.advance(now)
+    assert asyncio.run(monitor.get_events()).events[-1].type == "resolved"
+    
+    monitor.advance(raised + monitor.sla + monitor.tick)
+    assert asyncio.run(monitor.get_events()).events[-1].type == "overdue"
+
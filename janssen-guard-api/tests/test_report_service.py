@@ -0,0 +1,97 @@
+"""Tests for splitting report ranges between hourly rollups and raw records"""
+
+from collections import Counter
+from itertools import product
+import pytest
+from app.config import settings
+from app.repositories.rollup_repository import HOUR
+from app.services.report_service import ReportService, whole_hours
+
+BASE = 1_700_000_000 // HOUR * HOUR
+# Scans just before, on and after three hour boundaries
+SCANS = [
+    ("1", "alice", BASE + hour * HOUR + delta)
+    for hour in range(3) for delta in (-1, 0, 1, HOUR // 2)
+]
+EDGES = [BASE + hour * HOUR + delta for hour in range(-1, 4) for delta in (-1, 0, 1)]
+
+
+class FakeRecords:
+    """Scan counts over raw records (inclusive time range)"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def get_scan_counts(self, start_time, end_time):
+        self.calls.append((start_time, end_time))
+        counts = Counter((point, guard) for point, guard, time in SCANS if start_time <= time <= end_time)
+        return [(point, guard, scans) for (point, guard), scans in counts.items()]
+
+
+class FakeRollups:
+    """Scan counts over whole hours [start_hour, end_hour)"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def get_scan_counts(self, start_hour, end_hour):
+        assert start_hour % HOUR == 0 and end_hour % HOUR == 0
+        self.calls.append((start_hour, end_hour))
+        counts = Counter((point, guard) for point, guard, time in SCANS if start_hour <= time < end_hour)
+        return [(point, guard, scans) for (point, guard), scans in counts.items()]
+
+
+@pytest.mark.parametrize("start_time, end_time, expected", [
+    (BASE, BASE + HOUR - 1, (BASE, BASE + HOUR)),
+    (BASE + 1, BASE + 2 * HOUR, (BASE + HOUR, BASE + 2 * HOUR)),
+    (BASE - 1, BASE + HOUR, (BASE, BASE + HOUR)),
+    (BASE, BASE + HOUR - 2, (BASE, BASE)),
+    (BASE + 1, BASE + HOUR - 1, (BASE + HOUR, BASE + HOUR)),
+])
+def test_whole_hours(start_time, end_time, expected):
+    assert whole_hours(start_time, end_time) == expected
+
+
+@pytest.mark.parametrize("start_time, end_time", [
+    (start, end) for start, end in product(EDGES, EDGES) if start <= end
+])
+def test_split_covers_every_second_once(start_time, end_time):
+    """Partial hours before, whole hours and partial hours after tile the range exactly"""
+    first_hour, end_hour = whole_hours(start_time, end_time)
+    if first_hour >= end_hour:
+        return
+    assert start_time <= first_hour < start_time + HOUR
+    assert end_time - HOUR < end_hour <= end_time + 1
+    pieces = [(start_time, first_hour - 1), (first_hour, end_hour - 1), (end_hour, end_time)]
+    assert sum(max(end - start + 1, 0) for start, end in pieces) == end_time - start_time + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("start_time, end_time", [
+    (start, end) for start, end in product(EDGES, EDGES) if start <= end
+])
+async def test_scan_counts_match_raw_records(monkeypatch, start_time, end_time):
+    monkeypatch.setattr(settings, "REPORT_ROLLUPS_ENABLED", True)
+    records, rollups = FakeRecords(), FakeRollups()
+    service = ReportService(records, rollups)
+    
+    counts = await service.get_scan_counts(start_time, end_time)
+    
+    expected = sum(1 for _, _, time in SCANS if start_time <= time <= end_time)
+    assert sum(counts.values()) == expected
+    first_hour, end_hour = whole_hours(start_time, end_time)
+    assert rollups.calls == ([(first_hour, end_hour)] if first_hour < end_hour else [])
+    # Raw records are only read for partial hours
+    assert all(end - start < HOUR for start, end in records.calls) or not rollups.calls
+
+
+@pytest.mark.asyncio
+async def test_scan_counts_without_rollups_read_records(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_ROLLUPS_ENABLED", False)
+    records, rollups = FakeRecords(), FakeRollups()
+    
+    counts = await ReportService(records, rollups).get_scan_counts(BASE - HOUR, BASE + 3 * HOUR)
+    
+    assert counts == {("1", "alice"): len(SCANS)}
+    assert records.calls == [(BASE - HOUR, BASE + 3 * HOUR)] and not rollups.calls
+
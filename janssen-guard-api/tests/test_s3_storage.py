@@ -0,0 +1,240 @@
+"""Tests for the S3 storage backend against an in-memory S3 stand-in"""
+
+import calendar
+import hashlib
+import hmac
+import time
+import uuid
+from email.utils import formatdate
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, quote, urlsplit
+import httpx
+import pytest
+import pytest_asyncio
+from app.storage.s3 import S3Storage
+
+ACCESS_KEY = "minio"
+SECRET_KEY = "minio-secret"
+REGION = "us-east-1"
+BUCKET = "patrol-images"
+ENDPOINT = "http://minio:9000"
+
+
+def _encode(value: str) -> str:
+    return quote(value, safe="-_.~")
+
+
+def _sign(amz_date: str, canonical_request: str) -> str:
+    """Reference SigV4 signature, written independently of app.storage.sigv4"""
+    scope = f"{amz_date[:8]}/{REGION}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    key = f"AWS4{SECRET_KEY}".encode()
+    for part in (amz_date[:8], REGION, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+class S3Stub:
+    """
+    Enough of the S3 REST API for S3Storage (MinIO-style, path-style URLs)
+    
+    Every request must carry a valid SigV4 signature (Authorization
+    header or presigned query), and signed payload hashes must match the
+    body, so signing mistakes fail the tests rather than only real S3.
+    """
+    
+    def __init__(self):
+        self.objects: Dict[str, Tuple[bytes, str, float]] = {}  # path -> (data, content type, mtime)
+        self.uploads: Dict[str, Dict] = {}
+        self.requests: List[Tuple[str, str]] = []  # (method, query)
+    
+    def _authorized(self, request: httpx.Request, path: str, pairs: List[Tuple[str, str]], body: bytes) -> bool:
+        query = dict(pairs)
+        if "X-Amz-Signature" in query:
+            canonical_query = "&".join(
+                f"{_encode(k)}={_encode(v)}" for k, v in sorted(pairs) if k != "X-Amz-Signature"
+            )
+            canonical_request = "\n".join([
+                request.method, path, canonical_query, f"host:{request.url.netloc.decode()}\n", "host", "UNSIGNED-PAYLOAD"
+            ])
+            signed_at = calendar.timegm(time.strptime(query["X-Amz-Date"], "%Y%m%dT%H%M%SZ"))
+            return (
+                _sign(query["X-Amz-Date"], canonical_request) == query["X-Amz-Signature"]
+                and time.time() <= signed_at + int(query["X-Amz-Expires"])
+            )
+        
+        authorization = request.headers.get("authorization", "")
+        if "SignedHeaders=" not in authorization:
+            return False
+        names = authorization.split("SignedHeaders=")[1].split(",")[0].split(";")
+        payload_hash = request.headers["x-amz-content-sha256"]
+        if payload_hash != "UNSIGNED-PAYLOAD" and payload_hash != hashlib.sha256(body).hexdigest():
+            return False
+        canonical_request = "\n".join([
+            request.method,
+            path,
+            "&".join(f"{_encode(k)}={_encode(v)}" for k, v in sorted(pairs)),
+            "".join(f"{name}:{request.headers[name].strip()}\n" for name in names),
+            ";".join(names),
+            payload_hash
+        ])
+        return _sign(request.headers["x-amz-date"], canonical_request) == authorization.split("Signature=")[1]
+    
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.raw_path.decode().split("?")[0]
+        pairs = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        query = dict(pairs)
+        body = await request.aread()
+        if not self._authorized(request, path, pairs, body):
+            return httpx.Response(403, text="<Error><Code>SignatureDoesNotMatch</Code></Error>")
+        self.requests.append((request.method, request.url.query.decode()))
+        
+        if path == f"/{BUCKET}":
+            return httpx.Response(200)
+        if request.method == "POST" and "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {"parts": {}, "content_type": request.headers.get("content-type")}
+            return httpx.Response(200, text=(
+                '<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            ))
+        if request.method == "PUT" and "partNumber" in query:
+            self.uploads[query["uploadId"]]["parts"][int(query["partNumber"])] = body
+            return httpx.Response(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+        if request.method == "POST" and "uploadId" in query:
+            upload = self.uploads.pop(query["uploadId"])
+            data = b"".join(upload["parts"][number] for number in sorted(upload["parts"]))
+            self.objects[path] = (data, upload["content_type"], time.time())
+            return httpx.Response(200, text="<CompleteMultipartUploadResult/>")
+        if request.method == "DELETE" and "uploadId" in query:
+            self.uploads.pop(query["uploadId"], None)
+            return httpx.Response(204)
+        if request.method == "PUT":
+            self.objects[path] = (body, request.headers.get("content-type"), time.time())
+            return httpx.Response(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+        if request.method == "DELETE":
+            self.objects.pop(path, None)
+            return httpx.Response(204)
+        
+        if path not in self.objects:
+            return httpx.Response(404, text="<Error><Code>NoSuchKey</Code></Error>")
+        data, content_type, mtime = self.objects[path]
+        headers = {
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "Last-Modified": formatdate(mtime, usegmt=True),
+            "Content-Type": content_type or "binary/octet-stream",
+        }
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={**headers, "Content-Length": str(len(data))})
+        byte_range = request.headers.get("range")
+        if byte_range:
+            first, last = byte_range[len("bytes="):].split("-")
+            return httpx.Response(206, headers=headers, content=data[int(first):int(last) + 1 if last else None])
+        return httpx.Response(200, headers=headers, content=data)
+
+
+@pytest_asyncio.fixture
+async def s3():
+    """S3Storage wired to a fresh stub"""
+    stub = S3Stub()
+    storage = S3Storage(
+        ENDPOINT, BUCKET, REGION, ACCESS_KEY, SECRET_KEY, prefix="images/", part_size=5 * 1024 * 1024
+    )
+    await storage._client.aclose()
+    storage._client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handle))
+    yield storage, stub
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_put_get_stat_range_delete(s3):
+    """Objects round-trip, including keys that need percent-encoding"""
+    storage, stub = s3
+    key = "ab/cd/img 1+x.jpg"
+    data = bytes(range(256)) * 10
+    
+    assert await storage.put(key, data, "image/jpeg") == len(data)
+    assert f"/{BUCKET}/images/ab/cd/img%201%2Bx.jpg" in stub.objects
+    assert await storage.read(key) == data
+    
+    info = await storage.stat(key)
+    assert info.size == len(data)
+    assert info.etag == f'"{hashlib.md5(data).hexdigest()}"'
+    assert await storage.read_range(key, 100, 50) == data[100:150]
+    assert b"".join([chunk async for chunk in storage.iter_range(key, 2500)]) == data[2500:]
+    
+    await storage.delete(key)
+    assert await storage.stat(key) is None
+    with pytest.raises(FileNotFoundError):
+        await storage.read(key)
+    assert await storage.is_available()
+
+
+@pytest.mark.asyncio
+async def test_streamed_put_uses_multipart_above_one_part(s3):
+    """Small streams are one PUT; larger ones are uploaded in part_size parts"""
+    storage, stub = s3
+    
+    async def chunks(count: int, size: int):
+        for number in range(count):
+            yield bytes([number]) * size
+    
+    assert await storage.put("small.bin", chunks(3, 1000), "application/octet-stream") == 3000
+    assert not stub.uploads and not any("partNumber" in query for _, query in stub.requests)
+    
+    size = await storage.put("big.bin", chunks(12, 1024 * 1024), "application/octet-stream")
+    assert size == 12 * 1024 * 1024
+    assert await storage.read("big.bin") == b"".join(bytes([number]) * 1024 * 1024 for number in range(12))
+    # 5 MB parts: 5 + 5 + 2 MB
+    assert sum("partNumber" in query for _, query in stub.requests) == 3
+    assert not stub.uploads
+
+
+@pytest.mark.asyncio
+async def test_failed_multipart_upload_is_aborted(s3):
+    """A stream that fails mid-upload aborts the multipart upload and stores nothing"""
+    storage, stub = s3
+    
+    async def failing():
+        yield b"x" * (6 * 1024 * 1024)
+        raise OSError("client went away")
+    
+    with pytest.raises(OSError):
+        await storage.put("broken.bin", failing(), "application/octet-stream")
+    assert not stub.uploads
+    assert await storage.stat("broken.bin") is None
+
+
+@pytest.mark.asyncio
+async def test_presigned_url_fetches_object_and_is_stable(s3):
+    """Presigned URLs need no credentials and stay the same within the expiry window"""
+    storage, stub = s3
+    await storage.put("ab/cd/img-1.jpg", b"jpeg bytes", "image/jpeg")
+    
+    url = await storage.presigned_url("ab/cd/img-1.jpg", 3600)
+    assert url == await storage.presigned_url("ab/cd/img-1.jpg", 3600)
+    assert urlsplit(url).netloc == "minio:9000"
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stub.handle)) as client:
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.content == b"jpeg bytes"
+        
+        tampered = url.replace("img-1.jpg", "img-2.jpg")
+        assert (await client.get(tampered)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_wrong_secret_is_rejected(s3):
+    """The stub really checks signatures"""
+    storage, _ = s3
+    storage.secret_key = "not-the-secret"
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await storage.put("x.jpg", b"x", "image/jpeg")
+